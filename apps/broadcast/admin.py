@@ -1,17 +1,63 @@
-from django.contrib import admin
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.db.models import Q
 
 from .models import (
+    AIResponseCache,
     BusinessAccount,
     BusinessCredential,
+    CampaignDeliveryStats,
     DeliveryLog,
+    DeliveryRetry,
+    DeliveryRollup,
+    DispatchJob,
     MessageCampaign,
+    OutboxEvent,
+    RollupWatermark,
     SocialAccount,
     SocialAPICredential,
 )
+from .search import ACCOUNT_FTS_TABLE, CAMPAIGN_FTS_TABLE, annotate_rank, fts_available, matching_ids, ranked_ids
+
+
+class RankedSearchChangeList(ChangeList):
+    def get_ordering(self, request, queryset):
+        if ORDER_VAR not in self.params and 'search_rank' in queryset.query.annotations:
+            return ['search_rank', '-pk']
+        return super().get_ordering(request, queryset)
+
+
+class FullTextSearchAdminMixin:
+    """Search through the model's FTS5 index, best matches first, falling back to `search_fields`.
+
+    Only the `ADMIN_SEARCH_LIMIT` best matches are listed; the changelist warns when a search
+    matched more than that.
+    """
+
+    fts_table = ''
+
+    def get_changelist(self, request, **kwargs):
+        return RankedSearchChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip() or not fts_available(self.fts_table):
+            return super().get_search_results(request, queryset, search_term)
+        limit = settings.ADMIN_SEARCH_LIMIT
+        ids = ranked_ids(self.fts_table, search_term, limit=limit + 1)
+        if len(ids) > limit:
+            ids = ids[:limit]
+            messages.warning(
+                request,
+                f'More than {limit} {self.model._meta.verbose_name_plural} match "{search_term}"; '
+                f'only the {limit} best matches are shown. Refine the search to see the rest.',
+            )
+        return annotate_rank(queryset, ids), False
 
 
 @admin.register(SocialAccount)
-class SocialAccountAdmin(admin.ModelAdmin):
+class SocialAccountAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
+    fts_table = ACCOUNT_FTS_TABLE
     list_display = ('name', 'platform', 'handle', 'is_active', 'created_at')
     list_filter = ('platform', 'is_active')
     search_fields = ('name', 'handle')
@@ -40,7 +86,8 @@ class SocialAPICredentialAdmin(admin.ModelAdmin):
 
 
 @admin.register(MessageCampaign)
-class MessageCampaignAdmin(admin.ModelAdmin):
+class MessageCampaignAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
+    fts_table = CAMPAIGN_FTS_TABLE
     list_display = ('title', 'source_type', 'task_mode', 'status', 'send_at', 'created_at', 'updated_at')
     list_filter = ('status', 'source_type', 'task_mode')
     search_fields = ('title', 'message')
@@ -51,3 +98,67 @@ class DeliveryLogAdmin(admin.ModelAdmin):
     list_display = ('campaign', 'account', 'success', 'provider_message_id', 'created_at')
     list_filter = ('success', 'account__platform')
     search_fields = ('campaign__title', 'account__handle', 'error_message')
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip() or not (fts_available(CAMPAIGN_FTS_TABLE) and fts_available(ACCOUNT_FTS_TABLE)):
+            return super().get_search_results(request, queryset, search_term)
+        campaign_ids = matching_ids(CAMPAIGN_FTS_TABLE, search_term)
+        account_ids = matching_ids(ACCOUNT_FTS_TABLE, search_term)
+        condition = Q(error_message__icontains=search_term)
+        if campaign_ids is not None:
+            condition |= Q(campaign_id__in=campaign_ids) | Q(account_id__in=account_ids)
+        return queryset.filter(condition), False
+
+
+@admin.register(CampaignDeliveryStats)
+class CampaignDeliveryStatsAdmin(admin.ModelAdmin):
+    list_display = ('campaign', 'platform', 'sent', 'failed', 'updated_at')
+    list_filter = ('platform',)
+    list_select_related = ('campaign',)
+    raw_id_fields = ('campaign',)
+
+
+@admin.register(DeliveryRetry)
+class DeliveryRetryAdmin(admin.ModelAdmin):
+    list_display = ('id', 'campaign', 'account', 'status', 'attempts', 'next_attempt_at', 'updated_at')
+    list_filter = ('status',)
+    list_select_related = ('campaign', 'account')
+    raw_id_fields = ('campaign', 'account')
+    readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(DeliveryRollup)
+class DeliveryRollupAdmin(admin.ModelAdmin):
+    list_display = ('day', 'platform', 'account', 'sent', 'failed', 'updated_at')
+    list_filter = ('platform',)
+    list_select_related = ('account',)
+    raw_id_fields = ('account',)
+    date_hierarchy = 'day'
+
+
+@admin.register(RollupWatermark)
+class RollupWatermarkAdmin(admin.ModelAdmin):
+    list_display = ('name', 'last_id', 'updated_at')
+
+
+@admin.register(DispatchJob)
+class DispatchJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'campaign', 'status', 'total', 'sent', 'failed', 'attempts', 'locked_by', 'created_at')
+    list_filter = ('status',)
+    list_select_related = ('campaign',)
+    raw_id_fields = ('campaign',)
+    readonly_fields = ('created_at', 'started_at', 'finished_at')
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'event_name', 'status', 'attempts', 'available_at', 'delivered_at', 'created_at')
+    list_filter = ('status', 'event_name')
+    readonly_fields = ('created_at', 'delivered_at')
+
+
+@admin.register(AIResponseCache)
+class AIResponseCacheAdmin(admin.ModelAdmin):
+    list_display = ('key', 'kind', 'hits', 'created_at', 'expires_at')
+    list_filter = ('kind',)
+    search_fields = ('key',)
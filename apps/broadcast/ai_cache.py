@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from .models import AIResponseCache
+
+logger = logging.getLogger(__name__)
+
+# Hit counts are written in one UPDATE once this many are pending or the oldest is this old.
+HIT_FLUSH_SIZE = 100
+HIT_FLUSH_INTERVAL = 60.0
+
+_lock = threading.Lock()
+_pending_hits: Counter[int] = Counter()
+_pending_since = 0.0
+_entry_estimate: int | None = None
+
+
+def cache_key(kind: str, url: str, body: dict) -> str:
+    """sha256 over the endpoint and the full request body (model, prompts and parameters)."""
+    canonical = json.dumps({'kind': kind, 'url': url, 'body': body}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class AIResponseStore:
+    """Database-backed cache of OpenAI responses with per-kind TTLs and a size cap.
+
+    Cache failures never fail the caller: a broken read is a miss and a broken
+    write is logged and skipped.
+
+    A hit is a single SELECT: hit counts are kept in memory and written in batches, so
+    the `hits` column trails by up to `HIT_FLUSH_SIZE` hits per process. The entry count
+    is tracked per process as well, and `evict` only runs when an insert pushes it past
+    `max_entries`.
+    """
+
+    def __init__(self, ttls: dict[str, int] | None = None, max_entries: int | None = None):
+        self.ttls = ttls or {'chat': settings.AI_CACHE_TTL, 'image': settings.AI_IMAGE_CACHE_TTL}
+        self.max_entries = max_entries or settings.AI_CACHE_MAX_ENTRIES
+
+    def get(self, key: str) -> dict | None:
+        try:
+            entry = AIResponseCache.objects.filter(key=key, expires_at__gt=timezone.now()).only('response').first()
+        except DatabaseError:
+            logger.exception('AI cache read failed')
+            return None
+        if entry is None:
+            return None
+        self._count_hit(entry.pk)
+        return entry.response
+
+    def put(self, key: str, kind: str, response: dict) -> None:
+        expires_at = timezone.now() + timedelta(seconds=self.ttls.get(kind, settings.AI_CACHE_TTL))
+        try:
+            with transaction.atomic():
+                _, created = AIResponseCache.objects.update_or_create(
+                    key=key,
+                    defaults={'kind': kind, 'response': response, 'expires_at': expires_at, 'hits': 0},
+                )
+            if created and self._over_capacity():
+                self.evict()
+        except IntegrityError:
+            pass  # a concurrent request stored the same response first
+        except DatabaseError:
+            logger.exception('AI cache write failed')
+
+    def evict(self) -> int:
+        """Drop expired entries, then the oldest ones beyond `max_entries`."""
+        global _entry_estimate
+        removed, _ = AIResponseCache.objects.filter(expires_at__lte=timezone.now()).delete()
+        count = AIResponseCache.objects.count()
+        surplus = count - self.max_entries
+        if surplus > 0:
+            oldest = AIResponseCache.objects.order_by('created_at', 'id').values_list('id', flat=True)[:surplus]
+            extra, _ = AIResponseCache.objects.filter(id__in=list(oldest)).delete()
+            removed += extra
+            count -= extra
+        with _lock:
+            _entry_estimate = count
+        return removed
+
+    @staticmethod
+    def flush_hits() -> int:
+        """Write the hit counts gathered so far; returns how many hits were written."""
+        with _lock:
+            hits = dict(_pending_hits)
+            _pending_hits.clear()
+        if not hits:
+            return 0
+        increments = Case(
+            *[When(pk=pk, then=Value(count)) for pk, count in hits.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        try:
+            AIResponseCache.objects.filter(pk__in=hits).update(hits=F('hits') + increments)
+        except DatabaseError:
+            logger.exception('AI cache hit counter update failed')
+            return 0
+        return sum(hits.values())
+
+    def _count_hit(self, pk: int) -> None:
+        global _pending_since
+        now = time.monotonic()
+        with _lock:
+            if not _pending_hits:
+                _pending_since = now
+            _pending_hits[pk] += 1
+            due = sum(_pending_hits.values()) >= HIT_FLUSH_SIZE or now - _pending_since >= HIT_FLUSH_INTERVAL
+        if due:
+            self.flush_hits()
+
+    def _over_capacity(self) -> bool:
+        """Count a new entry; True once the estimated entry count exceeds `max_entries`.
+
+        The estimate starts from one `count()` and is corrected by every `evict`. Entries
+        added by other processes are only seen then, so the cap is approximate.
+        """
+        global _entry_estimate
+        with _lock:
+            estimate = _entry_estimate
+            if estimate is not None:
+                estimate = _entry_estimate = estimate + 1
+        if estimate is None:
+            estimate = AIResponseCache.objects.count()
+            with _lock:
+                _entry_estimate = estimate
+        return estimate > self.max_entries
@@ -1,13 +1,34 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import asyncio
 import json
-from urllib.parse import quote_plus
+import logging
+import math
+import re
+import threading
+import time
+from typing import AsyncIterator
+from urllib.parse import parse_qsl, quote_plus, urlencode, urlsplit
 import xml.etree.ElementTree as ET
 
+import httpx
 import requests
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from .ai_cache import AIResponseStore, cache_key
+from .async_http import LoopClients
+
+logger = logging.getLogger(__name__)
+
+CHAT_COMPLETIONS_URL = 'https://api.openai.com/v1/chat/completions'
+IMAGE_GENERATIONS_URL = 'https://api.openai.com/v1/images/generations'
 
 
 @dataclass
@@ -18,38 +39,446 @@ class NewsArticle:
     published_at: str
 
 
+@dataclass
+class CachedFeed:
+    articles: list[NewsArticle]
+    limit: int
+    etag: str = ''
+    last_modified: str = ''
+    fetched_at: float = field(default_factory=time.monotonic)
+
+
+class FeedCache:
+    """Thread-safe TTL + LRU cache of parsed feeds, keyed by normalized query."""
+
+    def __init__(self, ttl: float, max_entries: int, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: OrderedDict[str, CachedFeed] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> CachedFeed | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def is_fresh(self, entry: CachedFeed) -> bool:
+        return self.clock() - entry.fetched_at < self.ttl
+
+    def put(self, key: str, entry: CachedFeed) -> None:
+        entry.fetched_at = self.clock()
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.not_modified = self.evictions = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                'evictions': self.evictions,
+            }
+
+
+def _build_news_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+# Shared by every NewsScanner so repeated queries reuse cached feeds and pooled connections.
+news_cache = FeedCache(ttl=settings.NEWS_CACHE_TTL, max_entries=settings.NEWS_CACHE_MAX_ENTRIES)
+news_session = _build_news_session()
+news_async_clients = LoopClients(
+    lambda: httpx.AsyncClient(limits=httpx.Limits(max_connections=16, max_keepalive_connections=16), follow_redirects=True)
+)
+# OpenAI calls are slow rather than numerous, so the pool is sized for many concurrent requests.
+openai_async_clients = LoopClients(lambda: httpx.AsyncClient(limits=httpx.Limits(max_connections=200)))
+
+
+def normalize_query(keywords: str, area: str = '') -> str:
+    return ' '.join(' '.join(value for value in [keywords, area] if value).lower().split())
+
+
+_OLDEST = datetime.min.replace(tzinfo=timezone.utc)
+_NON_WORD_RE = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def _link_key(link: str) -> str:
+    parts = urlsplit(link.strip())
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if not k.lower().startswith('utm_')))
+    return f'{parts.netloc.lower()}{parts.path.rstrip("/")}?{query}'
+
+
+def _title_key(title: str) -> str:
+    return ' '.join(_NON_WORD_RE.sub(' ', title.lower()).split())
+
+
+def _published(article: NewsArticle) -> datetime:
+    try:
+        published = parsedate_to_datetime(article.published_at)
+    except (TypeError, ValueError, IndexError):
+        return _OLDEST
+    return published if published.tzinfo else published.replace(tzinfo=timezone.utc)
+
+
+def merge_articles(results: list[list[NewsArticle]], limit: int) -> list[NewsArticle]:
+    """Newest first, without the same story twice (matched by link or by title)."""
+    seen: set[str] = set()
+    merged: list[NewsArticle] = []
+    for article in sorted((item for batch in results for item in batch), key=_published, reverse=True):
+        keys = {f'title:{_title_key(article.title)}'}
+        if article.link:
+            keys.add(f'link:{_link_key(article.link)}')
+        if keys & seen:
+            continue
+        seen |= keys
+        merged.append(article)
+    return merged[:limit]
+
+
+class _FeedItems:
+    """Collects `<item>`s from (event, element) parse events until `limit` are read."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.articles: list[NewsArticle] = []
+        self._parents: list[ET.Element] = []
+
+    @property
+    def done(self) -> bool:
+        return len(self.articles) >= self.limit
+
+    def consume(self, events) -> bool:
+        """Feed parse events; returns True once enough articles are collected."""
+        for event, element in events:
+            if event == 'start':
+                self._parents.append(element)
+                continue
+            self._parents.pop()
+            if element.tag != 'item':
+                continue
+            self.articles.append(NewsScanner._article(element))
+            # Drop the finished item so memory stays flat however long the feed is.
+            element.clear()
+            if self._parents:
+                self._parents[-1].remove(element)
+            if self.done:
+                return True
+        return self.done
+
+
 class NewsScanner:
-    def fetch(self, keywords: str, area: str = '', limit: int = 5) -> list[NewsArticle]:
-        query = ' '.join(value for value in [keywords.strip(), area.strip()] if value).strip()
+    def __init__(
+        self,
+        session: requests.Session | None = None,
+        cache: FeedCache | None = None,
+        streaming: bool | None = None,
+        async_client: httpx.AsyncClient | None = None,
+    ):
+        self.session = session or news_session
+        self.cache = cache if cache is not None else news_cache
+        self.streaming = settings.NEWS_STREAMING_PARSER if streaming is None else streaming
+        self._async_client = async_client
+
+    def fetch(self, keywords: str, area: str = '', limit: int = 5, timeout: float = 10) -> list[NewsArticle]:
+        query = normalize_query(keywords, area)
         if not query:
             return []
+        cached, fresh = self._lookup(query, limit)
+        if fresh is not None:
+            return fresh
 
-        url = f'https://news.google.com/rss/search?q={quote_plus(query)}&hl=en-US&gl=US&ceid=US:en'
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
+        response = self.session.get(
+            self._feed_url(query),
+            headers=self._revalidation_headers(cached),
+            timeout=timeout,
+            stream=self.streaming,
+        )
+        try:
+            if response.status_code == 304 and cached is not None:
+                return self._not_modified(query, cached, limit)
+            response.raise_for_status()
+            self.cache.record('misses')
+
+            if self.streaming:
+                articles = self._parse_stream(response.raw, limit)
+            else:
+                articles = self._parse(response.content, limit)
+        finally:
+            # A streamed body that was not read to the end cannot go back to the pool;
+            # closing drops that connection instead of downloading the rest of the feed.
+            response.close()
 
-        root = ET.fromstring(response.content)
-        items = root.findall('.//item')
-        articles: list[NewsArticle] = []
+        self._store(query, articles, limit, response.headers)
+        return articles
+
+    async def afetch(self, keywords: str, area: str = '', limit: int = 5, timeout: float = 10) -> list[NewsArticle]:
+        """`fetch` on the event loop; shares the feed cache with it and raises `httpx.HTTPError`."""
+        query = normalize_query(keywords, area)
+        if not query:
+            return []
+        cached, fresh = self._lookup(query, limit)
+        if fresh is not None:
+            return fresh
 
-        for item in items[:limit]:
-            articles.append(
-                NewsArticle(
-                    title=(item.findtext('title') or '').strip(),
-                    link=(item.findtext('link') or '').strip(),
-                    source=(item.findtext('source') or 'Google News').strip(),
-                    published_at=(item.findtext('pubDate') or '').strip(),
-                )
-            )
+        client = self._async_client or news_async_clients.get()
+        async with client.stream(
+            'GET',
+            self._feed_url(query),
+            headers=self._revalidation_headers(cached),
+            timeout=timeout,
+        ) as response:
+            if response.status_code == 304 and cached is not None:
+                return self._not_modified(query, cached, limit)
+            response.raise_for_status()
+            self.cache.record('misses')
 
+            if self.streaming:
+                articles = await self._aparse_stream(response, limit)
+            else:
+                articles = self._parse(await response.aread(), limit)
+
+        self._store(query, articles, limit, response.headers)
         return articles
 
+    def _lookup(self, query: str, limit: int) -> tuple[CachedFeed | None, list[NewsArticle] | None]:
+        """The cached entry worth revalidating, and its articles when it is still fresh."""
+        cached = self.cache.get(query)
+        if cached is not None and cached.limit < limit:
+            cached = None  # parsed too few items last time; needs a full fetch
+        if cached is not None and self.cache.is_fresh(cached):
+            self.cache.record('hits')
+            return cached, cached.articles[:limit]
+        return cached, None
+
+    @staticmethod
+    def _feed_url(query: str) -> str:
+        return f'https://news.google.com/rss/search?q={quote_plus(query)}&hl=en-US&gl=US&ceid=US:en'
+
+    @staticmethod
+    def _revalidation_headers(cached: CachedFeed | None) -> dict[str, str]:
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                headers['If-Modified-Since'] = cached.last_modified
+        return headers
+
+    def _not_modified(self, query: str, cached: CachedFeed, limit: int) -> list[NewsArticle]:
+        self.cache.record('not_modified')
+        self.cache.put(query, cached)
+        return cached.articles[:limit]
+
+    def _store(self, query: str, articles: list[NewsArticle], limit: int, headers) -> None:
+        self.cache.put(
+            query,
+            CachedFeed(
+                articles=articles,
+                limit=limit,
+                etag=headers.get('ETag', ''),
+                last_modified=headers.get('Last-Modified', ''),
+            ),
+        )
+
+    def _unique_queries(self, queries: list[tuple[str, str]]) -> dict[str, tuple[str, str]]:
+        unique: dict[str, tuple[str, str]] = {}
+        for keywords, area in queries:
+            unique.setdefault(normalize_query(keywords, area), (keywords, area))
+        unique.pop('', None)
+        return unique
+
+    def fetch_many(
+        self,
+        queries: list[tuple[str, str]],
+        limit: int = 5,
+        per_query_limit: int | None = None,
+        timeout: float | None = None,
+        max_workers: int | None = None,
+    ) -> list[NewsArticle]:
+        """Fetch several (keywords, area) queries concurrently and merge them, newest first.
+
+        Each query gets `timeout` seconds; slow or failing queries are skipped. The
+        first error is raised only when no query succeeded.
+        """
+        unique = self._unique_queries(queries)
+        if not unique:
+            return []
+
+        timeout = timeout or settings.NEWS_QUERY_TIMEOUT
+        workers = min(len(unique), max_workers or settings.NEWS_FETCH_CONCURRENCY)
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='news')
+        futures = {
+            executor.submit(self.fetch, keywords, area, per_query_limit or limit, timeout): query
+            for query, (keywords, area) in unique.items()
+        }
+        # Queries run in waves of `workers`, so the last wave starts after the earlier ones end.
+        done, pending = wait(futures, timeout=timeout * math.ceil(len(futures) / workers))
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        results = self._collect(futures, done, pending)
+        if not results:
+            raise requests.Timeout(f'No news query finished within {timeout}s')
+        return merge_articles(results, limit)
+
+    async def afetch_many(
+        self,
+        queries: list[tuple[str, str]],
+        limit: int = 5,
+        per_query_limit: int | None = None,
+        timeout: float | None = None,
+        max_workers: int | None = None,
+    ) -> list[NewsArticle]:
+        """`fetch_many` on the event loop; at most `max_workers` queries are in flight at once."""
+        unique = self._unique_queries(queries)
+        if not unique:
+            return []
+
+        timeout = timeout or settings.NEWS_QUERY_TIMEOUT
+        workers = min(len(unique), max_workers or settings.NEWS_FETCH_CONCURRENCY)
+        slots = asyncio.Semaphore(workers)
+
+        async def fetch_one(keywords: str, area: str) -> list[NewsArticle]:
+            async with slots:
+                return await self.afetch(keywords, area, per_query_limit or limit, timeout)
+
+        tasks = {
+            asyncio.ensure_future(fetch_one(keywords, area)): query
+            for query, (keywords, area) in unique.items()
+        }
+        done, pending = await asyncio.wait(tasks, timeout=timeout * math.ceil(len(tasks) / workers))
+        for task in pending:
+            task.cancel()
+
+        results = self._collect(tasks, done, pending)
+        if not results:
+            raise httpx.TimeoutException(f'No news query finished within {timeout}s')
+        return merge_articles(results, limit)
+
+    @staticmethod
+    def _collect(queries: dict, done, pending) -> list[list[NewsArticle]]:
+        """Results of the finished futures or tasks; re-raises the first error if none succeeded."""
+        results: list[list[NewsArticle]] = []
+        errors: list[BaseException] = []
+        for item in done:
+            try:
+                results.append(item.result())
+            except Exception as exc:  # noqa: BLE001 - one bad query must not sink the rest
+                logger.warning('News query failed', extra={'query': queries[item], 'error': str(exc)})
+                errors.append(exc)
+        if pending:
+            logger.warning('News queries timed out', extra={'queries': sorted(queries[item] for item in pending)})
+        if not results and errors:
+            raise errors[0]
+        return results
+
+    @staticmethod
+    def _article(item: ET.Element) -> NewsArticle:
+        return NewsArticle(
+            title=(item.findtext('title') or '').strip(),
+            link=(item.findtext('link') or '').strip(),
+            source=(item.findtext('source') or 'Google News').strip(),
+            published_at=(item.findtext('pubDate') or '').strip(),
+        )
+
+    @classmethod
+    def _parse(cls, content: bytes, limit: int) -> list[NewsArticle]:
+        root = ET.fromstring(content)
+        return [cls._article(item) for item in root.findall('.//item')[:limit]]
+
+    @classmethod
+    def _parse_stream(cls, raw, limit: int) -> list[NewsArticle]:
+        """Parse `<item>`s as they arrive and stop reading once `limit` are collected."""
+        if hasattr(raw, 'decode_content'):
+            raw.decode_content = True  # let urllib3 undo gzip/deflate transfer encoding
+        items = _FeedItems(limit)
+        if limit > 0:
+            items.consume(ET.iterparse(raw, events=('start', 'end')))
+        return items.articles
+
+    @classmethod
+    async def _aparse_stream(cls, response: httpx.Response, limit: int) -> list[NewsArticle]:
+        items = _FeedItems(limit)
+        if limit <= 0:
+            return items.articles
+        parser = ET.XMLPullParser(events=('start', 'end'))
+        async for chunk in response.aiter_bytes():
+            parser.feed(chunk)
+            if items.consume(parser.read_events()):
+                break
+        return items.articles
+
 
 class OpenAIContentStudio:
-    def __init__(self):
+    def __init__(self, cache: AIResponseStore | None = None, async_client: httpx.AsyncClient | None = None):
         self.api_key = settings.OPENAI_API_KEY
         self.chat_model = settings.OPENAI_CHAT_MODEL
         self.image_model = settings.OPENAI_IMAGE_MODEL
+        self.cache = cache if cache is not None else (AIResponseStore() if settings.AI_CACHE_ENABLED else None)
+        self._async_client = async_client
+
+    def _post(self, kind: str, url: str, body: dict, timeout: int, use_cache: bool = True) -> dict:
+        """POST to OpenAI, answering identical requests from the response cache."""
+        key = cache_key(kind, url, body) if self.cache is not None else ''
+        if key and use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = requests.post(url, headers=self._headers(), json=body, timeout=timeout)
+        response.raise_for_status()
+        payload = response.json()
+        if key:
+            self.cache.put(key, kind, payload)
+        return payload
+
+    async def _apost(self, kind: str, url: str, body: dict, timeout: int, use_cache: bool = True) -> dict:
+        """`_post` on the event loop; raises `httpx.HTTPError`."""
+        key = cache_key(kind, url, body) if self.cache is not None else ''
+        if key and use_cache:
+            cached = await sync_to_async(self.cache.get)(key)
+            if cached is not None:
+                return cached
+
+        response = await self._aclient().post(url, headers=self._headers(), json=body, timeout=timeout)
+        response.raise_for_status()
+        payload = response.json()
+        if key:
+            await sync_to_async(self.cache.put)(key, kind, payload)
+        return payload
+
+    def _aclient(self) -> httpx.AsyncClient:
+        return self._async_client or openai_async_clients.get()
+
+    def _headers(self) -> dict[str, str]:
+        return {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json',
+        }
 
     def compose_post(
         self,
@@ -57,10 +486,106 @@ class OpenAIContentStudio:
         area: str,
         business_perspective: str,
         articles: list[NewsArticle],
+        use_cache: bool = True,
     ) -> dict:
         if not self.api_key:
             return self._fallback_copy(keywords, area, business_perspective, articles)
 
+        payload = self._post(
+            'chat',
+            CHAT_COMPLETIONS_URL,
+            self._chat_body(keywords, area, business_perspective, articles),
+            timeout=30,
+            use_cache=use_cache,
+        )
+        return self.parse_copy(payload['choices'][0]['message']['content'])
+
+    async def acompose_post(
+        self,
+        keywords: str,
+        area: str,
+        business_perspective: str,
+        articles: list[NewsArticle],
+        use_cache: bool = True,
+    ) -> dict:
+        if not self.api_key:
+            return self._fallback_copy(keywords, area, business_perspective, articles)
+
+        payload = await self._apost(
+            'chat',
+            CHAT_COMPLETIONS_URL,
+            self._chat_body(keywords, area, business_perspective, articles),
+            timeout=30,
+            use_cache=use_cache,
+        )
+        return self.parse_copy(payload['choices'][0]['message']['content'])
+
+    async def astream_compose(
+        self,
+        keywords: str,
+        area: str,
+        business_perspective: str,
+        articles: list[NewsArticle],
+        use_cache: bool = True,
+    ) -> AsyncIterator[str]:
+        """Yield the raw JSON copy as OpenAI streams it; pass the joined text to `parse_copy`.
+
+        Uses the same request body, and so the same cache entry, as `compose_post`. A cached
+        or fallback copy arrives as a single chunk. The copy is only cached once the stream
+        reached `[DONE]` untruncated and parses.
+        """
+        if not self.api_key:
+            yield json.dumps(self._fallback_copy(keywords, area, business_perspective, articles))
+            return
+
+        body = self._chat_body(keywords, area, business_perspective, articles)
+        key = cache_key('chat', CHAT_COMPLETIONS_URL, body) if self.cache is not None else ''
+        if key and use_cache:
+            cached = await sync_to_async(self.cache.get)(key)
+            if cached is not None:
+                yield cached['choices'][0]['message']['content']
+                return
+
+        parts: list[str] = []
+        complete = truncated = False
+        async with self._aclient().stream(
+            'POST',
+            CHAT_COMPLETIONS_URL,
+            headers=self._headers(),
+            json={**body, 'stream': True},
+            timeout=httpx.Timeout(30, connect=10),
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith('data:'):
+                    continue
+                data = line[5:].strip()
+                if data == '[DONE]':
+                    complete = True
+                    break
+                choices = json.loads(data).get('choices') or [{}]
+                if choices[0].get('finish_reason') == 'length':
+                    truncated = True
+                delta = (choices[0].get('delta') or {}).get('content')
+                if delta:
+                    parts.append(delta)
+                    yield delta
+
+        # `compose_post` reads this entry too, so only a finished stream with valid copy is cached.
+        content = ''.join(parts)
+        if key and complete and not truncated and self._valid_copy(content):
+            await sync_to_async(self.cache.put)(key, 'chat', {'choices': [{'message': {'content': content}}]})
+
+    @classmethod
+    def _valid_copy(cls, content: str) -> bool:
+        try:
+            cls.parse_copy(content)
+        except (ValueError, AttributeError):
+            logger.warning('Streamed copy is incomplete or not valid JSON; not caching it')
+            return False
+        return True
+
+    def _chat_body(self, keywords: str, area: str, business_perspective: str, articles: list[NewsArticle]) -> dict:
         headlines = '\n'.join(f'- {article.title}' for article in articles) or '- No headlines available'
         system_prompt = (
             'You are a social media strategist. Write concise, positive social content from a business perspective. '
@@ -72,58 +597,46 @@ class OpenAIContentStudio:
             f'Business perspective: {business_perspective}\n'
             f'Headlines:\n{headlines}'
         )
+        return {
+            'model': self.chat_model,
+            'response_format': {'type': 'json_object'},
+            'messages': [
+                {'role': 'system', 'content': system_prompt},
+                {'role': 'user', 'content': user_prompt},
+            ],
+            'temperature': 0.7,
+        }
 
-        response = requests.post(
-            'https://api.openai.com/v1/chat/completions',
-            headers={
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json',
-            },
-            json={
-                'model': self.chat_model,
-                'response_format': {'type': 'json_object'},
-                'messages': [
-                    {'role': 'system', 'content': system_prompt},
-                    {'role': 'user', 'content': user_prompt},
-                ],
-                'temperature': 0.7,
-            },
-            timeout=30,
-        )
-        response.raise_for_status()
-        payload = response.json()
-        content = payload['choices'][0]['message']['content']
+    @staticmethod
+    def parse_copy(content: str) -> dict:
         data = json.loads(content)
-
         return {
             'title': (data.get('title') or '').strip(),
             'message': (data.get('message') or '').strip(),
             'image_prompt': (data.get('image_prompt') or '').strip(),
         }
 
-    def generate_image(self, image_prompt: str) -> str:
-        if not image_prompt:
-            return ''
-        if not self.api_key:
+    def generate_image(self, image_prompt: str, use_cache: bool = True) -> str:
+        if not image_prompt or not self.api_key:
             return ''
+        payload = self._post('image', IMAGE_GENERATIONS_URL, self._image_body(image_prompt), timeout=45, use_cache=use_cache)
+        return payload.get('data', [{}])[0].get('url', '')
 
-        response = requests.post(
-            'https://api.openai.com/v1/images/generations',
-            headers={
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json',
-            },
-            json={
-                'model': self.image_model,
-                'prompt': image_prompt,
-                'size': '1024x1024',
-            },
-            timeout=45,
+    async def agenerate_image(self, image_prompt: str, use_cache: bool = True) -> str:
+        if not image_prompt or not self.api_key:
+            return ''
+        payload = await self._apost(
+            'image', IMAGE_GENERATIONS_URL, self._image_body(image_prompt), timeout=45, use_cache=use_cache
         )
-        response.raise_for_status()
-        payload = response.json()
         return payload.get('data', [{}])[0].get('url', '')
 
+    def _image_body(self, image_prompt: str) -> dict:
+        return {
+            'model': self.image_model,
+            'prompt': image_prompt,
+            'size': '1024x1024',
+        }
+
     def _fallback_copy(
         self,
         keywords: str,
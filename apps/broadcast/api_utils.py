@@ -6,6 +6,7 @@ from typing import Any
 
 from django.http import HttpRequest, JsonResponse
 
+from .audit import get_audit_sink
 from .models import AuditLog
 
 logger = logging.getLogger(__name__)
@@ -37,10 +38,12 @@ def db_error_response(request: HttpRequest, *, action: str, exc: Exception) -> J
 
 def log_audit(*, request: HttpRequest, action: str, entity: str, entity_id: int, changes: dict[str, Any] | None = None) -> None:
     actor = request.user if getattr(request, 'user', None) and request.user.is_authenticated else None
-    AuditLog.objects.create(
-        actor=actor,
-        action=action,
-        entity=entity,
-        entity_id=entity_id,
-        changes=changes or {},
+    get_audit_sink().write(
+        AuditLog(
+            actor=actor,
+            action=action,
+            entity=entity,
+            entity_id=entity_id,
+            changes=changes or {},
+        )
     )
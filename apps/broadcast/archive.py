@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterator
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models import Max
+
+from .models import AuditLog, DeliveryLog, MessageCampaign, SocialAccount
+from .rollups import rollup_watermark
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_MODELS: tuple[type[models.Model], ...] = (DeliveryLog, AuditLog)
+
+
+class _ArchiveEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder rounds datetimes to milliseconds; restored rows must match exactly.
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def archive_path(directory: Path, model: type[models.Model], day: date) -> Path:
+    return directory / model._meta.db_table / f'{day.isoformat()}.jsonl.gz'
+
+
+class LogArchiver:
+    """Moves delivery and audit logs older than a cutoff into gzip JSONL files, one per table and day.
+
+    Rows are read in primary-key order in chunks of `chunk_size`. Each chunk is appended
+    to its day files as a new gzip member and synced to disk, then that primary-key
+    range is deleted in its own short transaction, optionally pausing between chunks
+    so other writers get the database. A crash between the write and the delete
+    archives one chunk twice; `restore_campaign` skips rows that already exist.
+    """
+
+    def __init__(self, directory: str | Path | None = None, chunk_size: int | None = None, pause: float = 0.0):
+        self.directory = Path(directory or settings.ARCHIVE_DIR)
+        self.chunk_size = max(1, chunk_size or settings.ARCHIVE_CHUNK_SIZE)
+        self.pause = pause
+
+    def archive_all(self, cutoff: datetime) -> dict[str, int]:
+        return {model._meta.db_table: self.archive(model, cutoff) for model in ARCHIVED_MODELS}
+
+    def archive(self, model: type[models.Model], cutoff: datetime) -> int:
+        """Archive and delete every `model` row created before `cutoff`; returns the row count."""
+        old = model.objects.filter(created_at__lt=cutoff)
+        # Rows committed after this point are newer than the cutoff, so the range never grows.
+        last_pk = old.aggregate(last=Max('pk'))['last']
+        if model is DeliveryLog and last_pk is not None:
+            # Logs the analytics rollup has not counted yet stay until it has.
+            last_pk = min(last_pk, rollup_watermark()) or None
+        if last_pk is None:
+            return 0
+
+        fields = [field.attname for field in model._meta.concrete_fields]
+        archived, after = 0, 0
+        while True:
+            chunk = old.filter(pk__gt=after, pk__lte=last_pk).order_by('pk').values(*fields)[: self.chunk_size]
+            by_day: dict[date, list[str]] = defaultdict(list)
+            first = None
+            for row in chunk.iterator(chunk_size=self.chunk_size):
+                first = row['id'] if first is None else first
+                after = row['id']
+                by_day[row['created_at'].date()].append(json.dumps(row, cls=_ArchiveEncoder, separators=(',', ':')))
+            if first is None:
+                break
+
+            for day, lines in by_day.items():
+                self._append(archive_path(self.directory, model, day), lines)
+            with transaction.atomic():
+                old.filter(pk__gte=first, pk__lte=after).delete()
+            archived += sum(len(lines) for lines in by_day.values())
+            if self.pause:
+                time.sleep(self.pause)
+
+        logger.info('Logs archived', extra={'table': model._meta.db_table, 'rows': archived, 'cutoff': cutoff.isoformat()})
+        return archived
+
+    @staticmethod
+    def _append(path: Path, lines: list[str]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'ab') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='ab') as archive:
+                archive.write(''.join(f'{line}\n' for line in lines).encode())
+            raw.flush()
+            # The rows are deleted next; the archive must be on disk first.
+            os.fsync(raw.fileno())
+
+
+def read_archive(
+    directory: str | Path,
+    model: type[models.Model],
+    since: date | None = None,
+    until: date | None = None,
+) -> Iterator[dict]:
+    """Rows archived for `model`, day file by day file, optionally limited to a date range."""
+    for path in sorted((Path(directory) / model._meta.db_table).glob('*.jsonl.gz')):
+        day = date.fromisoformat(path.name.split('.', 1)[0])
+        if (since and day < since) or (until and day > until):
+            continue
+        with gzip.open(path, 'rt', encoding='utf-8') as archive:
+            for line in archive:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def restore_campaign(
+    campaign_id: int,
+    directory: str | Path | None = None,
+    since: date | None = None,
+    until: date | None = None,
+    batch_size: int = 500,
+) -> dict[str, int]:
+    """Put a campaign's archived delivery and audit logs back, keeping their ids and timestamps.
+
+    Rows that are already in the database are left alone, so restoring twice is safe.
+    Deliveries for accounts that no longer exist are skipped. Delivery counters are
+    not touched: they were never decremented when the logs were archived.
+    """
+    if not MessageCampaign.objects.filter(pk=campaign_id).exists():
+        raise MessageCampaign.DoesNotExist(f'Campaign {campaign_id} does not exist')
+    directory = Path(directory or settings.ARCHIVE_DIR)
+    counts = {'deliveries': 0, 'audit_entries': 0, 'skipped': 0}
+
+    # Keyed by id: a chunk archived twice after a crash must not be inserted twice.
+    deliveries = list({
+        row['id']: row for row in read_archive(directory, DeliveryLog, since, until) if row['campaign_id'] == campaign_id
+    }.values())
+    account_ids = set(SocialAccount.objects.filter(id__in={row['account_id'] for row in deliveries}).values_list('id', flat=True))
+    restorable = [DeliveryLog(**row) for row in deliveries if row['account_id'] in account_ids]
+    counts['skipped'] = len(deliveries) - len(restorable)
+    counts['deliveries'] = _insert_missing(DeliveryLog, restorable, batch_size)
+
+    entries = list({
+        row['id']: row
+        for row in read_archive(directory, AuditLog, since, until)
+        if row['entity'] == 'MessageCampaign' and row['entity_id'] == campaign_id
+    }.values())
+    actor_ids = set(
+        get_user_model().objects.filter(id__in={row['actor_id'] for row in entries if row['actor_id']}).values_list('id', flat=True)
+    )
+    counts['audit_entries'] = _insert_missing(
+        AuditLog,
+        [AuditLog(**{**row, 'actor_id': row['actor_id'] if row['actor_id'] in actor_ids else None}) for row in entries],
+        batch_size,
+    )
+    return counts
+
+
+def _insert_missing(model: type[models.Model], objects: list[models.Model], batch_size: int) -> int:
+    inserted = 0
+    for start in range(0, len(objects), batch_size):
+        batch = objects[start : start + batch_size]
+        existing = set(model.objects.filter(pk__in=[obj.pk for obj in batch]).values_list('pk', flat=True))
+        missing = [obj for obj in batch if obj.pk not in existing]
+        with transaction.atomic():
+            model.objects.bulk_create(missing)
+        inserted += len(missing)
+    return inserted
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+from typing import Callable
+
+import httpx
+
+
+class LoopClients:
+    """One pooled `httpx.AsyncClient` per running event loop, built on first use.
+
+    httpx connections belong to the loop that opened them, so a client cannot be
+    shared across loops. Under ASGI there is one loop per worker, and every request
+    on it shares the same pool; a client goes away with its loop.
+    """
+
+    def __init__(self, factory: Callable[[], httpx.AsyncClient]):
+        self._factory = factory
+        self._clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None or client.is_closed:
+                client = self._clients[loop] = self._factory()
+            return client
+
+    async def aclose(self) -> None:
+        """Close the current loop's client, e.g. from an ASGI lifespan shutdown handler."""
+        with self._lock:
+            client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def clear(self) -> None:
+        """Forget every client; each is closed when its loop or the garbage collector drops it."""
+        with self._lock:
+            self._clients.clear()
+
+
+def is_ok(response) -> bool:
+    """`requests.Response.ok` for a requests or an httpx response."""
+    return response.status_code < 400
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+
+class SyncAuditSink:
+    """Writes every entry immediately; the default, and what tests rely on."""
+
+    def write(self, entry: AuditLog) -> None:
+        entry.save(force_insert=True)
+
+    def flush(self) -> int:
+        return 0
+
+    def close(self) -> None:
+        pass
+
+    def metrics(self) -> dict[str, int | str]:
+        return {'sink': 'sync'}
+
+
+class BufferedAuditSink:
+    """Queues entries in-process and writes them with `bulk_create` from a background thread.
+
+    A batch is written once `batch_size` entries are waiting or `flush_interval`
+    seconds have passed, and whatever is left is written at interpreter exit.
+    When the queue is full new entries are dropped and counted rather than
+    slowing requests down; watch `metrics()` to size `max_queue`.
+    """
+
+    def __init__(self, batch_size: int = 100, flush_interval: float = 1.0, max_queue: int = 10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue[AuditLog] = queue.Queue(maxsize=max_queue)
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        # `dropped` is bumped from request threads, the others from the flusher.
+        self._counter_lock = threading.Lock()
+        self.dropped = 0
+        self.flushed = 0
+        self.failed = 0
+        self._thread = threading.Thread(target=self._run, name='audit-sink', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, entry: AuditLog) -> None:
+        # Only queue entries whose surrounding transaction actually committed.
+        transaction.on_commit(lambda: self._enqueue(entry))
+
+    def _enqueue(self, entry: AuditLog) -> None:
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._counter_lock:
+                self.dropped += 1
+                dropped = self.dropped
+            logger.warning('Audit queue full, entry dropped', extra={'action': entry.action, 'dropped': dropped})
+            return
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns the number of entries written."""
+        written = 0
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                return written
+            written += self._write(batch)
+
+    def close(self) -> None:
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+
+    def metrics(self) -> dict[str, int | str]:
+        with self._counter_lock:
+            counters = {'dropped': self.dropped, 'flushed': self.flushed, 'failed': self.failed}
+        return {
+            'sink': 'buffered',
+            'queue_depth': self._queue.qsize(),
+            'queue_capacity': self._queue.maxsize,
+            **counters,
+        }
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._queue.qsize():
+                self.flush()
+                close_old_connections()
+
+    def _drain(self, limit: int) -> list[AuditLog]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: list[AuditLog]) -> int:
+        with self._write_lock:
+            try:
+                AuditLog.objects.bulk_create(batch)
+            except Exception:
+                with self._counter_lock:
+                    self.failed += len(batch)
+                logger.exception('Audit batch write failed', extra={'size': len(batch)})
+                return 0
+            with self._counter_lock:
+                self.flushed += len(batch)
+            return len(batch)
+
+
+_sink: SyncAuditSink | BufferedAuditSink | None = None
+_sink_lock = threading.Lock()
+
+
+def get_audit_sink() -> SyncAuditSink | BufferedAuditSink:
+    """The process-wide sink selected by `AUDIT_SINK`."""
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                if settings.AUDIT_SINK == 'buffered':
+                    _sink = BufferedAuditSink(
+                        batch_size=settings.AUDIT_BATCH_SIZE,
+                        flush_interval=settings.AUDIT_FLUSH_INTERVAL,
+                        max_queue=settings.AUDIT_MAX_QUEUE,
+                    )
+                else:
+                    _sink = SyncAuditSink()
+    return _sink
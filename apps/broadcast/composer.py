@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator
+
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections, transaction
+
+from .ai_services import NewsArticle, NewsScanner, OpenAIContentStudio
+from .constants import MAX_NEWS_QUERIES
+from .image_tasks import pending_image_task, schedule_image_generation
+from .models import MessageCampaign, SocialAccount
+from .providers import platforms_requiring_image
+from .services import MessageDispatcher
+from .streaming import STREAMED_FIELDS, JSONFieldStream, time_to_first_token
+from .validators import ValidationError, validate_ai_compose_payload
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_UNAVAILABLE = 'AI/news provider temporarily unavailable'
+NO_ACCOUNT_MATCH = 'No active account match for your selection'
+# What the news and OpenAI clients raise when a provider is down, sync and async.
+PROVIDER_ERRORS = (requests.RequestException, httpx.HTTPError)
+
+
+def news_queries(payload: dict) -> list[tuple[str, str]]:
+    """Every keyword variant crossed with every area, primary pair first."""
+    keywords = [payload['keywords'], *payload['keyword_variants']]
+    areas = [payload['area'], *payload['areas']]
+    queries = list(dict.fromkeys((keyword, area) for keyword in keywords for area in areas))
+    return queries[:MAX_NEWS_QUERIES]
+
+
+def fetch_articles(payload: dict, scanner: NewsScanner) -> list[NewsArticle]:
+    queries = news_queries(payload)
+    if len(queries) > 1:
+        return scanner.fetch_many(queries)
+    return scanner.fetch(keywords=payload['keywords'], area=payload['area'])
+
+
+async def afetch_articles(payload: dict, scanner: NewsScanner) -> list[NewsArticle]:
+    queries = news_queries(payload)
+    if len(queries) > 1:
+        return await scanner.afetch_many(queries)
+    return await scanner.afetch(keywords=payload['keywords'], area=payload['area'])
+
+
+def generate_campaign(payload: dict, scanner: NewsScanner, studio: OpenAIContentStudio) -> MessageCampaign:
+    """Scan news and write the copy for a validated AI compose payload; returns an unsaved campaign."""
+    articles = fetch_articles(payload, scanner)
+    generated = studio.compose_post(
+        keywords=payload['keywords'],
+        area=payload['area'],
+        business_perspective=payload['business_perspective'],
+        articles=articles,
+        use_cache=not payload['bypass_cache'],
+    )
+    return build_campaign(payload, articles, generated)
+
+
+async def agenerate_campaign(payload: dict, scanner: NewsScanner, studio: OpenAIContentStudio) -> MessageCampaign:
+    """`generate_campaign` on the event loop."""
+    articles = await afetch_articles(payload, scanner)
+    generated = await studio.acompose_post(
+        keywords=payload['keywords'],
+        area=payload['area'],
+        business_perspective=payload['business_perspective'],
+        articles=articles,
+        use_cache=not payload['bypass_cache'],
+    )
+    return build_campaign(payload, articles, generated)
+
+
+def build_campaign(payload: dict, articles: list[NewsArticle], generated: dict) -> MessageCampaign:
+    image_prompt = generated.get('image_prompt', '')
+    return MessageCampaign(
+        title=(generated.get('title') or f"{payload['keywords'].title()} update")[:200],
+        message=generated.get('message') or '',
+        source_type='ai_news',
+        task_mode=payload['task_mode'],
+        status='scheduled' if payload['send_at'] and payload['task_mode'] == 'automated' else 'draft',
+        send_at=payload['send_at'] if payload['task_mode'] == 'automated' else None,
+        metadata={
+            'keywords': payload['keywords'],
+            'area': payload['area'],
+            'keyword_variants': payload['keyword_variants'],
+            'areas': payload['areas'],
+            'business_perspective': payload['business_perspective'],
+            'articles': [article_summary(item) for item in articles],
+            'image_prompt': image_prompt,
+            **({'image_task': pending_image_task(use_cache=not payload['bypass_cache'])} if image_prompt else {}),
+        },
+    )
+
+
+def article_summary(article: NewsArticle) -> dict[str, str]:
+    return {
+        'title': article.title,
+        'link': article.link,
+        'source': article.source,
+        'published_at': article.published_at,
+    }
+
+
+def campaign_summary(campaign: MessageCampaign) -> dict[str, Any]:
+    return {
+        'campaign_id': campaign.id,
+        'status': campaign.status,
+        'title': campaign.title,
+        'message': campaign.message,
+        'image_url': campaign.image_url,
+        'task_mode': campaign.task_mode,
+        'articles': campaign.metadata.get('articles', []),
+    }
+
+
+def _autopost_filter(payload: dict):
+    if not (payload['autopost'] and payload['account_names'] and payload['platforms']):
+        return None
+    return SocialAccount.objects.filter(
+        is_active=True,
+        name__in=payload['account_names'],
+        platform__in=payload['platforms'],
+    )
+
+
+def autopost_accounts(payload: dict) -> list[SocialAccount] | None:
+    """Accounts to post to right away, or None when the payload does not ask for autopost."""
+    accounts = _autopost_filter(payload)
+    return None if accounts is None else list(accounts)
+
+
+async def aautopost_accounts(payload: dict) -> list[SocialAccount] | None:
+    accounts = _autopost_filter(payload)
+    return None if accounts is None else [account async for account in accounts]
+
+
+def publish_generated(campaign: MessageCampaign, payload: dict, accounts: list[SocialAccount] | None) -> dict[str, Any]:
+    """Dispatch and queue the image for a saved campaign; returns fields to add to its summary.
+
+    The image is generated in the background. Text platforms are posted right away;
+    photo-only platforms (Instagram, TikTok) are posted by the image task once the
+    image is ready.
+    """
+    result: dict[str, Any] = {}
+    post_now, after_image = _split_for_image(campaign, accounts or [])
+    if post_now:
+        result['stats'] = MessageDispatcher().dispatch_campaign(campaign, accounts=post_now)
+        result['status'] = campaign.status
+    result.update(_queue_image(campaign, payload, after_image))
+    return result
+
+
+async def apublish_generated(campaign: MessageCampaign, payload: dict, accounts: list[SocialAccount] | None) -> dict[str, Any]:
+    """`publish_generated` on the event loop."""
+    result: dict[str, Any] = {}
+    post_now, after_image = _split_for_image(campaign, accounts or [])
+    if post_now:
+        result['stats'] = await MessageDispatcher().adispatch_campaign(campaign, accounts=post_now)
+        result['status'] = campaign.status
+    result.update(await sync_to_async(_queue_image)(campaign, payload, after_image))
+    return result
+
+
+def _split_for_image(
+    campaign: MessageCampaign, accounts: list[SocialAccount]
+) -> tuple[list[SocialAccount], list[SocialAccount]]:
+    """(accounts to post now, accounts that need the image first)."""
+    if not campaign.metadata.get('image_prompt'):
+        return accounts, []
+    photo_only = platforms_requiring_image(account.platform for account in accounts)
+    return (
+        [account for account in accounts if account.platform not in photo_only],
+        [account for account in accounts if account.platform in photo_only],
+    )
+
+
+def _queue_image(campaign: MessageCampaign, payload: dict, after_image: list[SocialAccount]) -> dict[str, Any]:
+    image_prompt = campaign.metadata.get('image_prompt', '')
+    if not image_prompt:
+        return {}
+    result: dict[str, Any] = {}
+    dispatch_after_image = [account.id for account in after_image]
+    if dispatch_after_image:
+        result['dispatch'] = 'after_image'
+        # Saved before the task starts so `recover_image_tasks` can still post after a restart.
+        campaign.metadata['image_task']['dispatch_account_ids'] = dispatch_after_image
+        campaign.save(update_fields=['metadata', 'updated_at'])
+    schedule_image_generation(
+        campaign.id,
+        image_prompt,
+        use_cache=not payload['bypass_cache'],
+        dispatch_account_ids=dispatch_after_image,
+    )
+    result['image_task'] = campaign.metadata['image_task']
+    return result
+
+
+async def stream_campaign(
+    payload: dict,
+    scanner: NewsScanner,
+    studio: OpenAIContentStudio,
+) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+    """Compose a campaign and yield `(event, data)` pairs as the copy is written.
+
+    Yields `articles` once the news scan is done, `delta` for every chunk of title or
+    message text, a single `metrics` event with the time to first token, and `done`
+    with the saved campaign's summary. Provider and database errors propagate.
+    """
+    articles = await afetch_articles(payload, scanner)
+    yield 'articles', {'articles': [article_summary(item) for item in articles]}
+
+    fields = JSONFieldStream(STREAMED_FIELDS)
+    started = time.monotonic()
+    first_token = None
+    async for chunk in studio.astream_compose(
+        keywords=payload['keywords'],
+        area=payload['area'],
+        business_perspective=payload['business_perspective'],
+        articles=articles,
+        use_cache=not payload['bypass_cache'],
+    ):
+        for field, text in fields.feed(chunk):
+            if first_token is None:
+                first_token = time.monotonic() - started
+                time_to_first_token.record(first_token)
+                yield 'metrics', {'ttft_ms': round(first_token * 1000, 1)}
+            yield 'delta', {'field': field, 'text': text}
+
+    try:
+        generated = studio.parse_copy(fields.text)
+    except (ValueError, AttributeError):
+        logger.warning('Streamed copy is not a JSON object', extra={'raw': fields.text[:500]})
+        generated = {}
+    campaign = build_campaign(payload, articles, generated)
+    await campaign.asave()
+    summary = campaign_summary(campaign)
+    accounts = await aautopost_accounts(payload)
+    if accounts == []:
+        summary['dispatch_error'] = NO_ACCOUNT_MATCH
+    summary.update(await apublish_generated(campaign, payload, accounts))
+    yield 'done', summary
+
+
+def _generate_in_worker(payload: dict, scanner: NewsScanner, studio: OpenAIContentStudio) -> MessageCampaign:
+    try:
+        return generate_campaign(payload, scanner, studio)
+    finally:
+        # The OpenAI response cache may have opened a connection on this pool thread.
+        connections.close_all()
+
+
+def bulk_compose(
+    specs: list[dict],
+    scanner: NewsScanner | None = None,
+    studio: OpenAIContentStudio | None = None,
+    concurrency: int | None = None,
+) -> dict[str, dict[str, Any]]:
+    """Compose many campaigns at once and return a result or error per spec.
+
+    Results are keyed by each spec's optional `key`, else by its position. News scans
+    and OpenAI calls run on at most `concurrency` threads; every generated campaign is
+    then saved with one `bulk_create`.
+    """
+    keys = [str(spec.get('key') or index) if isinstance(spec, dict) else str(index) for index, spec in enumerate(specs)]
+    if len(set(keys)) != len(keys):
+        raise ValidationError('item keys must be unique')
+
+    scanner = scanner or NewsScanner()
+    studio = studio or OpenAIContentStudio()
+    results: dict[str, dict[str, Any]] = {}
+    payloads: dict[str, dict] = {}
+    for key, spec in zip(keys, specs):
+        try:
+            payloads[key] = validate_ai_compose_payload(spec if isinstance(spec, dict) else {})
+        except ValidationError as exc:
+            results[key] = {'ok': False, 'error': str(exc)}
+
+    campaigns: dict[str, MessageCampaign] = {}
+    if payloads:
+        workers = max(1, min(len(payloads), concurrency or settings.AI_BULK_CONCURRENCY))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ai-compose') as executor:
+            futures = {key: executor.submit(_generate_in_worker, payload, scanner, studio) for key, payload in payloads.items()}
+            for key, future in futures.items():
+                try:
+                    campaigns[key] = future.result()
+                except requests.RequestException:
+                    logger.exception('AI/news provider failed', extra={'key': key})
+                    results[key] = {'ok': False, 'error': PROVIDER_UNAVAILABLE}
+                except Exception:
+                    logger.exception('AI compose failed', extra={'key': key})
+                    results[key] = {'ok': False, 'error': 'Generation failed'}
+
+    with transaction.atomic():
+        MessageCampaign.objects.bulk_create(campaigns.values())
+
+    # Dispatch runs outside the transaction, like every other provider call.
+    for key, campaign in campaigns.items():
+        payload = payloads[key]
+        accounts = autopost_accounts(payload)
+        summary = campaign_summary(campaign)
+        if accounts == []:
+            summary['dispatch_error'] = NO_ACCOUNT_MATCH
+        summary.update(publish_generated(campaign, payload, accounts))
+        results[key] = {'ok': True, **summary}
+
+    return {key: results[key] for key in keys}
@@ -10,3 +10,10 @@ ALERT_CLASSES = {
 
 DEFAULT_PAGE_SIZE = 25
 MAX_PAGE_SIZE = 100
+
+MAX_NEWS_VARIANTS = 5
+MAX_NEWS_QUERIES = 10
+MAX_BULK_COMPOSE_ITEMS = 100
+
+DEFAULT_ANALYTICS_DAYS = 30
+MAX_ANALYTICS_DAYS = 366
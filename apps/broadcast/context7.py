@@ -1,12 +1,18 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import gzip
+import json
+from dataclasses import dataclass, field
 
 import requests
 from django.conf import settings
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+RETRIES = 3
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
 
 @dataclass
 class Context7Result:
@@ -15,6 +21,24 @@ class Context7Result:
     payload: dict
 
 
+@dataclass
+class Context7BatchResult:
+    """Outcome of `publish_events`; `accepted[i]` says whether event `i` went through."""
+
+    status_code: int
+    payload: dict
+    accepted: list[bool] = field(default_factory=list)
+    errors: dict[int, str] = field(default_factory=dict)
+
+    @property
+    def success(self) -> bool:
+        return bool(self.accepted) and all(self.accepted)
+
+    @property
+    def failed_indexes(self) -> list[int]:
+        return [index for index, ok in enumerate(self.accepted) if not ok]
+
+
 class Context7Client:
     """Lightweight wrapper to notify Context7 about campaign events."""
 
@@ -26,9 +50,9 @@ class Context7Client:
     def _build_session(self) -> requests.Session:
         session = requests.Session()
         retries = Retry(
-            total=3,
-            backoff_factor=0.5,
-            status_forcelist=[429, 500, 502, 503, 504],
+            total=RETRIES,
+            backoff_factor=BACKOFF_FACTOR,
+            status_forcelist=sorted(RETRY_STATUSES),
             allowed_methods={'POST'},
         )
         adapter = HTTPAdapter(max_retries=retries)
@@ -44,19 +68,92 @@ class Context7Client:
             response = self._session.post(
                 f'{self.base_url}/events',
                 json={'event': event_name, 'payload': payload},
-                headers={'Authorization': f'Bearer {self.api_key}'},
+                headers=self._headers(),
                 timeout=10,
             )
         except requests.RequestException as exc:
-            return Context7Result(
-                success=False,
-                status_code=0,
-                payload={'error': 'Request to Context7 failed', 'detail': str(exc)},
+            return self._request_failure(exc)
+        return Context7Result(success=response.ok, status_code=response.status_code, payload=self._json(response))
+
+    def publish_events(self, events: list[tuple[str, dict]]) -> Context7BatchResult:
+        """Send many events in one gzip-compressed request to `/events/batch`.
+
+        Context7 answers with `{"results": [{"accepted": bool, "error": str}, ...]}` in request
+        order. A 2xx response without `results` means every event was accepted; any other
+        response without them means none were.
+        """
+        if not events:
+            return Context7BatchResult(status_code=0, payload={})
+        if not self.api_key:
+            return self._batch_failure(len(events), 0, {'error': 'Missing CONTEXT7_API_KEY'})
+
+        try:
+            response = self._session.post(
+                f'{self.base_url}/events/batch',
+                data=self._batch_body(events),
+                headers=self._batch_headers(),
+                timeout=30,
             )
+        except requests.RequestException as exc:
+            return self._batch_failure(len(events), 0, self._request_failure(exc).payload)
+        return self._batch_result(response, len(events))
+
+    def _headers(self) -> dict[str, str]:
+        return {'Authorization': f'Bearer {self.api_key}'}
+
+    def _batch_headers(self) -> dict[str, str]:
+        return {**self._headers(), 'Content-Type': 'application/json', 'Content-Encoding': 'gzip'}
+
+    @staticmethod
+    def _batch_body(events: list[tuple[str, dict]]) -> bytes:
+        body = json.dumps(
+            {'events': [{'event': event_name, 'payload': payload} for event_name, payload in events]},
+            separators=(',', ':'),
+            default=str,
+        ).encode()
+        return gzip.compress(body)
+
+    def _batch_result(self, response: requests.Response, count: int) -> Context7BatchResult:
+        payload = self._json(response)
+        if not isinstance(payload, dict):
+            payload = {'data': payload}
+        results = payload.get('results')
+        if not isinstance(results, list) or len(results) != count:
+            if response.ok:
+                return Context7BatchResult(response.status_code, payload, accepted=[True] * count)
+            return self._batch_failure(count, response.status_code, payload)
+
+        accepted, errors = [], {}
+        for index, item in enumerate(results):
+            ok = bool(isinstance(item, dict) and item.get('accepted'))
+            accepted.append(ok)
+            if not ok:
+                errors[index] = str(item.get('error') if isinstance(item, dict) else item)[:500]
+        return Context7BatchResult(response.status_code, payload, accepted=accepted, errors=errors)
+
+    @staticmethod
+    def _request_failure(exc: Exception) -> Context7Result:
+        return Context7Result(
+            success=False,
+            status_code=0,
+            payload={'error': 'Request to Context7 failed', 'detail': str(exc)},
+        )
+
+    @staticmethod
+    def _batch_failure(count: int, status_code: int, payload: dict) -> Context7BatchResult:
+        error = str(payload.get('error') or payload)[:500]
+        return Context7BatchResult(
+            status_code,
+            payload,
+            accepted=[False] * count,
+            errors={index: error for index in range(count)},
+        )
 
+    @staticmethod
+    def _json(response: requests.Response):
         try:
             body = response.json() if response.content else {}
         except ValueError:
             body = {'error': 'Invalid JSON response from Context7', 'raw_body': response.text[:500]}
+        return body
 
-        return Context7Result(success=response.ok, status_code=response.status_code, payload=body)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, Iterable
+
+from django.db.models import F, Max, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import CampaignDeliveryStats, DeliveryLog
+
+
+def ensure_counters(campaign_id: int, platforms: Iterable[str]) -> None:
+    """Create the zeroed counter rows a dispatch will increment, so batches only ever UPDATE."""
+    CampaignDeliveryStats.objects.bulk_create(
+        [CampaignDeliveryStats(campaign_id=campaign_id, platform=platform) for platform in sorted(set(platforms))],
+        ignore_conflicts=True,
+    )
+
+
+def record_deliveries(deliveries: list[DeliveryLog]) -> None:
+    """Fold a batch of delivery logs into the counters; call in the transaction that inserts them, before the insert.
+
+    The counters describe each account's latest outcome. A first delivery adds the
+    account to `sent` or `failed`; a re-send (a resumed dispatch, a job retry or a
+    delivery retry) moves it between the two when the outcome changed, and leaves
+    them alone otherwise. Every (campaign, platform) pair that changed costs one
+    `F()` update, so concurrent dispatchers of the same campaign never lose counts.
+    """
+    previous = _previous_outcomes(deliveries)
+    sent: Counter[tuple[int, str]] = Counter()
+    failed: Counter[tuple[int, str]] = Counter()
+    for delivery in deliveries:
+        key = (delivery.campaign_id, delivery.account.platform)
+        account_key = (delivery.campaign_id, delivery.account_id)
+        before = previous.get(account_key)
+        if before is None:
+            (sent if delivery.success else failed)[key] += 1
+        elif before != delivery.success:
+            (sent if delivery.success else failed)[key] += 1
+            (failed if delivery.success else sent)[key] -= 1
+        previous[account_key] = delivery.success
+
+    now = timezone.now()
+    for key in sorted(key for key in sent.keys() | failed.keys() if sent[key] or failed[key]):
+        campaign_id, platform = key
+        changes = {
+            'sent': Greatest(F('sent') + sent[key], Value(0)),
+            'failed': Greatest(F('failed') + failed[key], Value(0)),
+            'updated_at': now,
+        }
+        counters = CampaignDeliveryStats.objects.filter(campaign_id=campaign_id, platform=platform)
+        if not counters.update(**changes):
+            ensure_counters(campaign_id, [platform])
+            counters.update(**changes)
+
+
+def _previous_outcomes(deliveries: list[DeliveryLog]) -> dict[tuple[int, int], bool]:
+    """(campaign id, account id) -> success of the latest stored delivery before this batch.
+
+    Accounts whose earlier logs were archived count as delivered for the first time.
+    """
+    latest = (
+        DeliveryLog.objects.filter(
+            campaign_id__in={delivery.campaign_id for delivery in deliveries},
+            account_id__in={delivery.account_id for delivery in deliveries},
+        )
+        .order_by()
+        .values('campaign_id', 'account_id')
+        .annotate(last_id=Max('id'))
+        .values('last_id')
+    )
+    return {
+        (campaign_id, account_id): success
+        for campaign_id, account_id, success in DeliveryLog.objects.filter(id__in=latest).values_list(
+            'campaign_id', 'account_id', 'success'
+        )
+    }
+
+
+def campaign_stats(campaign_id: int) -> dict[str, Any]:
+    """Totals and per-platform counts for a campaign, read from at most one row per platform."""
+    platforms: dict[str, dict[str, int]] = {}
+    updated_at = None
+    rows = CampaignDeliveryStats.objects.filter(campaign_id=campaign_id).order_by('platform')
+    for platform, sent, failed, row_updated_at in rows.values_list('platform', 'sent', 'failed', 'updated_at'):
+        platforms[platform] = {'total': sent + failed, 'sent': sent, 'failed': failed}
+        if updated_at is None or row_updated_at > updated_at:
+            updated_at = row_updated_at
+    return {
+        'total': sum(counts['total'] for counts in platforms.values()),
+        'sent': sum(counts['sent'] for counts in platforms.values()),
+        'failed': sum(counts['failed'] for counts in platforms.values()),
+        'platforms': platforms,
+        'updated_at': updated_at.isoformat() if updated_at else None,
+    }
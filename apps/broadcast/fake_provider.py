@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    """Answers every POST with a response shaped like all supported platform APIs."""
+
+    protocol_version = 'HTTP/1.1'
+    server: FakeProviderServer
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+
+        self.server.record_request(self.client_address)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if self.server.should_fail():
+            headers = {}
+            if self.server.retry_after is not None:
+                headers['Retry-After'] = f'{self.server.retry_after:g}'
+            self._send_json(
+                self.server.error_status,
+                {'error': {'message': 'Injected provider failure'}},
+                headers=headers,
+            )
+            return
+
+        message_id = uuid.uuid4().hex
+        self._send_json(
+            201,
+            {'id': message_id, 'post_id': message_id, 'data': {'id': message_id, 'publish_id': message_id}},
+            headers={'x-restli-id': message_id},
+        )
+
+    def _send_json(self, status: int, body: dict, headers: dict[str, str] | None = None) -> None:
+        encoded = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(encoded)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, format, *args):
+        return
+
+
+class FakeProviderServer(ThreadingHTTPServer):
+    """Local stand-in for provider APIs with configurable latency and error rate."""
+
+    daemon_threads = True
+    # socketserver's default backlog of 5 resets connections from highly concurrent clients.
+    request_queue_size = 256
+
+    def __init__(
+        self,
+        address: tuple[str, int] = ('127.0.0.1', 0),
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        retry_after: float | None = None,
+        seed: int | None = None,
+    ):
+        super().__init__(address, FakeProviderHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.request_count = 0
+        self.connections: set[tuple[str, int]] = set()
+        self._random = random.Random(seed)
+        self._stats_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def record_request(self, client_address: tuple[str, int]) -> None:
+        with self._stats_lock:
+            self.request_count += 1
+            self.connections.add(client_address)
+
+    def should_fail(self) -> bool:
+        with self._stats_lock:
+            return self._random.random() < self.error_rate
+
+    def start_in_thread(self) -> threading.Thread:
+        thread = threading.Thread(
+            target=self.serve_forever,
+            kwargs={'poll_interval': 0.05},
+            name='fake-provider',
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .ai_services import OpenAIContentStudio
+from .models import MessageCampaign, SocialAccount
+from .providers import platforms_requiring_image
+from .services import MessageDispatcher
+
+logger = logging.getLogger(__name__)
+
+OPEN_STATES = ('pending', 'running')
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.IMAGE_TASK_WORKERS, thread_name_prefix='image-task')
+    return _executor
+
+
+def pending_image_task(use_cache: bool = True) -> dict:
+    """Initial `metadata['image_task']` for a campaign whose image is generated later."""
+    return {'state': 'pending', 'queued_at': timezone.now().isoformat(), 'use_cache': use_cache}
+
+
+def schedule_image_generation(
+    campaign_id: int,
+    image_prompt: str,
+    use_cache: bool = True,
+    dispatch_account_ids: list[int] | None = None,
+) -> None:
+    """Generate the campaign image in the background once the current transaction commits.
+
+    With `dispatch_account_ids`, the campaign is dispatched to those accounts after the
+    image is ready. Tasks lost with the process are picked up by `recover_image_tasks`.
+    """
+    transaction.on_commit(
+        lambda: _get_executor().submit(_run_in_worker, campaign_id, image_prompt, use_cache, dispatch_account_ids)
+    )
+
+
+def _run_in_worker(campaign_id: int, *args) -> str:
+    try:
+        return run_image_task(campaign_id, *args)
+    except Exception:
+        logger.exception('Image task crashed', extra={'campaign_id': campaign_id})
+        raise
+    finally:
+        close_old_connections()
+
+
+def _update_task(campaign_id: int, image_url: str | None = None, **changes) -> MessageCampaign | None:
+    with transaction.atomic():
+        campaign = MessageCampaign.objects.select_for_update().filter(pk=campaign_id).first()
+        if campaign is None:
+            return None
+        metadata = dict(campaign.metadata or {})
+        metadata['image_task'] = {**metadata.get('image_task', {}), **changes}
+        campaign.metadata = metadata
+        update_fields = ['metadata', 'updated_at']
+        if image_url is not None:
+            campaign.image_url = image_url
+            update_fields.append('image_url')
+        campaign.save(update_fields=update_fields)
+        return campaign
+
+
+def run_image_task(
+    campaign_id: int,
+    image_prompt: str,
+    use_cache: bool = True,
+    dispatch_account_ids: list[int] | None = None,
+    studio: OpenAIContentStudio | None = None,
+) -> str:
+    """Generate and store the image, recording progress in `metadata['image_task']`; returns the final state.
+
+    Any error marks the task `failed`. Accounts waiting for the image are then posted to
+    without it; those on platforms that cannot post without one get a failed delivery log.
+    """
+    try:
+        _update_task(campaign_id, state='running', started_at=timezone.now().isoformat())
+        image_url = (studio or OpenAIContentStudio()).generate_image(image_prompt, use_cache=use_cache)
+        campaign = _update_task(campaign_id, image_url=image_url, state='succeeded', finished_at=timezone.now().isoformat())
+    except Exception as exc:
+        logger.exception('Image generation failed', extra={'campaign_id': campaign_id})
+        _record_failure(campaign_id, exc, dispatch_account_ids)
+        return 'failed'
+
+    if campaign is not None and dispatch_account_ids:
+        _dispatch(campaign, SocialAccount.objects.filter(id__in=dispatch_account_ids, is_active=True))
+    return 'succeeded'
+
+
+def _record_failure(campaign_id: int, exc: Exception, dispatch_account_ids: list[int] | None) -> None:
+    try:
+        campaign = _update_task(
+            campaign_id,
+            state='failed',
+            error=str(exc)[:500] or exc.__class__.__name__,
+            finished_at=timezone.now().isoformat(),
+        )
+        if campaign is None or not dispatch_account_ids:
+            return
+        accounts = SocialAccount.objects.filter(id__in=dispatch_account_ids, is_active=True)
+        photo_only = platforms_requiring_image(accounts.values_list('platform', flat=True))
+        text_accounts = accounts.exclude(platform__in=photo_only)
+        if text_accounts.exists():
+            _dispatch(campaign, text_accounts)
+        else:
+            _update_task(campaign_id, dispatch='skipped: image unavailable')
+        if photo_only:
+            # Logged as failed deliveries so stats, rollups and retries see the accounts that got nothing.
+            MessageDispatcher().record_undeliverable(
+                campaign, accounts.filter(platform__in=photo_only), 'Image generation failed; this platform needs an image'
+            )
+    except Exception:
+        # Left `running`; `recover_image_tasks` retries it once it is stale.
+        logger.exception('Could not record image task failure', extra={'campaign_id': campaign_id})
+
+
+def _dispatch(campaign: MessageCampaign, accounts) -> None:
+    try:
+        # A recovered task may follow a partial dispatch; never post to an account twice.
+        stats = MessageDispatcher().dispatch_campaign(campaign, accounts=accounts, exclude_delivered=True)
+    except Exception as exc:
+        logger.exception('Dispatch after image task failed', extra={'campaign_id': campaign.id})
+        _update_task(campaign.id, dispatch=f'failed: {exc}'[:500])
+        return
+    _update_task(campaign.id, dispatch=stats)
+
+
+def recover_image_tasks(stale_after: timedelta | None = None) -> int:
+    """Run image tasks left `pending` or `running` for longer than `stale_after`; returns how many.
+
+    Tasks live in an in-process thread pool, so a restarted web worker drops them. Their
+    arguments are kept in `metadata`, which lets this re-run them, including the dispatch
+    that was waiting for the image. Run it periodically, e.g. from cron.
+    """
+    stale_after = stale_after or timedelta(seconds=settings.IMAGE_TASK_STALE_SECONDS)
+    cutoff = timezone.now() - stale_after
+    candidates = MessageCampaign.objects.filter(metadata__image_task__state__in=OPEN_STATES).values_list('id', flat=True)
+    recovered = 0
+    for campaign_id in list(candidates):
+        task = _claim_stale(campaign_id, cutoff)
+        if task is None:
+            continue
+        image_prompt, task = task
+        logger.warning('Recovering stale image task', extra={'campaign_id': campaign_id, 'recoveries': task['recoveries']})
+        run_image_task(campaign_id, image_prompt, task.get('use_cache', True), task.get('dispatch_account_ids') or None)
+        recovered += 1
+    return recovered
+
+
+def _claim_stale(campaign_id: int, cutoff: datetime) -> tuple[str, dict] | None:
+    """Restart the clock on a stale open task so concurrent recoveries run it only once."""
+    with transaction.atomic():
+        campaign = MessageCampaign.objects.select_for_update().filter(pk=campaign_id).first()
+        task = ((campaign.metadata or {}).get('image_task') or {}) if campaign is not None else {}
+        if task.get('state') not in OPEN_STATES:
+            return None
+        touched = task.get('started_at') or task.get('queued_at')
+        if touched and datetime.fromisoformat(touched) > cutoff:
+            return None
+        task = {**task, 'state': 'running', 'started_at': timezone.now().isoformat(), 'recoveries': task.get('recoveries', 0) + 1}
+        campaign.metadata = {**campaign.metadata, 'image_task': task}
+        campaign.save(update_fields=['metadata', 'updated_at'])
+        return campaign.metadata.get('image_prompt', ''), task
+
+
+def wait_for_pending_tasks() -> None:
+    """Block until queued image tasks finish; for management commands and tests."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
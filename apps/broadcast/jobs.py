@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import timedelta
+from typing import Any
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import DispatchJob, MessageCampaign, SocialAccount
+from .services import Heartbeat, LeaseLost, MessageDispatcher, default_worker_id
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_DELAY = timedelta(minutes=5)
+
+
+def enqueue_dispatch(campaign: MessageCampaign, accounts: list[SocialAccount] | None = None) -> DispatchJob:
+    """Queue a send of `campaign` to `accounts` (default: every active account).
+
+    A campaign has at most one queued or running job; asking again returns that job
+    instead of sending the campaign twice.
+    """
+    if accounts is None:
+        account_ids, total = None, SocialAccount.objects.filter(is_active=True).count()
+    else:
+        account_ids, total = [account.id for account in accounts], len(accounts)
+    try:
+        with transaction.atomic():
+            return DispatchJob.objects.create(campaign=campaign, account_ids=account_ids, total=total)
+    except IntegrityError:
+        job = DispatchJob.objects.filter(campaign=campaign, status__in=DispatchJob.ACTIVE_STATUSES).first()
+        if job is None:
+            raise  # the live job finished in between; let the caller retry
+        return job
+
+
+def _claimable(now) -> Q:
+    # Due queued jobs, plus running jobs whose worker stopped renewing its lock.
+    return Q(status='queued', available_at__lte=now) | Q(status='running', locked_until__lt=now)
+
+
+def claim_job(job_id: int, owner: str, lease_seconds: int | None = None) -> DispatchJob | None:
+    """Atomically move one claimable job to `running` under `owner`, like `claim_campaign`."""
+    now = timezone.now()
+    lease_seconds = lease_seconds or settings.DISPATCH_LEASE_SECONDS
+    claimed = DispatchJob.objects.filter(_claimable(now), pk=job_id).update(
+        status='running',
+        locked_by=owner,
+        locked_until=now + timedelta(seconds=lease_seconds),
+        attempts=F('attempts') + 1,
+        started_at=now,
+    )
+    if not claimed:
+        return None
+    return DispatchJob.objects.select_related('campaign').get(pk=job_id)
+
+
+def claim_next_job(owner: str, lease_seconds: int | None = None, candidates: int = 10) -> DispatchJob | None:
+    """Claim the oldest due job, falling back to jobs abandoned by a crashed worker.
+
+    Each lookup reads one of the partial indexes on `DispatchJob`, so polling an idle
+    queue costs two index probes no matter how many finished jobs the table holds.
+    """
+    now = timezone.now()
+    lookups = (
+        DispatchJob.objects.filter(status='queued', available_at__lte=now).order_by('available_at', 'id'),
+        DispatchJob.objects.filter(status='running', locked_until__lt=now).order_by('locked_until'),
+    )
+    for queryset in lookups:
+        for job_id in queryset.values_list('id', flat=True)[:candidates]:
+            job = claim_job(job_id, owner, lease_seconds)
+            if job is not None:
+                return job
+    return None
+
+
+def run_job(
+    job: DispatchJob,
+    dispatcher: MessageDispatcher | None = None,
+    max_attempts: int | None = None,
+    lease_seconds: int | None = None,
+) -> str:
+    """Dispatch a claimed job, recording progress on the job row; returns its new status.
+
+    A retried job skips accounts that already have a successful delivery. The lock is
+    renewed by a heartbeat thread; if another worker has taken the job over, the
+    dispatch stops and the row is left to that worker. When the dispatch raises, the
+    job is queued again with exponential backoff until it has used `max_attempts`,
+    then marked failed.
+    """
+    dispatcher = dispatcher or MessageDispatcher()
+    max_attempts = max_attempts or settings.DISPATCH_JOB_MAX_ATTEMPTS
+    lease_seconds = lease_seconds or settings.DISPATCH_LEASE_SECONDS
+    owned = DispatchJob.objects.filter(pk=job.pk, locked_by=job.locked_by)
+    if job.attempts > max_attempts:
+        # Claimed back from a worker that kept dying mid-dispatch.
+        return _fail(owned, job, job.error or 'Worker lost its lock too many times')
+
+    retry = job.attempts > 1
+    already_sent = job.sent if retry else 0
+
+    def progress(stats: dict) -> None:
+        job.total = already_sent + stats['total']
+        job.sent = already_sent + stats['sent']
+        job.failed = stats['failed']
+        if not owned.update(
+            total=job.total,
+            sent=job.sent,
+            failed=job.failed,
+            locked_until=timezone.now() + timedelta(seconds=lease_seconds),
+        ):
+            raise LeaseLost(f'Dispatch job {job.pk} was taken over')
+
+    def renew() -> bool:
+        return bool(owned.update(locked_until=timezone.now() + timedelta(seconds=lease_seconds)))
+
+    accounts = None
+    if job.account_ids is not None:
+        accounts = SocialAccount.objects.filter(id__in=job.account_ids, is_active=True)
+    heartbeat = Heartbeat(renew, lease_seconds / 3, name=f'dispatch-job-{job.pk}').start()
+    try:
+        dispatcher.dispatch_campaign(
+            job.campaign,
+            accounts=accounts,
+            exclude_delivered=retry,
+            progress=progress,
+            heartbeat=heartbeat,
+        )
+    except LeaseLost:
+        # Another worker reclaimed the job and now owns its row; leave it alone.
+        logger.warning('Dispatch job lock lost; stopping', extra={'job_id': job.pk, 'worker': job.locked_by})
+        return job.status
+    except Exception as exc:
+        logger.exception('Dispatch job failed', extra={'job_id': job.pk, 'attempts': job.attempts})
+        if job.attempts >= max_attempts:
+            return _fail(owned, job, str(exc))
+        delay = min(MAX_RETRY_DELAY, timedelta(seconds=2 ** job.attempts))
+        owned.update(
+            status='queued',
+            available_at=timezone.now() + delay,
+            locked_by='',
+            locked_until=None,
+            error=str(exc)[:1000],
+        )
+        job.status = 'queued'
+        return job.status
+    finally:
+        heartbeat.stop()
+
+    owned.update(status='completed', locked_by='', locked_until=None, finished_at=timezone.now())
+    job.status = 'completed'
+    return job.status
+
+
+def _fail(owned, job: DispatchJob, error: str) -> str:
+    owned.update(status='failed', locked_by='', locked_until=None, error=error[:1000], finished_at=timezone.now())
+    job.status = 'failed'
+    return job.status
+
+
+def job_summary(job: DispatchJob) -> dict[str, Any]:
+    return {
+        'job_id': job.id,
+        'campaign_id': job.campaign_id,
+        'status': job.status,
+        'total': job.total,
+        'queued': max(0, job.total - job.sent - job.failed),
+        'sent': job.sent,
+        'failed': job.failed,
+        'attempts': job.attempts,
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+class DispatchWorker:
+    """Long-running worker that claims dispatch jobs from the database and sends them.
+
+    Run as many `run_dispatch_worker` processes as the providers can take; jobs are
+    claimed with conditional UPDATEs, so workers never send the same job twice.
+    """
+
+    def __init__(
+        self,
+        dispatcher: MessageDispatcher | None = None,
+        worker_id: str = '',
+        poll_interval: float = 1.0,
+        max_attempts: int | None = None,
+    ):
+        self.dispatcher = dispatcher or MessageDispatcher()
+        self.worker_id = worker_id or default_worker_id()
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self) -> None:
+        while not self._stop.is_set():
+            close_old_connections()
+            try:
+                job = self.run_once()
+            except Exception:
+                logger.exception('Dispatch worker iteration failed')
+                job = None
+            if job is None:
+                self._stop.wait(self.poll_interval)
+
+    def run_once(self) -> DispatchJob | None:
+        """Claim and run one job; returns it, or None when the queue is empty."""
+        job = claim_next_job(self.worker_id)
+        if job is None:
+            return None
+        status = run_job(job, self.dispatcher, max_attempts=self.max_attempts)
+        logger.info(
+            'Dispatch job finished',
+            extra={'job_id': job.pk, 'campaign_id': job.campaign_id, 'status': status, 'sent': job.sent, 'failed': job.failed},
+        )
+        return job
@@ -0,0 +1,46 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.broadcast.composer import bulk_compose
+from apps.broadcast.image_tasks import wait_for_pending_tasks
+from apps.broadcast.validators import ValidationError
+
+
+class Command(BaseCommand):
+    help = 'Generate AI campaigns from a JSON list of compose specs (same fields as /api/campaigns/ai-compose/).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('specs', help='Path to a JSON file with a list of specs, or "-" for stdin.')
+        parser.add_argument('--concurrency', type=int, default=None, help='Specs generated at once.')
+
+    def handle(self, *args, **options):
+        try:
+            if options['specs'] == '-':
+                specs = json.load(sys.stdin)
+            else:
+                with open(options['specs'], encoding='utf-8') as handle:
+                    specs = json.load(handle)
+        except (OSError, json.JSONDecodeError) as exc:
+            raise CommandError(f'Could not read specs: {exc}') from exc
+        if isinstance(specs, dict):
+            specs = specs.get('items')
+        if not isinstance(specs, list) or not specs:
+            raise CommandError('Specs must be a non-empty JSON list (or an object with "items").')
+
+        try:
+            results = bulk_compose(specs, concurrency=options['concurrency'])
+        except ValidationError as exc:
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write('Waiting for image generation...')
+        wait_for_pending_tasks()
+
+        for key, result in results.items():
+            if result['ok']:
+                self.stdout.write(f"{key}: campaign {result['campaign_id']} ({result['status']}) {result['title']}")
+            else:
+                self.stderr.write(f"{key}: {result['error']}")
+        created = sum(1 for result in results.values() if result['ok'])
+        self.stdout.write(self.style.SUCCESS(f'Generated {created} of {len(results)} campaigns.'))
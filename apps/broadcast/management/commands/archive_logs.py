@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.broadcast.archive import LogArchiver
+from apps.broadcast.rollups import roll_up_deliveries
+
+
+class Command(BaseCommand):
+    help = 'Move delivery and audit logs older than the retention period into compressed JSONL archives.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days',
+            type=int,
+            default=None,
+            help='Archive rows older than this many days (default: ARCHIVE_RETENTION_DAYS).',
+        )
+        parser.add_argument('--dir', default=None, help='Archive directory (default: ARCHIVE_DIR).')
+        parser.add_argument('--chunk-size', type=int, default=None, help='Rows archived and deleted per transaction.')
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between chunks.')
+
+    def handle(self, *args, **options):
+        days = options['older_than_days'] if options['older_than_days'] is not None else settings.ARCHIVE_RETENTION_DAYS
+        cutoff = timezone.now() - timedelta(days=days)
+        archiver = LogArchiver(directory=options['dir'], chunk_size=options['chunk_size'], pause=options['pause'])
+
+        # Delivery logs are only archived once the analytics rollup has counted them.
+        rolled_up = roll_up_deliveries()
+        if rolled_up:
+            self.stdout.write(f'{rolled_up} delivery log(s) rolled up first')
+        for table, rows in archiver.archive_all(cutoff).items():
+            self.stdout.write(f'{table}: {rows} row(s) archived')
+        self.stdout.write(self.style.SUCCESS(f'Archived logs older than {cutoff:%Y-%m-%d %H:%M} to {archiver.directory}'))
@@ -1,21 +1,32 @@
 from django.core.management.base import BaseCommand
-from django.utils import timezone
 
-from apps.broadcast.models import MessageCampaign
-from apps.broadcast.services import MessageDispatcher
+from apps.broadcast.services import LeaseLost, MessageDispatcher, claim_next_due_campaign, default_worker_id
 
 
 class Command(BaseCommand):
-    help = 'Dispatch campaigns that are scheduled and ready to send.'
+    help = 'Dispatch campaigns that are scheduled and ready to send. Safe to run as several parallel workers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--worker-id', default='', help='Lease owner name (default: hostname:pid).')
+        parser.add_argument('--limit', type=int, default=0, help='Stop after claiming this many campaigns (0 = no limit).')
 
     def handle(self, *args, **options):
-        now = timezone.now()
-        ready_campaigns = MessageCampaign.objects.filter(status='scheduled', send_at__lte=now)
+        worker_id = options['worker_id'] or default_worker_id()
+        limit = options['limit']
 
         dispatcher = MessageDispatcher()
-        for campaign in ready_campaigns:
-            stats = dispatcher.dispatch_campaign(campaign)
+        dispatched = 0
+        while not limit or dispatched < limit:
+            campaign = claim_next_due_campaign(worker_id)
+            if campaign is None:
+                break
+            dispatched += 1
+            try:
+                stats = dispatcher.dispatch_campaign(campaign, exclude_delivered=True)
+            except LeaseLost:
+                self.stderr.write(f'Campaign {campaign.id} was taken over by another worker.')
+                continue
             self.stdout.write(self.style.SUCCESS(f'Dispatched campaign {campaign.id}: {stats}'))
 
-        if not ready_campaigns.exists():
+        if not dispatched:
             self.stdout.write('No scheduled campaigns were ready to send.')
@@ -0,0 +1,37 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from apps.broadcast.outbox import OutboxFlusher
+
+
+class Command(BaseCommand):
+    help = 'Deliver pending Context7 events from the outbox, once or continuously.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep running and drain new events as they arrive.')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds to sleep when the outbox is idle.')
+        parser.add_argument('--batch-size', type=int, default=None, help='Events per batch.')
+
+    def handle(self, *args, **options):
+        flusher = OutboxFlusher(batch_size=options['batch_size'])
+
+        if not options['loop']:
+            delivered = 0
+            while True:
+                batch = flusher.flush()
+                if not batch:
+                    break
+                delivered += batch
+            self.stdout.write(self.style.SUCCESS(f'Delivered {delivered} outbox event(s).'))
+            return
+
+        def _stop(signum, frame):
+            self.stdout.write('Stopping outbox flusher...')
+            flusher.stop()
+
+        signal.signal(signal.SIGTERM, _stop)
+        signal.signal(signal.SIGINT, _stop)
+
+        self.stdout.write(self.style.SUCCESS('Outbox flusher running'))
+        flusher.run(interval=options['interval'])
@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.broadcast.image_tasks import recover_image_tasks
+
+
+class Command(BaseCommand):
+    help = 'Re-run AI compose image tasks that were lost, e.g. when a web worker restarted.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=None,
+            help='Seconds a task may stay pending or running before it is re-run (default: IMAGE_TASK_STALE_SECONDS).',
+        )
+
+    def handle(self, *args, **options):
+        stale_after = timedelta(seconds=options['stale_after']) if options['stale_after'] is not None else None
+        recovered = recover_image_tasks(stale_after)
+        self.stdout.write(self.style.SUCCESS(f'Recovered {recovered} image task(s).'))
@@ -0,0 +1,33 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.broadcast.archive import restore_campaign
+from apps.broadcast.models import MessageCampaign
+
+
+class Command(BaseCommand):
+    help = 'Restore the archived delivery and audit logs of one campaign.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('campaign_id', type=int)
+        parser.add_argument('--dir', default=None, help='Archive directory (default: ARCHIVE_DIR).')
+        parser.add_argument('--since', type=date.fromisoformat, default=None, help='First archive day to read (YYYY-MM-DD).')
+        parser.add_argument('--until', type=date.fromisoformat, default=None, help='Last archive day to read (YYYY-MM-DD).')
+
+    def handle(self, *args, **options):
+        try:
+            counts = restore_campaign(
+                options['campaign_id'],
+                directory=options['dir'],
+                since=options['since'],
+                until=options['until'],
+            )
+        except MessageCampaign.DoesNotExist as exc:
+            raise CommandError(str(exc)) from exc
+
+        if counts['skipped']:
+            self.stderr.write(f"{counts['skipped']} delivery log(s) skipped: their account no longer exists")
+        self.stdout.write(
+            self.style.SUCCESS(f"Restored {counts['deliveries']} delivery log(s) and {counts['audit_entries']} audit log entry(s).")
+        )
@@ -0,0 +1,45 @@
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.broadcast.models import MessageCampaign
+from apps.broadcast.retries import DeliveryRetryEngine, schedule_retries
+
+
+class Command(BaseCommand):
+    help = 'Re-send deliveries whose latest attempt failed, with exponential backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('campaign_ids', nargs='*', type=int, help='Queue retries for these campaigns first.')
+        parser.add_argument('--loop', action='store_true', help='Keep running and send retries as they fall due.')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls with --loop.')
+        parser.add_argument('--batch-size', type=int, default=100, help='Retries claimed per round.')
+        parser.add_argument('--worker-id', default='', help='Lock owner name (default: host:pid).')
+
+    def handle(self, *args, **options):
+        for campaign_id in options['campaign_ids']:
+            campaign = MessageCampaign.objects.filter(pk=campaign_id).first()
+            if campaign is None:
+                raise CommandError(f'Campaign {campaign_id} does not exist')
+            self.stdout.write(f'Campaign {campaign_id}: queued {schedule_retries(campaign)} retry(ies).')
+
+        engine = DeliveryRetryEngine(worker_id=options['worker_id'], batch_size=options['batch_size'])
+        if not options['loop']:
+            processed = 0
+            while True:
+                sent = engine.run_once()
+                processed += sent
+                if sent < engine.batch_size:
+                    break
+            self.stdout.write(self.style.SUCCESS(f'Processed {processed} due retry(ies).'))
+            return
+
+        def _stop(signum, frame):
+            self.stdout.write('Stopping delivery retries...')
+            engine.stop()
+
+        signal.signal(signal.SIGTERM, _stop)
+        signal.signal(signal.SIGINT, _stop)
+
+        self.stdout.write(self.style.SUCCESS(f'Delivery retry engine running as {engine.worker_id}'))
+        engine.run(interval=options['interval'])
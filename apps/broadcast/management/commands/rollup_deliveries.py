@@ -0,0 +1,43 @@
+import logging
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.broadcast.rollups import roll_up_deliveries
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Fold new delivery logs into the daily analytics rollups, once or continuously.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep running and roll up new logs as they arrive.')
+        parser.add_argument('--interval', type=float, default=60.0, help='Seconds between runs with --loop.')
+        parser.add_argument('--chunk-size', type=int, default=None, help='Delivery logs per transaction.')
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            counted = roll_up_deliveries(chunk_size=options['chunk_size'])
+            self.stdout.write(self.style.SUCCESS(f'Rolled up {counted} delivery log(s).'))
+            return
+
+        stop = threading.Event()
+
+        def _stop(signum, frame):
+            self.stdout.write('Stopping delivery rollup...')
+            stop.set()
+
+        signal.signal(signal.SIGTERM, _stop)
+        signal.signal(signal.SIGINT, _stop)
+
+        self.stdout.write(self.style.SUCCESS('Delivery rollup running'))
+        while not stop.is_set():
+            close_old_connections()
+            try:
+                roll_up_deliveries(chunk_size=options['chunk_size'])
+            except Exception:
+                logger.exception('Delivery rollup failed')
+            stop.wait(options['interval'])
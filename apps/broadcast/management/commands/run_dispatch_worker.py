@@ -0,0 +1,34 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from apps.broadcast.jobs import DispatchWorker
+
+
+class Command(BaseCommand):
+    help = 'Run a worker that sends queued campaign dispatch jobs; start one process per worker.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--worker-id', default='', help='Lock owner name (default: hostname:pid).')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Drain the queue and exit instead of waiting for new jobs.')
+
+    def handle(self, *args, **options):
+        worker = DispatchWorker(worker_id=options['worker_id'], poll_interval=options['poll_interval'])
+
+        if options['once']:
+            processed = 0
+            while worker.run_once() is not None:
+                processed += 1
+            self.stdout.write(self.style.SUCCESS(f'Processed {processed} dispatch job(s).'))
+            return
+
+        def _stop(signum, frame):
+            self.stdout.write('Stopping dispatch worker after the current job...')
+            worker.stop()
+
+        signal.signal(signal.SIGTERM, _stop)
+        signal.signal(signal.SIGINT, _stop)
+
+        self.stdout.write(self.style.SUCCESS(f'Dispatch worker running as {worker.worker_id}'))
+        worker.run()
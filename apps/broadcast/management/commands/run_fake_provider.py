@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.broadcast.fake_provider import FakeProviderServer
+
+
+class Command(BaseCommand):
+    help = 'Run a local fake provider API to measure dispatch throughput offline.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency-ms', type=float, default=100.0, help='Delay added to every response.')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests that fail (0-1).')
+        parser.add_argument('--error-status', type=int, default=503, help='Use 429 to simulate throttling.')
+        parser.add_argument('--retry-after', type=float, default=None, help='Retry-After seconds sent with failures.')
+        parser.add_argument('--report-every', type=float, default=5.0, help='Seconds between throughput reports.')
+
+    def handle(self, *args, **options):
+        server = FakeProviderServer(
+            (options['host'], options['port']),
+            latency=options['latency_ms'] / 1000,
+            error_rate=options['error_rate'],
+            error_status=options['error_status'],
+            retry_after=options['retry_after'],
+        )
+        server.start_in_thread()
+        self.stdout.write(self.style.SUCCESS(f'Fake provider listening on {server.base_url}'))
+
+        last_count = 0
+        try:
+            while True:
+                time.sleep(options['report_every'])
+                count = server.request_count
+                rate = (count - last_count) / options['report_every']
+                last_count = count
+                self.stdout.write(
+                    f'{count} requests, {rate:.1f} req/s, {len(server.connections)} distinct connections'
+                )
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping fake provider.')
+        finally:
+            server.stop()
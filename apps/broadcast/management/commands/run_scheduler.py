@@ -0,0 +1,43 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from apps.broadcast.scheduler import CampaignScheduler
+
+
+class Command(BaseCommand):
+    help = 'Run the campaign scheduler as a long-lived daemon that wakes up when the next campaign is due.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--worker-id', default='', help='Lease owner name (default: hostname:pid).')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds between new-campaign checks.')
+        parser.add_argument(
+            '--resync-interval',
+            type=float,
+            default=60.0,
+            help='Seconds between full reloads, which also recover expired dispatch leases.',
+        )
+        parser.add_argument(
+            '--dispatch-workers',
+            type=int,
+            default=None,
+            help='Campaigns sent at once (default: SCHEDULER_DISPATCH_WORKERS).',
+        )
+
+    def handle(self, *args, **options):
+        scheduler = CampaignScheduler(
+            worker_id=options['worker_id'],
+            poll_interval=options['poll_interval'],
+            resync_interval=options['resync_interval'],
+            dispatch_workers=options['dispatch_workers'],
+        )
+
+        def _stop(signum, frame):
+            self.stdout.write('Stopping scheduler...')
+            scheduler.stop()
+
+        signal.signal(signal.SIGTERM, _stop)
+        signal.signal(signal.SIGINT, _stop)
+
+        self.stdout.write(self.style.SUCCESS(f'Scheduler running as {scheduler.worker_id}'))
+        scheduler.run()
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('broadcast', '0004_auditlog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateLimitBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=200, unique=True)),
+                ('tokens', models.FloatField()),
+                ('refilled_at', models.FloatField(help_text='Unix timestamp of the last refill.')),
+                ('blocked_until', models.FloatField(default=0, help_text='Unix timestamp until which Retry-After applies.')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('broadcast', '0005_ratelimitbucket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='messagecampaign',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='messagecampaign',
+            name='lease_owner',
+            field=models.CharField(blank=True, help_text='Worker currently dispatching this campaign.', max_length=120),
+        ),
+    ]
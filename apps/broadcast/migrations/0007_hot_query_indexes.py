@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('broadcast', '0006_messagecampaign_lease'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['entity', 'entity_id', 'created_at'], name='audit_entity_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deliverylog',
+            index=models.Index(fields=['campaign', 'created_at'], name='delivery_campaign_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='messagecampaign',
+            index=models.Index(fields=['status', 'send_at'], name='campaign_status_send_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='messagecampaign',
+            index=models.Index(fields=['status', 'updated_at'], name='campaign_status_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='socialaccount',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['name', 'platform'], name='account_active_name_idx'),
+        ),
+    ]
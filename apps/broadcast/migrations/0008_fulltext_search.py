@@ -0,0 +1,59 @@
+from django.db import migrations
+
+# External-content FTS5 indexes kept in sync by triggers, so bulk_create and
+# queryset.update() stay indexed too. Only created on SQLite builds with FTS5;
+# other backends keep the LIKE-based search.
+FTS_TABLES = {
+    'broadcast_socialaccount_fts': ('broadcast_socialaccount', ('name', 'handle')),
+    'broadcast_messagecampaign_fts': ('broadcast_messagecampaign', ('title', 'message')),
+}
+
+
+def _fts5_supported(schema_editor) -> bool:
+    if schema_editor.connection.vendor != 'sqlite':
+        return False
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def create_fts_tables(apps, schema_editor):
+    if not _fts5_supported(schema_editor):
+        return
+    for fts_table, (source_table, columns) in FTS_TABLES.items():
+        column_list = ', '.join(columns)
+        new_values = ', '.join(f'new.{column}' for column in columns)
+        old_values = ', '.join(f'old.{column}' for column in columns)
+        statements = [
+            f"CREATE VIRTUAL TABLE {fts_table} USING fts5({column_list}, content='{source_table}', "
+            f"content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+            f'CREATE TRIGGER {fts_table}_ai AFTER INSERT ON {source_table} BEGIN '
+            f'INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values}); END',
+            f'CREATE TRIGGER {fts_table}_ad AFTER DELETE ON {source_table} BEGIN '
+            f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END",
+            f'CREATE TRIGGER {fts_table}_au AFTER UPDATE OF {column_list} ON {source_table} BEGIN '
+            f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+            f'INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values}); END',
+            f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')",
+        ]
+        for statement in statements:
+            schema_editor.execute(statement)
+
+
+def drop_fts_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for fts_table in FTS_TABLES:
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {fts_table}_{suffix}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {fts_table}')
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('broadcast', '0007_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_tables, drop_fts_tables),
+    ]
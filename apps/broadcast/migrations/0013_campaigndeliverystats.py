@@ -0,0 +1,47 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_counters(apps, schema_editor):
+    """Count the delivery logs written before the dispatcher kept counters."""
+    DeliveryLog = apps.get_model('broadcast', 'DeliveryLog')
+    CampaignDeliveryStats = apps.get_model('broadcast', 'CampaignDeliveryStats')
+    rows = (
+        DeliveryLog.objects.order_by()
+        .values('campaign_id', 'account__platform')
+        .annotate(sent=Count('id', filter=Q(success=True)), failed=Count('id', filter=Q(success=False)))
+    )
+    CampaignDeliveryStats.objects.bulk_create(
+        (
+            CampaignDeliveryStats(campaign_id=row['campaign_id'], platform=row['account__platform'], sent=row['sent'], failed=row['failed'])
+            for row in rows.iterator()
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('broadcast', '0012_dispatchjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CampaignDeliveryStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(choices=[('x', 'X / Twitter'), ('facebook', 'Facebook'), ('instagram', 'Instagram'), ('linkedin', 'LinkedIn'), ('tiktok', 'TikTok')], max_length=20)),
+                ('sent', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='delivery_stats', to='broadcast.messagecampaign')),
+            ],
+            options={
+                'verbose_name_plural': 'campaign delivery stats',
+                'unique_together': {('campaign', 'platform')},
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
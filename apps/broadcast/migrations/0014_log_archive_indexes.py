@@ -0,0 +1,26 @@
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('broadcast', '0013_campaigndeliverystats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='deliverylog',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['created_at'], name='audit_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deliverylog',
+            index=models.Index(fields=['created_at'], name='delivery_created_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('broadcast', '0015_delivery_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeliveryRetry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('exhausted', 'Exhausted')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, help_text='When pending: due time. When running: lock expiry.')),
+                ('locked_by', models.CharField(blank=True, max_length=120)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='delivery_retries', to='broadcast.socialaccount')),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='delivery_retries', to='broadcast.messagecampaign')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('status', 'pending')), fields=['next_attempt_at', 'id'], name='retry_pending_idx'), models.Index(condition=models.Q(('status', 'running')), fields=['next_attempt_at'], name='retry_running_idx')],
+                'unique_together': {('campaign', 'account')},
+            },
+        ),
+    ]
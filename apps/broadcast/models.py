@@ -20,6 +20,11 @@ class SocialAccount(models.Model):
 
     class Meta:
         unique_together = ('platform', 'handle')
+        indexes = [
+            # Partial on is_active: every hot lookup filters active accounts, and SQLite cannot
+            # seek a leading boolean column for the `WHERE "is_active"` predicate Django emits.
+            models.Index(fields=['name', 'platform'], name='account_active_name_idx', condition=models.Q(is_active=True)),
+        ]
 
     def __str__(self) -> str:
         return f"{self.get_platform_display()} - @{self.handle}"
@@ -107,9 +112,17 @@ class MessageCampaign(models.Model):
     metadata = models.JSONField(default=dict, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
     send_at = models.DateTimeField(null=True, blank=True)
+    lease_owner = models.CharField(max_length=120, blank=True, help_text='Worker currently dispatching this campaign.')
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'send_at'], name='campaign_status_send_at_idx'),
+            models.Index(fields=['status', 'updated_at'], name='campaign_status_updated_idx'),
+        ]
+
     def is_ready_to_send(self) -> bool:
         if self.status not in {'draft', 'scheduled'}:
             return False
@@ -128,26 +141,223 @@ class DeliveryLog(models.Model):
     provider_message_id = models.CharField(max_length=255, blank=True)
     response_payload = models.JSONField(default=dict, blank=True)
     error_message = models.TextField(blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # A default rather than auto_now_add, so rows restored from an archive keep their timestamps.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['campaign', 'created_at'], name='delivery_campaign_created_idx'),
+            models.Index(fields=['created_at'], name='delivery_created_idx'),
+        ]
 
     def __str__(self) -> str:
         return f"{self.campaign.title} -> {self.account.handle}"
 
 
+class CampaignDeliveryStats(models.Model):
+    """Running delivery counts for one campaign on one platform, kept by the dispatcher (see `delivery_stats`)."""
+
+    campaign = models.ForeignKey(MessageCampaign, related_name='delivery_stats', on_delete=models.CASCADE)
+    platform = models.CharField(max_length=20, choices=SocialAccount.PLATFORM_CHOICES)
+    sent = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ('campaign', 'platform')
+        verbose_name_plural = 'campaign delivery stats'
+
+    def __str__(self) -> str:
+        return f'Campaign #{self.campaign_id} on {self.platform}: {self.sent} sent, {self.failed} failed'
+
+
+class DeliveryRetry(models.Model):
+    """Re-send of a campaign to one account whose latest delivery failed (see `retries`)."""
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('exhausted', 'Exhausted'),
+    ]
+    OPEN_STATUSES = ('pending', 'running')
+
+    campaign = models.ForeignKey(MessageCampaign, related_name='delivery_retries', on_delete=models.CASCADE)
+    account = models.ForeignKey(SocialAccount, related_name='delivery_retries', on_delete=models.CASCADE)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, help_text='When pending: due time. When running: lock expiry.')
+    locked_by = models.CharField(max_length=120, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('campaign', 'account')
+        indexes = [
+            models.Index(fields=['next_attempt_at', 'id'], name='retry_pending_idx', condition=models.Q(status='pending')),
+            models.Index(fields=['next_attempt_at'], name='retry_running_idx', condition=models.Q(status='running')),
+        ]
+
+    def __str__(self) -> str:
+        return f'Retry of campaign #{self.campaign_id} to account #{self.account_id} ({self.status})'
+
+
+class DeliveryRollup(models.Model):
+    """Delivery counts for one account on one UTC day, built from `DeliveryLog` by `rollups`."""
+
+    day = models.DateField()
+    platform = models.CharField(max_length=20, choices=SocialAccount.PLATFORM_CHOICES)
+    account = models.ForeignKey(SocialAccount, related_name='delivery_rollups', on_delete=models.CASCADE)
+    sent = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    top_errors = models.JSONField(default=dict, blank=True, help_text='Most frequent error messages and their counts.')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # The unique (day, account) index also serves date-range scans across all platforms.
+        unique_together = ('day', 'account')
+        indexes = [
+            models.Index(fields=['platform', 'day'], name='rollup_platform_day_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.day} {self.platform} account #{self.account_id}: {self.sent} sent, {self.failed} failed'
+
+
+class RollupWatermark(models.Model):
+    """Highest source row id already folded into a rollup table."""
+
+    name = models.CharField(max_length=60, unique=True)
+    last_id = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f'{self.name} @ {self.last_id}'
+
+
+class DispatchJob(models.Model):
+    """A campaign send waiting for, or running on, a `run_dispatch_worker` process (see `jobs`)."""
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    ACTIVE_STATUSES = ('queued', 'running')
+
+    campaign = models.ForeignKey(MessageCampaign, related_name='dispatch_jobs', on_delete=models.CASCADE)
+    account_ids = models.JSONField(null=True, blank=True, help_text='Target accounts; empty means every active account.')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    total = models.PositiveIntegerField(default=0)
+    sent = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=120, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Partial indexes stay as small as the live queue, however many finished jobs pile up.
+            models.Index(fields=['available_at', 'id'], name='dispatch_job_queued_idx', condition=models.Q(status='queued')),
+            models.Index(fields=['locked_until'], name='dispatch_job_running_idx', condition=models.Q(status='running')),
+        ]
+        constraints = [
+            # One live job per campaign, so a double-clicked send cannot post twice.
+            models.UniqueConstraint(
+                fields=['campaign'],
+                name='dispatch_job_active_campaign_uniq',
+                condition=models.Q(status__in=['queued', 'running']),
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'Dispatch job #{self.pk} for campaign #{self.campaign_id} ({self.status})'
+
+
 class AuditLog(models.Model):
     actor = models.ForeignKey('auth.User', null=True, blank=True, on_delete=models.SET_NULL)
     action = models.CharField(max_length=120)
     entity = models.CharField(max_length=120)
     entity_id = models.PositiveIntegerField()
     changes = models.JSONField(default=dict, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the entry is built, not when a buffered sink gets round to writing it.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['entity', 'entity_id', 'created_at'], name='audit_entity_created_idx'),
+            models.Index(fields=['created_at'], name='audit_created_idx'),
+        ]
 
     def __str__(self) -> str:
         who = self.actor.username if self.actor else 'anonymous'
         return f'{who} {self.action} {self.entity}#{self.entity_id}'
+
+
+class RateLimitBucket(models.Model):
+    """Token bucket state shared by every dispatcher process (see `rate_limit.RateLimiter`)."""
+
+    key = models.CharField(max_length=200, unique=True)
+    tokens = models.FloatField()
+    refilled_at = models.FloatField(help_text='Unix timestamp of the last refill.')
+    blocked_until = models.FloatField(default=0, help_text='Unix timestamp until which Retry-After applies.')
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f'{self.key}: {self.tokens:.2f} tokens'
+
+
+class OutboxEvent(models.Model):
+    """Context7 event recorded in the same transaction as the change it describes."""
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('delivered', 'Delivered'),
+        ('dead', 'Dead'),
+    ]
+
+    event_name = models.CharField(max_length=120)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'id'], name='outbox_status_id_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.event_name}#{self.pk} ({self.status})'
+
+
+class AIResponseCache(models.Model):
+    """OpenAI response stored under a hash of model, prompts and parameters (see `ai_cache`)."""
+
+    key = models.CharField(max_length=64, unique=True)
+    kind = models.CharField(max_length=20)
+    response = models.JSONField(default=dict)
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='ai_cache_created_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.kind} {self.key[:12]}'
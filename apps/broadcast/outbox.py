@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from .context7 import Context7Client
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_DELAY = timedelta(minutes=15)
+
+
+def enqueue_event(event_name: str, payload: dict) -> OutboxEvent:
+    """Record an event for Context7; call inside the transaction that makes the change."""
+    return OutboxEvent.objects.create(event_name=event_name, payload=payload)
+
+
+class OutboxFlusher:
+    """Drains pending outbox events to Context7 in id order.
+
+    Each batch goes out as one compressed `publish_events` request. Delivery is
+    at-least-once: an event is marked delivered only after Context7 accepted it.
+    A rejected event backs off and blocks the batches behind it until it succeeds
+    or exhausts `max_attempts`, so events reach Context7 in the order they were
+    written. Run a single flusher per database to keep that ordering.
+    """
+
+    def __init__(
+        self,
+        client: Context7Client | None = None,
+        batch_size: int | None = None,
+        max_attempts: int | None = None,
+        base_delay: float = 1.0,
+    ):
+        self.client = client or Context7Client()
+        self.batch_size = batch_size or settings.CONTEXT7_OUTBOX_BATCH_SIZE
+        self.max_attempts = max_attempts or settings.CONTEXT7_OUTBOX_MAX_ATTEMPTS
+        self.base_delay = base_delay
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self, interval: float = 1.0) -> None:
+        while not self._stop.is_set():
+            close_old_connections()
+            try:
+                delivered = self.flush()
+            except Exception:
+                logger.exception('Outbox flush failed')
+                delivered = 0
+            if not delivered:
+                self._stop.wait(interval)
+
+    def flush(self) -> int:
+        """Deliver up to one batch of pending events and return how many were delivered."""
+        now = timezone.now()
+        events = []
+        for event in OutboxEvent.objects.filter(status='pending').order_by('id')[: self.batch_size]:
+            if event.available_at > now:
+                break
+            events.append(event)
+        if not events:
+            return 0
+
+        result = self.client.publish_events([(event.event_name, event.payload) for event in events])
+        accepted = list(result.accepted) + [False] * (len(events) - len(result.accepted))
+        # Only the prefix before the first rejection counts: events accepted after it go
+        # out again in a later batch, so Context7 never sees event N+1 before event N.
+        rejected = next((index for index, ok in enumerate(accepted) if not ok), len(events))
+        delivered_ids = [event.id for event in events[:rejected]]
+        if rejected < len(events):
+            self._record_failure(events[rejected], result.errors.get(rejected, ''), result.status_code)
+
+        if delivered_ids:
+            OutboxEvent.objects.filter(id__in=delivered_ids).update(
+                status='delivered',
+                delivered_at=timezone.now(),
+                attempts=F('attempts') + 1,
+            )
+        return len(delivered_ids)
+
+    def _record_failure(self, event: OutboxEvent, error: str, status_code: int) -> None:
+        attempts = event.attempts + 1
+        if attempts >= self.max_attempts:
+            status = 'dead'
+            logger.error(
+                'Outbox event dropped after max attempts',
+                extra={'event_id': event.id, 'event_name': event.event_name, 'attempts': attempts},
+            )
+        else:
+            status = 'pending'
+            logger.warning(
+                'Context7 event publish failed',
+                extra={'event_id': event.id, 'status_code': status_code, 'error': error},
+            )
+        delay = min(MAX_RETRY_DELAY, timedelta(seconds=self.base_delay * 2 ** (attempts - 1)))
+        OutboxEvent.objects.filter(pk=event.pk).update(
+            status=status,
+            attempts=attempts,
+            last_error=error[:1000],
+            available_at=timezone.now() + delay,
+        )
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import base64
+import json
+from typing import Any
+
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(values: list[Any]) -> str:
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, types: tuple[type, ...]) -> list[Any]:
+    """Values of an `encode_cursor` cursor, which must match `types` one for one."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor('cursor is invalid') from exc
+    if not isinstance(values, list) or len(values) != len(types):
+        raise InvalidCursor('cursor is invalid')
+    # A well-formed but tampered cursor must not reach the query as the wrong type.
+    for value, kind in zip(values, types):
+        if not isinstance(value, kind) or isinstance(value, bool):
+            raise InvalidCursor('cursor is invalid')
+    return values
+
+
+def after(fields: list[str], values: list[Any]) -> Q:
+    """Rows strictly after `values` in ascending (fields...) order, e.g. (a > x) OR (a = x AND b > y)."""
+    condition = Q()
+    for index, field in enumerate(fields):
+        equal = {name: value for name, value in zip(fields[:index], values[:index])}
+        condition |= Q(**equal, **{f'{field}__gt': values[index]})
+    return condition
@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from .async_http import LoopClients, is_ok
+from .models import SocialAccount, SocialAPICredential
+from .rate_limit import parse_retry_after
+
+# Adapters parse responses from the sync session and the async client alike.
+Response = requests.Response | httpx.Response
+
+
+@dataclass
+class ProviderResult:
+    success: bool
+    provider_message_id: str
+    payload: dict = field(default_factory=dict)
+    error_message: str = ''
+    status_code: int = 0
+    retry_after: float | None = None
+
+    @property
+    def is_throttled(self) -> bool:
+        return self.status_code == 429 or (self.status_code == 503 and self.retry_after is not None)
+
+    def as_tuple(self) -> tuple[bool, str, dict, str]:
+        return self.success, self.provider_message_id, self.payload, self.error_message
+
+
+class ProviderAdapter(ABC):
+    """Posts to one platform through a pooled, keep-alive HTTP session.
+
+    Without an active `SocialAPICredential` the adapter runs in stub mode and
+    reports a synthetic delivery, which keeps local development and tests offline.
+    """
+
+    platform = ''
+    default_base_url = ''
+    timeout = 10
+    requires_image = False  # photo-only platforms cannot post text alone
+
+    def __init__(self, credential: SocialAPICredential | None = None, pool_size: int = 4):
+        self.credential = credential
+        self.pool_size = max(1, pool_size)
+        self.base_url = ((credential.api_base_url if credential else '') or self.default_base_url).rstrip('/')
+        self.session = self._build_session()
+        self.async_clients = LoopClients(self._build_async_client)
+
+    def _build_session(self) -> requests.Session:
+        session = requests.Session()
+        # pool_block keeps concurrent senders on the pooled connections instead of
+        # opening throwaway ones once the pool is exhausted.
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, pool_block=True)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _build_async_client(self) -> httpx.AsyncClient:
+        # Same cap as the sync pool; extra senders wait for a pooled connection.
+        return httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+            timeout=httpx.Timeout(self.timeout, pool=None),
+        )
+
+    @property
+    def is_stub(self) -> bool:
+        return self.credential is None
+
+    @property
+    def app_name(self) -> str:
+        return self.credential.app_name if self.credential else ''
+
+    def close(self) -> None:
+        self.session.close()
+        self.async_clients.clear()
+
+    def send(self, message: str, account: SocialAccount, image_url: str = '') -> ProviderResult:
+        if self.is_stub:
+            return self._stub_result(message, account, image_url)
+
+        try:
+            response = self._post(message, account, image_url)
+        except requests.RequestException as exc:
+            return ProviderResult(
+                success=False,
+                provider_message_id='',
+                payload={'platform': account.platform, 'handle': account.handle},
+                error_message=f'Request to {self.platform} failed: {exc}',
+            )
+        return self._to_result(response)
+
+    async def asend(self, message: str, account: SocialAccount, image_url: str = '') -> ProviderResult:
+        """`send` on the event loop, through this adapter's per-loop connection pool."""
+        if self.is_stub:
+            return self._stub_result(message, account, image_url)
+
+        try:
+            response = await self._apost(message, account, image_url)
+        except httpx.HTTPError as exc:
+            return ProviderResult(
+                success=False,
+                provider_message_id='',
+                payload={'platform': account.platform, 'handle': account.handle},
+                error_message=f'Request to {self.platform} failed: {exc}',
+            )
+        return self._to_result(response)
+
+    def _post(self, message: str, account: SocialAccount, image_url: str) -> requests.Response:
+        path, body = self.build_request(message, account, image_url)
+        return self.request(path, body, account)
+
+    async def _apost(self, message: str, account: SocialAccount, image_url: str) -> httpx.Response:
+        path, body = self.build_request(message, account, image_url)
+        return await self.arequest(path, body, account)
+
+    def request(self, path: str, body: dict, account: SocialAccount) -> requests.Response:
+        return self.session.post(
+            f'{self.base_url}{path}',
+            json=body,
+            headers=self.headers(account),
+            timeout=self.timeout,
+        )
+
+    async def arequest(self, path: str, body: dict, account: SocialAccount) -> httpx.Response:
+        return await self.async_clients.get().post(f'{self.base_url}{path}', json=body, headers=self.headers(account))
+
+    def headers(self, account: SocialAccount) -> dict[str, str]:
+        token = account.access_token or (self.credential.access_token if self.credential else '')
+        return {'Authorization': f'Bearer {token}'}
+
+    @abstractmethod
+    def build_request(self, message: str, account: SocialAccount, image_url: str) -> tuple[str, dict]:
+        """The API path and JSON body that publish `message` for `account`."""
+
+    def extract_message_id(self, response: Response, body: dict) -> str:
+        return str(body.get('id') or '')
+
+    def _to_result(self, response: Response) -> ProviderResult:
+        try:
+            body = response.json() if response.content else {}
+        except ValueError:
+            body = {'raw_body': response.text[:500]}
+        if not isinstance(body, dict):
+            body = {'body': body}
+
+        if not is_ok(response):
+            return ProviderResult(
+                success=False,
+                provider_message_id='',
+                payload=body,
+                error_message=f'{self.platform} responded with HTTP {response.status_code}',
+                status_code=response.status_code,
+                retry_after=parse_retry_after(response.headers.get('Retry-After')),
+            )
+        return ProviderResult(
+            success=True,
+            provider_message_id=self.extract_message_id(response, body),
+            payload=body,
+            status_code=response.status_code,
+        )
+
+    def _stub_result(self, message: str, account: SocialAccount, image_url: str) -> ProviderResult:
+        payload = {
+            'platform': account.platform,
+            'handle': account.handle,
+            'preview': message[:100],
+            'image_url': image_url,
+        }
+        return ProviderResult(success=True, provider_message_id=f'{account.platform}-{account.id}', payload=payload)
+
+
+class XAdapter(ProviderAdapter):
+    platform = 'x'
+    default_base_url = 'https://api.twitter.com'
+
+    def build_request(self, message: str, account: SocialAccount, image_url: str) -> tuple[str, dict]:
+        text = f'{message}\n{image_url}'.strip() if image_url else message
+        return '/2/tweets', {'text': text}
+
+    def extract_message_id(self, response: Response, body: dict) -> str:
+        return str((body.get('data') or {}).get('id') or '')
+
+
+class FacebookAdapter(ProviderAdapter):
+    platform = 'facebook'
+    default_base_url = 'https://graph.facebook.com/v19.0'
+
+    def build_request(self, message: str, account: SocialAccount, image_url: str) -> tuple[str, dict]:
+        if image_url:
+            return f'/{account.handle}/photos', {'url': image_url, 'caption': message}
+        return f'/{account.handle}/feed', {'message': message}
+
+    def extract_message_id(self, response: Response, body: dict) -> str:
+        return str(body.get('post_id') or body.get('id') or '')
+
+
+class InstagramAdapter(ProviderAdapter):
+    platform = 'instagram'
+    default_base_url = 'https://graph.facebook.com/v19.0'
+    requires_image = True
+
+    def build_request(self, message: str, account: SocialAccount, image_url: str) -> tuple[str, dict]:
+        return f'/{account.handle}/media', {'image_url': image_url, 'caption': message}
+
+    def _post(self, message: str, account: SocialAccount, image_url: str) -> requests.Response:
+        # Instagram publishes in two steps: create a media container, then publish it.
+        container = super()._post(message, account, image_url)
+        creation_id = self._creation_id(container)
+        if creation_id is None:
+            return container
+        return self.request(f'/{account.handle}/media_publish', {'creation_id': creation_id}, account)
+
+    async def _apost(self, message: str, account: SocialAccount, image_url: str) -> httpx.Response:
+        container = await super()._apost(message, account, image_url)
+        creation_id = self._creation_id(container)
+        if creation_id is None:
+            return container
+        return await self.arequest(f'/{account.handle}/media_publish', {'creation_id': creation_id}, account)
+
+    @staticmethod
+    def _creation_id(container: Response) -> str | None:
+        """The media container id, or None when the container step failed."""
+        if not is_ok(container):
+            return None
+        try:
+            return container.json().get('id', '')
+        except ValueError:
+            return None
+
+
+class LinkedInAdapter(ProviderAdapter):
+    platform = 'linkedin'
+    default_base_url = 'https://api.linkedin.com'
+
+    def headers(self, account: SocialAccount) -> dict[str, str]:
+        return {**super().headers(account), 'X-Restli-Protocol-Version': '2.0.0'}
+
+    def build_request(self, message: str, account: SocialAccount, image_url: str) -> tuple[str, dict]:
+        body = {
+            'author': account.handle,
+            'commentary': message,
+            'visibility': 'PUBLIC',
+            'lifecycleState': 'PUBLISHED',
+        }
+        if image_url:
+            body['content'] = {'article': {'source': image_url, 'title': message[:200]}}
+        return '/rest/posts', body
+
+    def extract_message_id(self, response: Response, body: dict) -> str:
+        return response.headers.get('x-restli-id') or str(body.get('id') or '')
+
+
+class TikTokAdapter(ProviderAdapter):
+    platform = 'tiktok'
+    default_base_url = 'https://open.tiktokapis.com'
+    requires_image = True
+
+    def build_request(self, message: str, account: SocialAccount, image_url: str) -> tuple[str, dict]:
+        return '/v2/post/publish/content/init/', {
+            'post_info': {'title': message[:150], 'description': message},
+            'source_info': {'source': 'PULL_FROM_URL', 'photo_images': [image_url] if image_url else []},
+            'post_mode': 'DIRECT_POST',
+            'media_type': 'PHOTO',
+        }
+
+    def extract_message_id(self, response: Response, body: dict) -> str:
+        return str((body.get('data') or {}).get('publish_id') or '')
+
+
+ADAPTER_CLASSES: dict[str, type[ProviderAdapter]] = {
+    adapter.platform: adapter
+    for adapter in (XAdapter, FacebookAdapter, InstagramAdapter, LinkedInAdapter, TikTokAdapter)
+}
+
+
+def platforms_requiring_image(platforms) -> set[str]:
+    return {platform for platform in platforms if getattr(ADAPTER_CLASSES.get(platform), 'requires_image', False)}
+
+
+class ProviderRegistry:
+    """Keeps one adapter per platform alive so connections are reused across campaigns.
+
+    The registry is shared by every dispatching thread, so senders check an adapter
+    out with `acquire` and hand it back with `release`. When `refresh` swaps an
+    adapter for a new one, the old one is retired and only closed once its last
+    in-flight send has released it. Pools only grow: a dispatcher asking for fewer
+    connections than the current adapter has reuses it instead of rebuilding it.
+    """
+
+    def __init__(self):
+        self._adapters: dict[str, ProviderAdapter] = {}
+        self._users: dict[ProviderAdapter, int] = {}
+        self._retired: set[ProviderAdapter] = set()
+        self._lock = threading.Lock()
+
+    def refresh(self, pool_sizes: dict[str, int]) -> None:
+        """Sync adapters with the active credentials; only changed platforms are rebuilt."""
+        credentials: dict[str, SocialAPICredential] = {}
+        for credential in SocialAPICredential.objects.filter(
+            is_active=True,
+            platform__in=list(pool_sizes),
+        ).order_by('platform', 'app_name'):
+            credentials.setdefault(credential.platform, credential)
+
+        with self._lock:
+            for platform, pool_size in pool_sizes.items():
+                adapter_class = ADAPTER_CLASSES.get(platform)
+                if adapter_class is None:
+                    continue
+                credential = credentials.get(platform)
+                current = self._adapters.get(platform)
+                if current is not None and self._is_current(current, credential, pool_size):
+                    continue
+                if current is not None:
+                    pool_size = max(pool_size, current.pool_size)
+                    self._retire(current)
+                self._adapters[platform] = adapter_class(credential=credential, pool_size=pool_size)
+
+    def get(self, platform: str) -> ProviderAdapter:
+        """The platform's current adapter; senders use `acquire` so it is not closed under them."""
+        with self._lock:
+            return self._current(platform)
+
+    def acquire(self, platform: str) -> ProviderAdapter:
+        """Check out the platform's adapter for a send; pair with `release`."""
+        with self._lock:
+            adapter = self._current(platform)
+            self._users[adapter] = self._users.get(adapter, 0) + 1
+            return adapter
+
+    def release(self, adapter: ProviderAdapter) -> None:
+        with self._lock:
+            users = self._users.pop(adapter, 1) - 1
+            if users:
+                self._users[adapter] = users
+                return
+            if adapter not in self._retired:
+                return
+            self._retired.discard(adapter)
+        adapter.close()
+
+    def close(self) -> None:
+        with self._lock:
+            for adapter in self._adapters.values():
+                self._retire(adapter)
+            self._adapters.clear()
+
+    def _current(self, platform: str) -> ProviderAdapter:
+        adapter = self._adapters.get(platform)
+        if adapter is None:
+            adapter_class = ADAPTER_CLASSES.get(platform)
+            if adapter_class is None:
+                raise KeyError(f'No provider adapter registered for platform {platform!r}')
+            adapter = self._adapters[platform] = adapter_class()
+        return adapter
+
+    def _retire(self, adapter: ProviderAdapter) -> None:
+        """Close `adapter` now if nobody is sending through it, otherwise on its last `release`."""
+        if self._users.get(adapter):
+            self._retired.add(adapter)
+        else:
+            adapter.close()
+
+    @staticmethod
+    def _is_current(adapter: ProviderAdapter, credential: SocialAPICredential | None, pool_size: int) -> bool:
+        if adapter.pool_size < max(1, pool_size):
+            return False
+        if adapter.credential is None or credential is None:
+            return adapter.credential is credential
+        return adapter.credential.pk == credential.pk and adapter.credential.updated_at == credential.updated_at
+
+
+provider_registry = ProviderRegistry()
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import F
+
+from .models import RateLimitBucket
+
+# Pause after losing a version race to another worker, so contended buckets are not hammered.
+RACE_BACKOFF = 0.01
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, key: str, wait: float):
+        super().__init__(f'Rate limit for {key} requires waiting {wait:.1f}s')
+        self.key = key
+        self.wait = wait
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    per_minute: int
+    burst: int
+
+    @property
+    def per_second(self) -> float:
+        return self.per_minute / 60
+
+
+def parse_retry_after(value: str | None, now: float | None = None) -> float | None:
+    """Return the delay in seconds requested by a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    current = time.time() if now is None else now
+    return max(0.0, retry_at.timestamp() - current)
+
+
+class RateLimiter:
+    """Token bucket per platform (optionally per API app) shared across processes.
+
+    Bucket state lives in `RateLimitBucket` and is updated with optimistic,
+    version-checked UPDATEs, so every worker draws from the same budget without
+    holding a database lock while it waits. Platforms without a configured limit
+    are never throttled and never touch the database.
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, RateLimit] | None = None,
+        per_app: bool | None = None,
+        max_wait: float | None = None,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+        asleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        if limits is None:
+            limits = {
+                platform: RateLimit(per_minute=per_minute, burst=settings.PROVIDER_RATE_LIMIT_BURST)
+                for platform, per_minute in settings.PROVIDER_RATE_LIMITS.items()
+                if per_minute > 0
+            }
+        self.limits = limits
+        self.per_app = settings.PROVIDER_RATE_LIMIT_PER_APP if per_app is None else per_app
+        self.max_wait = settings.PROVIDER_RATE_LIMIT_MAX_WAIT if max_wait is None else max_wait
+        self._clock = clock
+        self._sleep = sleep
+        self._asleep = asleep
+
+    def key_for(self, platform: str, app_name: str = '') -> str:
+        if self.per_app and app_name:
+            return f'{platform}:{app_name}'
+        return platform
+
+    def acquire(self, platform: str, app_name: str = '') -> float:
+        """Block until a token is available and return the seconds spent waiting."""
+        limit = self.limits.get(platform)
+        if limit is None:
+            return 0.0
+
+        key = self.key_for(platform, app_name)
+        waited = 0.0
+        while True:
+            delay = self._try_take(key, limit)
+            if delay is None:
+                self._sleep(RACE_BACKOFF)
+                waited += RACE_BACKOFF
+                continue
+            if delay <= 0:
+                return waited
+            if waited + delay > self.max_wait:
+                raise RateLimitExceeded(key, delay)
+            self._sleep(delay)
+            waited += delay
+
+    async def aacquire(self, platform: str, app_name: str = '') -> float:
+        """`acquire` that waits on the event loop instead of blocking a thread."""
+        limit = self.limits.get(platform)
+        if limit is None:
+            return 0.0
+
+        key = self.key_for(platform, app_name)
+        waited = 0.0
+        while True:
+            delay = await sync_to_async(self._try_take)(key, limit)
+            if delay is None:
+                await self._asleep(RACE_BACKOFF)
+                waited += RACE_BACKOFF
+                continue
+            if delay <= 0:
+                return waited
+            if waited + delay > self.max_wait:
+                raise RateLimitExceeded(key, delay)
+            await self._asleep(delay)
+            waited += delay
+
+    def block(self, platform: str, app_name: str = '', seconds: float | None = None, wait: bool = True) -> None:
+        """Honour a provider's Retry-After before the next request goes out.
+
+        Limited platforms pause the shared bucket for the full delay so every worker
+        waits, even when it exceeds `max_wait`; for unlimited platforms only the
+        calling worker sleeps, unless `wait` is false because nothing is sent next.
+        A delay longer than `max_wait` then fails the current send with `RateLimitExceeded`.
+        """
+        limit, key, seconds = self._block_delay(platform, app_name, seconds)
+        if seconds <= 0:
+            return
+        if limit is not None:
+            self._pause_bucket(key, limit, seconds)
+        self._check_wait(key, seconds)
+        if limit is None and wait:
+            self._sleep(seconds)
+
+    async def ablock(self, platform: str, app_name: str = '', seconds: float | None = None, wait: bool = True) -> None:
+        limit, key, seconds = self._block_delay(platform, app_name, seconds)
+        if seconds <= 0:
+            return
+        if limit is not None:
+            await sync_to_async(self._pause_bucket)(key, limit, seconds)
+        self._check_wait(key, seconds)
+        if limit is None and wait:
+            await self._asleep(seconds)
+
+    def _block_delay(self, platform: str, app_name: str, seconds: float | None) -> tuple[RateLimit | None, str, float]:
+        limit = self.limits.get(platform)
+        key = self.key_for(platform, app_name)
+        if seconds is None:
+            seconds = 1 / limit.per_second if limit else 1.0
+        return limit, key, seconds
+
+    def _check_wait(self, key: str, seconds: float) -> None:
+        if seconds > self.max_wait:
+            raise RateLimitExceeded(key, seconds)
+
+    def _pause_bucket(self, key: str, limit: RateLimit, seconds: float) -> None:
+        blocked_until = self._clock() + seconds
+        bucket = self._bucket(key, limit)
+        # One token becomes available exactly when the provider allows traffic again.
+        RateLimitBucket.objects.filter(pk=bucket.pk, blocked_until__lt=blocked_until).update(
+            tokens=1,
+            refilled_at=blocked_until,
+            blocked_until=blocked_until,
+            version=F('version') + 1,
+        )
+
+    def _try_take(self, key: str, limit: RateLimit) -> float | None:
+        """Take a token; return 0 on success, the delay to wait, or None if another worker won the race."""
+        now = self._clock()
+        bucket = self._bucket(key, limit)
+        if bucket.blocked_until > now:
+            return bucket.blocked_until - now
+
+        elapsed = max(0.0, now - bucket.refilled_at)
+        tokens = min(float(limit.burst), bucket.tokens + elapsed * limit.per_second)
+        if tokens < 1:
+            return (1 - tokens) / limit.per_second
+
+        updated = RateLimitBucket.objects.filter(pk=bucket.pk, version=bucket.version).update(
+            tokens=tokens - 1,
+            refilled_at=max(now, bucket.refilled_at),
+            version=F('version') + 1,
+        )
+        return 0.0 if updated else None
+
+    def _bucket(self, key: str, limit: RateLimit) -> RateLimitBucket:
+        bucket, _ = RateLimitBucket.objects.get_or_create(
+            key=key,
+            defaults={'tokens': float(limit.burst), 'refilled_at': self._clock()},
+        )
+        return bucket
+
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F, Max
+from django.utils import timezone
+
+from .delivery_stats import record_deliveries
+from .models import DeliveryLog, DeliveryRetry, MessageCampaign
+from .services import Heartbeat, MessageDispatcher, default_worker_id
+
+logger = logging.getLogger(__name__)
+
+
+def failed_accounts(campaign: MessageCampaign) -> dict[int, str]:
+    """Account id -> error for every active account whose latest delivery of `campaign` failed."""
+    latest = (
+        DeliveryLog.objects.filter(campaign=campaign)
+        .order_by()
+        .values('account_id')
+        .annotate(last_id=Max('id'))
+        .values('last_id')
+    )
+    return dict(
+        DeliveryLog.objects.filter(id__in=latest, success=False, account__is_active=True)
+        .order_by()
+        .values_list('account_id', 'error_message')
+    )
+
+
+def schedule_retries(campaign: MessageCampaign) -> int:
+    """Queue a retry for each account whose latest delivery failed; returns how many were queued.
+
+    Accounts that already have an open retry are left alone. Finished retries are
+    reopened with a fresh attempt budget, since a later send failed for them again.
+    The first attempt is due immediately.
+    """
+    failures = failed_accounts(campaign)
+    if not failures:
+        return 0
+    now = timezone.now()
+    existing = {retry.account_id: retry for retry in DeliveryRetry.objects.filter(campaign=campaign, account_id__in=failures)}
+    created, reopened = [], []
+    for account_id, error in failures.items():
+        retry = existing.get(account_id)
+        if retry is None:
+            created.append(DeliveryRetry(campaign=campaign, account_id=account_id, next_attempt_at=now, last_error=error))
+        elif retry.status not in DeliveryRetry.OPEN_STATUSES:
+            retry.status, retry.attempts, retry.next_attempt_at = 'pending', 0, now
+            retry.locked_by, retry.last_error, retry.updated_at = '', error, now
+            reopened.append(retry)
+    with transaction.atomic():
+        DeliveryRetry.objects.bulk_create(created, ignore_conflicts=True)
+        DeliveryRetry.objects.bulk_update(
+            reopened, ['status', 'attempts', 'next_attempt_at', 'locked_by', 'last_error', 'updated_at']
+        )
+    return len(created) + len(reopened)
+
+
+def claim_due_retries(owner: str, lease_seconds: int | None = None, limit: int = 100) -> list[DeliveryRetry]:
+    """Lock up to `limit` due retries for `owner`, oldest first.
+
+    Running retries whose lock has expired are due again, so work abandoned by a
+    crashed engine is picked up. A single conditional UPDATE claims the batch under
+    a fresh token, so concurrent engines never send the same retry twice.
+    """
+    now = timezone.now()
+    lease_seconds = lease_seconds or settings.DISPATCH_LEASE_SECONDS
+    # One lookup per partial index, like `jobs.claim_next_job`.
+    ids = list(
+        DeliveryRetry.objects.filter(status='pending', next_attempt_at__lte=now)
+        .order_by('next_attempt_at', 'id')
+        .values_list('id', flat=True)[:limit]
+    )
+    if len(ids) < limit:
+        ids += DeliveryRetry.objects.filter(status='running', next_attempt_at__lte=now).order_by('next_attempt_at').values_list(
+            'id', flat=True
+        )[: limit - len(ids)]
+    if not ids:
+        return []
+    token = f'{owner}:{uuid.uuid4().hex[:12]}'
+    DeliveryRetry.objects.filter(status__in=DeliveryRetry.OPEN_STATUSES, next_attempt_at__lte=now, pk__in=ids).update(
+        status='running',
+        locked_by=token,
+        next_attempt_at=now + timedelta(seconds=lease_seconds),
+        attempts=F('attempts') + 1,
+        updated_at=now,
+    )
+    return list(
+        DeliveryRetry.objects.filter(pk__in=ids, locked_by=token, status='running')
+        .select_related('campaign', 'account')
+        .order_by('campaign_id', 'id')
+    )
+
+
+def retry_summary(campaign_id: int) -> dict[str, int]:
+    """Number of a campaign's retries in each status."""
+    counts = dict(
+        DeliveryRetry.objects.filter(campaign_id=campaign_id)
+        .order_by()
+        .values('status')
+        .annotate(count=Count('id'))
+        .values_list('status', 'count')
+    )
+    return {status: counts.get(status, 0) for status, _ in DeliveryRetry.STATUS_CHOICES}
+
+
+class DeliveryRetryEngine:
+    """Re-sends failed deliveries on an exponential-backoff schedule with jitter.
+
+    Only the accounts with a due retry are sent to, grouped per campaign. Each round's
+    delivery logs, counter changes, retry rows and campaign status are written in one
+    transaction. An account is given up on (`exhausted`) after `max_attempts` tries.
+
+    A heartbeat keeps the claimed retries locked while a round is sent. If another engine
+    reclaims them, the round only records its delivery logs and leaves the retry rows to it.
+    """
+
+    def __init__(
+        self,
+        dispatcher: MessageDispatcher | None = None,
+        worker_id: str = '',
+        max_attempts: int | None = None,
+        base_delay: int | None = None,
+        max_delay: int | None = None,
+        batch_size: int = 100,
+        rng: random.Random | None = None,
+    ):
+        self.dispatcher = dispatcher or MessageDispatcher()
+        self.worker_id = worker_id or default_worker_id()
+        self.max_attempts = max(1, max_attempts or settings.DELIVERY_RETRY_MAX_ATTEMPTS)
+        self.base_delay = max(1, base_delay or settings.DELIVERY_RETRY_BASE_DELAY)
+        self.max_delay = max(self.base_delay, max_delay or settings.DELIVERY_RETRY_MAX_DELAY)
+        self.batch_size = max(1, batch_size)
+        self.lease_seconds = settings.DISPATCH_LEASE_SECONDS
+        self.rng = rng or random.Random()
+        self._stop = threading.Event()
+
+    def delay(self, attempts: int) -> timedelta:
+        """Wait before the next try after `attempts` failed ones: half fixed, half random."""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** max(0, attempts - 1))
+        return timedelta(seconds=ceiling / 2 + self.rng.uniform(0, ceiling / 2))
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self, interval: float = 5.0) -> None:
+        while not self._stop.is_set():
+            close_old_connections()
+            try:
+                processed = self.run_once()
+            except Exception:
+                logger.exception('Delivery retry round failed')
+                processed = 0
+            if processed < self.batch_size:
+                self._stop.wait(interval)
+
+    def run_once(self) -> int:
+        """Claim and send one batch of due retries; returns how many were processed."""
+        retries = claim_due_retries(self.worker_id, lease_seconds=self.lease_seconds, limit=self.batch_size)
+        by_campaign: dict[int, list[DeliveryRetry]] = defaultdict(list)
+        for retry in retries:
+            by_campaign[retry.campaign_id].append(retry)
+        for group in by_campaign.values():
+            self._retry_campaign(group)
+        return len(retries)
+
+    def _retry_campaign(self, retries: list[DeliveryRetry]) -> None:
+        campaign = retries[0].campaign
+        sendable = []
+        for retry in retries:
+            if retry.attempts > self.max_attempts:
+                # Claimed back from an engine that kept dying mid-send.
+                retry.status, retry.last_error = 'exhausted', retry.last_error or 'Retry engine lost its lock too many times'
+            elif not retry.account.is_active:
+                retry.status, retry.last_error = 'exhausted', 'Account is inactive'
+            else:
+                sendable.append(retry)
+
+        heartbeat = Heartbeat(
+            lambda: self._renew_locks(retries), self.lease_seconds / 3, name=f'delivery-retry-{campaign.id}'
+        ).start()
+        try:
+            deliveries, stats = self.dispatcher.redeliver(campaign, [retry.account for retry in sendable], heartbeat)
+        finally:
+            heartbeat.stop()
+        if heartbeat.lost:
+            # The retry rows belong to the new lock holder now; only record what went out.
+            with transaction.atomic():
+                record_deliveries(deliveries)
+                DeliveryLog.objects.bulk_create(deliveries, batch_size=self.dispatcher.log_batch_size)
+            logger.warning('Delivery retry locks taken over; round abandoned', extra={'campaign_id': campaign.id})
+            return
+
+        now = timezone.now()
+        for retry, delivery in zip(sendable, deliveries):
+            if delivery.success:
+                retry.status, retry.last_error = 'succeeded', ''
+            elif retry.attempts >= self.max_attempts:
+                retry.status, retry.last_error = 'exhausted', delivery.error_message
+            else:
+                retry.status, retry.last_error = 'pending', delivery.error_message
+                retry.next_attempt_at = now + self.delay(retry.attempts)
+        for retry in retries:
+            retry.locked_by, retry.updated_at = '', now
+
+        with transaction.atomic():
+            record_deliveries(deliveries)
+            DeliveryLog.objects.bulk_create(deliveries, batch_size=self.dispatcher.log_batch_size)
+            DeliveryRetry.objects.bulk_update(retries, ['status', 'next_attempt_at', 'locked_by', 'last_error', 'updated_at'])
+            outstanding = DeliveryRetry.objects.filter(campaign=campaign).exclude(status='succeeded').exists()
+            status = MessageCampaign.objects.select_for_update().filter(pk=campaign.pk).values_list('status', flat=True).first()
+            if status == 'sending':
+                # A dispatch started meanwhile; its own finish sets the status.
+                logger.info('Campaign is being sent; retry status left to the dispatch', extra={'campaign_id': campaign.id})
+            else:
+                self.dispatcher.finish_retries(campaign, stats, outstanding)
+        logger.info('Delivery retry round finished', extra={'campaign_id': campaign.id, **stats})
+
+    def _renew_locks(self, retries: list[DeliveryRetry]) -> bool:
+        """Push the claimed retries' lock expiry forward; False once any of them was reclaimed."""
+        now = timezone.now()
+        renewed = DeliveryRetry.objects.filter(
+            pk__in=[retry.pk for retry in retries], locked_by=retries[0].locked_by, status='running'
+        ).update(next_attempt_at=now + timedelta(seconds=self.lease_seconds), updated_at=now)
+        return renewed == len(retries)
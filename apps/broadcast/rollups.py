@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from datetime import date, timedelta
+from typing import Any
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+from .models import DeliveryLog, DeliveryRollup, RollupWatermark
+
+logger = logging.getLogger(__name__)
+
+DELIVERY_ROLLUP = 'delivery_rollup'
+# Error messages kept per rollup row; counts for rarer messages are dropped, so they are approximate.
+ERROR_SLOTS = 10
+MAX_ERROR_LENGTH = 200
+
+
+class WatermarkMoved(Exception):
+    """Another rollup run advanced the watermark first; this run's chunk was rolled back."""
+
+
+def rollup_watermark() -> int:
+    """Id of the last delivery log already counted in `DeliveryRollup`."""
+    return RollupWatermark.objects.filter(name=DELIVERY_ROLLUP).values_list('last_id', flat=True).first() or 0
+
+
+def roll_up_deliveries(chunk_size: int | None = None) -> int:
+    """Fold delivery logs written since the watermark into the daily rollups; returns rows counted.
+
+    Logs are read in id order, `chunk_size` at a time. Each chunk's rollup changes and
+    the new watermark are committed together, so a crash never counts a log twice, and
+    a concurrent run loses the compare-and-set on the watermark instead of double counting.
+    """
+    chunk_size = max(1, chunk_size or settings.ROLLUP_CHUNK_SIZE)
+    RollupWatermark.objects.get_or_create(name=DELIVERY_ROLLUP)
+    last_id = DeliveryLog.objects.aggregate(last=Max('pk'))['last'] or 0
+    counted = 0
+    while True:
+        try:
+            with transaction.atomic():
+                start = rollup_watermark()
+                rows = list(
+                    DeliveryLog.objects.filter(pk__gt=start, pk__lte=last_id)
+                    .order_by('pk')
+                    .values_list('id', 'created_at', 'account_id', 'account__platform', 'success', 'error_message')[:chunk_size]
+                )
+                if not rows:
+                    break
+                _merge(rows)
+                if not RollupWatermark.objects.filter(name=DELIVERY_ROLLUP, last_id=start).update(
+                    last_id=rows[-1][0],
+                    updated_at=timezone.now(),
+                ):
+                    raise WatermarkMoved
+        except WatermarkMoved:
+            logger.warning('Delivery rollup raced another run; stopping', extra={'counted': counted})
+            break
+        counted += len(rows)
+    return counted
+
+
+def _merge(rows: list[tuple]) -> None:
+    buckets: dict[tuple[date, int], dict[str, Any]] = {}
+    for _, created_at, account_id, platform, success, error_message in rows:
+        bucket = buckets.setdefault(
+            (created_at.date(), account_id),
+            {'platform': platform, 'sent': 0, 'failed': 0, 'errors': Counter()},
+        )
+        if success:
+            bucket['sent'] += 1
+        else:
+            bucket['failed'] += 1
+            bucket['errors'][(error_message or 'Unknown error')[:MAX_ERROR_LENGTH]] += 1
+
+    existing = {
+        (rollup.day, rollup.account_id): rollup
+        for rollup in DeliveryRollup.objects.filter(
+            day__in={day for day, _ in buckets},
+            account_id__in={account_id for _, account_id in buckets},
+        )
+    }
+    now = timezone.now()
+    created, updated = [], []
+    for (day, account_id), bucket in buckets.items():
+        rollup = existing.get((day, account_id))
+        if rollup is None:
+            rollup = DeliveryRollup(day=day, account_id=account_id, platform=bucket['platform'])
+            created.append(rollup)
+        else:
+            updated.append(rollup)
+        rollup.sent += bucket['sent']
+        rollup.failed += bucket['failed']
+        rollup.top_errors = dict((Counter(rollup.top_errors) + bucket['errors']).most_common(ERROR_SLOTS))
+        rollup.updated_at = now
+    DeliveryRollup.objects.bulk_create(created)
+    DeliveryRollup.objects.bulk_update(updated, ['sent', 'failed', 'top_errors', 'updated_at'])
+
+
+def delivery_analytics(
+    days: int,
+    platform: str = '',
+    account_id: int | None = None,
+    until: date | None = None,
+    top_errors: int = 5,
+) -> dict[str, Any]:
+    """Success rates by platform and day over the last `days` days, read from the rollups only."""
+    until = until or timezone.now().date()
+    since = until - timedelta(days=days - 1)
+    rollups = DeliveryRollup.objects.filter(day__gte=since, day__lte=until)
+    if platform:
+        rollups = rollups.filter(platform=platform)
+    if account_id is not None:
+        rollups = rollups.filter(account_id=account_id)
+
+    totals = {'sent': Sum('sent'), 'failed': Sum('failed')}
+    platforms = {
+        row['platform']: _rates(row)
+        for row in rollups.order_by().values('platform').annotate(**totals).order_by('platform')
+    }
+    daily = [
+        {'day': row['day'].isoformat(), **_rates(row)}
+        for row in rollups.order_by().values('day').annotate(**totals).order_by('day')
+    ]
+    errors: Counter[str] = Counter()
+    for counts in rollups.filter(failed__gt=0).values_list('top_errors', flat=True):
+        errors.update(counts)
+    watermark = RollupWatermark.objects.filter(name=DELIVERY_ROLLUP).values_list('updated_at', flat=True).first()
+    return {
+        'since': since.isoformat(),
+        'until': until.isoformat(),
+        'totals': _rates({key: sum(item[key] for item in platforms.values()) for key in ('sent', 'failed')}),
+        'platforms': platforms,
+        'daily': daily,
+        'top_errors': [{'message': message, 'count': count} for message, count in errors.most_common(top_errors)],
+        'rolled_up_at': watermark.isoformat() if watermark else None,
+    }
+
+
+def _rates(row: dict) -> dict[str, Any]:
+    sent, failed = row['sent'] or 0, row['failed'] or 0
+    total = sent + failed
+    return {'total': total, 'sent': sent, 'failed': failed, 'success_rate': round(sent / total, 4) if total else None}
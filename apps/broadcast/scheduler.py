@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.utils import timezone
+
+from .models import MessageCampaign
+from .services import LeaseLost, MessageDispatcher, claim_campaign, claim_next_due_campaign, default_worker_id
+
+logger = logging.getLogger(__name__)
+
+# Rows committed slightly out of `updated_at` order are caught by re-reading this window.
+HIGH_WATER_OVERLAP = timedelta(seconds=5)
+
+
+class CampaignScheduler:
+    """Long-running scheduler that sleeps until the next `send_at` instead of polling on a cron tick.
+
+    Upcoming send times are kept in an in-memory min-heap. New or rescheduled
+    campaigns are picked up with a cheap `updated_at` high-water-mark query, and
+    every due campaign is claimed through `claim_campaign`, so the daemon can run
+    alongside cron workers or other scheduler instances.
+
+    Claimed campaigns are sent on a pool of `dispatch_workers` threads, so a slow
+    provider never delays the campaigns due behind it. A campaign is only claimed
+    once a worker is free, which keeps its lease from ticking while it waits.
+    """
+
+    def __init__(
+        self,
+        dispatcher: MessageDispatcher | None = None,
+        worker_id: str = '',
+        poll_interval: float = 1.0,
+        resync_interval: float = 60.0,
+        dispatch_workers: int | None = None,
+    ):
+        self.dispatcher = dispatcher or MessageDispatcher()
+        self.worker_id = worker_id or default_worker_id()
+        self.poll_interval = poll_interval
+        self.resync_interval = resync_interval
+        self.dispatch_workers = max(1, dispatch_workers or settings.SCHEDULER_DISPATCH_WORKERS)
+        self._executor: ThreadPoolExecutor | None = None
+        self._inflight: set[Future] = set()
+        self._heap: list[tuple[datetime, int]] = []
+        self._scheduled: dict[int, datetime] = {}
+        self._high_water: datetime | None = None
+        self._next_poll = 0.0
+        self._next_resync = 0.0
+        self._stop = threading.Event()
+        # Set by `stop` and whenever a worker finishes, so the loop never oversleeps a free worker.
+        self._wake = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def run(self) -> None:
+        try:
+            while not self._stop.is_set():
+                close_old_connections()
+                try:
+                    wait = self.run_once()
+                except Exception:
+                    logger.exception('Scheduler iteration failed')
+                    wait = self.poll_interval
+                self._wake.wait(wait)
+                self._wake.clear()
+        finally:
+            self.join()
+
+    def join(self) -> None:
+        """Wait for the campaigns being sent and shut the dispatch pool down."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._inflight.clear()
+
+    def run_once(self) -> float:
+        """Refresh the heap if needed, hand due campaigns to the workers and return seconds to sleep."""
+        monotonic = time.monotonic()
+        if monotonic >= self._next_resync:
+            self.resync()
+            self._next_resync = monotonic + self.resync_interval
+            self._next_poll = monotonic + self.poll_interval
+        elif monotonic >= self._next_poll:
+            self.poll()
+            self._next_poll = monotonic + self.poll_interval
+
+        self.dispatch_due()
+
+        wait = max(0.0, self._next_poll - time.monotonic())
+        self._drop_superseded()
+        if self._heap:
+            until_due = (self._heap[0][0] - timezone.now()).total_seconds()
+            # Overdue campaigns with every worker busy wait for a worker to finish, which wakes the loop.
+            if until_due > 0 or self.idle_workers:
+                wait = min(wait, max(0.0, until_due))
+        return wait
+
+    def poll(self) -> None:
+        """Load scheduled campaigns created or changed since the last poll."""
+        queryset = MessageCampaign.objects.filter(status='scheduled', send_at__isnull=False)
+        if self._high_water is not None:
+            queryset = queryset.filter(updated_at__gte=self._high_water - HIGH_WATER_OVERLAP)
+        for campaign_id, send_at, updated_at in queryset.values_list('id', 'send_at', 'updated_at'):
+            self._push(campaign_id, send_at)
+            if self._high_water is None or updated_at > self._high_water:
+                self._high_water = updated_at
+        if self._high_water is None:
+            self._high_water = timezone.now()
+
+    def resync(self) -> None:
+        """Rebuild the heap from scratch and recover campaigns whose dispatch lease expired."""
+        self._heap.clear()
+        self._scheduled.clear()
+        self._high_water = None
+        self.poll()
+        while self.idle_workers and (campaign := claim_next_due_campaign(self.worker_id)) is not None:
+            self._scheduled.pop(campaign.id, None)
+            self._submit(campaign)
+
+    def dispatch_due(self) -> int:
+        """Claim due campaigns while a worker is free and hand them over; returns how many."""
+        dispatched = 0
+        now = timezone.now()
+        self._drop_superseded()
+        while self._heap and self._heap[0][0] <= now and self.idle_workers:
+            _, campaign_id = heapq.heappop(self._heap)
+            del self._scheduled[campaign_id]
+            # None when another worker claimed it, or it was cancelled/rescheduled.
+            campaign = claim_campaign(campaign_id, self.worker_id)
+            if campaign is not None:
+                self._submit(campaign)
+                dispatched += 1
+            self._drop_superseded()
+            now = timezone.now()
+        return dispatched
+
+    @property
+    def pending(self) -> int:
+        return len(self._scheduled)
+
+    @property
+    def idle_workers(self) -> int:
+        self._inflight = {future for future in self._inflight if not future.done()}
+        return self.dispatch_workers - len(self._inflight)
+
+    def _push(self, campaign_id: int, send_at: datetime) -> None:
+        if self._scheduled.get(campaign_id) == send_at:
+            return
+        self._scheduled[campaign_id] = send_at
+        heapq.heappush(self._heap, (send_at, campaign_id))
+
+    def _drop_superseded(self) -> None:
+        """Pop heap entries left behind by a reschedule or a claim made during resync."""
+        while self._heap and self._scheduled.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def _submit(self, campaign: MessageCampaign) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.dispatch_workers, thread_name_prefix='scheduler-dispatch')
+        future = self._executor.submit(self._dispatch_in_worker, campaign)
+        future.add_done_callback(lambda _: self._wake.set())
+        self._inflight.add(future)
+
+    def _dispatch_in_worker(self, campaign: MessageCampaign) -> None:
+        try:
+            self._dispatch(campaign)
+        except Exception:
+            logger.exception('Scheduled campaign dispatch failed', extra={'campaign_id': campaign.id})
+        finally:
+            connections.close_all()
+
+    def _dispatch(self, campaign: MessageCampaign) -> None:
+        lag = (timezone.now() - campaign.send_at).total_seconds() if campaign.send_at else 0.0
+        try:
+            stats = self.dispatcher.dispatch_campaign(campaign, exclude_delivered=True)
+        except LeaseLost:
+            logger.warning('Scheduled campaign taken over by another worker', extra={'campaign_id': campaign.id})
+            return
+        logger.info(
+            'Scheduled campaign dispatched',
+            extra={'campaign_id': campaign.id, 'stats': stats, 'lag_seconds': round(lag, 3)},
+        )
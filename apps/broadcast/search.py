@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import re
+
+from django.db import connection
+from django.db.models import Case, IntegerField, QuerySet, Value, When
+from django.db.models.expressions import RawSQL
+
+ACCOUNT_FTS_TABLE = 'broadcast_socialaccount_fts'
+CAMPAIGN_FTS_TABLE = 'broadcast_messagecampaign_fts'
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_available: dict[tuple[str, str], bool] = {}
+
+
+def fts_available(table: str) -> bool:
+    """True when the FTS5 index created by migration 0008 exists on the current database."""
+    if connection.vendor != 'sqlite':
+        return False
+    cache_key = (str(connection.settings_dict['NAME']), table)
+    if cache_key not in _available:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [table])
+            _available[cache_key] = cursor.fetchone() is not None
+    return _available[cache_key]
+
+
+def build_match_query(text: str) -> str:
+    """Turn free text into an FTS5 query where every word must match as a prefix."""
+    return ' '.join(f'"{token}"*' for token in _TOKEN_RE.findall(text))
+
+
+def matching_ids(table: str, text: str) -> RawSQL | None:
+    """Subquery of matching row ids, usable as `queryset.filter(id__in=...)`."""
+    match = build_match_query(text)
+    if not match:
+        return None
+    return RawSQL(f'SELECT rowid FROM {table} WHERE {table} MATCH %s', [match])
+
+
+def ranked_ids(table: str, text: str, limit: int = 500) -> list[int]:
+    """Best-matching row ids first, ranked by BM25."""
+    match = build_match_query(text)
+    if not match:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM {table} WHERE {table} MATCH %s ORDER BY bm25({table}) LIMIT %s',
+            [match, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def annotate_rank(queryset: QuerySet, ids: list[int], name: str = 'search_rank') -> QuerySet:
+    """Restrict `queryset` to `ids` and annotate each row with its position in that ranking."""
+    whens = [When(pk=pk, then=Value(position)) for position, pk in enumerate(ids)]
+    return queryset.filter(pk__in=ids).annotate(**{name: Case(*whens, default=Value(len(ids)), output_field=IntegerField())})
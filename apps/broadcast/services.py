@@ -1,79 +1,573 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import os
+import socket
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
+from typing import AsyncIterator, Callable, Iterator
 
-from django.db import transaction
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
 
-from .context7 import Context7Client
+from .delivery_stats import ensure_counters, record_deliveries
 from .models import DeliveryLog, MessageCampaign, SocialAccount
+from .outbox import enqueue_event
+from .providers import ProviderRegistry, ProviderResult, provider_registry
+from .rate_limit import RateLimiter, RateLimitExceeded
 
 
 logger = logging.getLogger(__name__)
 
 
+class LeaseLost(Exception):
+    """Another worker took over the campaign or job being dispatched; stop sending."""
+
+
+class Heartbeat:
+    """Calls `renew` every `interval` seconds on a background thread until stopped.
+
+    Renewal does not wait for the work it protects, so a slow provider call or a long
+    rate-limit wait cannot outlive a lease. Once `renew` returns False the lease belongs
+    to someone else: `lost` becomes true and the heartbeat stops.
+    """
+
+    def __init__(self, renew: Callable[[], bool], interval: float, name: str = 'lease-heartbeat'):
+        self.renew = renew
+        self.interval = max(0.01, interval)
+        self._stopped = threading.Event()
+        self._lost = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    @property
+    def lost(self) -> bool:
+        return self._lost.is_set()
+
+    def start(self) -> Heartbeat:
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self) -> None:
+        try:
+            while not self._stopped.wait(self.interval):
+                try:
+                    renewed = self.renew()
+                except Exception:
+                    logger.exception('Lease renewal failed; retrying')
+                    continue
+                if not renewed:
+                    self._lost.set()
+                    return
+        finally:
+            connections.close_all()
+
+
+SendResult = tuple[bool, str, dict, str]
+
+
+def _failed_send(exc: BaseException) -> SendResult:
+    return False, '', {}, str(exc) or exc.__class__.__name__
+
+
+class SendBatch:
+    """Provider results for `accounts`, yielded in order as `(account, result)` pairs.
+
+    In concurrent mode each platform gets its own bounded pool, so a slow provider
+    cannot starve the others and never exceeds its configured limit. A consumer that
+    stops early calls `drain`, which cancels the sends not started yet and returns the
+    ones already under way, so every provider call can still be logged.
+    """
+
+    def __init__(self, dispatcher: MessageDispatcher, campaign: MessageCampaign, accounts: list[SocialAccount]):
+        self.dispatcher = dispatcher
+        self.campaign = campaign
+        self.accounts = accounts
+        self._yielded = 0
+        self._executors: dict[str, ThreadPoolExecutor] = {}
+        self._futures: list[Future] = []
+        if dispatcher.concurrent and len(accounts) > 1:
+            self._executors = {
+                platform: ThreadPoolExecutor(
+                    max_workers=dispatcher.platform_limit(platform),
+                    thread_name_prefix=f'dispatch-{platform}',
+                )
+                for platform in {account.platform for account in accounts}
+            }
+            self._futures = [
+                self._executors[account.platform].submit(
+                    dispatcher._send_in_worker, campaign.message, account, image_url=campaign.image_url
+                )
+                for account in accounts
+            ]
+
+    def __iter__(self) -> Iterator[tuple[SocialAccount, SendResult]]:
+        for index in range(self._yielded, len(self.accounts)):
+            account = self.accounts[index]
+            if self._futures:
+                result = self._futures[index].result()
+            else:
+                result = self.dispatcher._send_to_provider(
+                    self.campaign.message, account, image_url=self.campaign.image_url
+                )
+            self._yielded = index + 1
+            yield account, result
+
+    def drain(self) -> list[tuple[SocialAccount, SendResult]]:
+        """Stop sending and return the results of the sends that started but were not yielded."""
+        remaining = list(zip(self.accounts[self._yielded :], self._futures[self._yielded :]))
+        self._yielded = len(self.accounts)
+        self.close()
+        drained = []
+        for account, future in remaining:
+            if future.cancelled():
+                continue
+            exc = future.exception()
+            drained.append((account, _failed_send(exc) if exc is not None else future.result()))
+        return drained
+
+    def close(self) -> None:
+        for future in self._futures:
+            future.cancel()
+        for executor in self._executors.values():
+            executor.shutdown(wait=True)
+
+
+class AsyncSendBatch:
+    """`SendBatch` on the event loop: one task per account, bounded by a semaphore per platform."""
+
+    def __init__(self, dispatcher: MessageDispatcher, campaign: MessageCampaign, accounts: list[SocialAccount]):
+        self.dispatcher = dispatcher
+        self.campaign = campaign
+        self.accounts = accounts
+        self._yielded = 0
+        self._started: set[int] = set()
+        self._tasks: list[asyncio.Task] = []
+        if dispatcher.concurrent and len(accounts) > 1:
+            slots = {platform: asyncio.Semaphore(dispatcher.platform_limit(platform)) for platform in {a.platform for a in accounts}}
+            self._tasks = [
+                asyncio.ensure_future(self._send(index, account, slots[account.platform]))
+                for index, account in enumerate(accounts)
+            ]
+
+    async def _send(self, index: int, account: SocialAccount, slot: asyncio.Semaphore) -> SendResult:
+        async with slot:
+            self._started.add(index)
+            return await self.dispatcher._asend_to_provider(
+                self.campaign.message, account, image_url=self.campaign.image_url
+            )
+
+    async def __aiter__(self) -> AsyncIterator[tuple[SocialAccount, SendResult]]:
+        for index in range(self._yielded, len(self.accounts)):
+            account = self.accounts[index]
+            if self._tasks:
+                result = await self._tasks[index]
+            else:
+                result = await self.dispatcher._asend_to_provider(
+                    self.campaign.message, account, image_url=self.campaign.image_url
+                )
+            self._yielded = index + 1
+            yield account, result
+
+    async def adrain(self) -> list[tuple[SocialAccount, SendResult]]:
+        """Cancel the sends still waiting for a slot and return the results of the rest."""
+        remaining = list(enumerate(self._tasks))[self._yielded :]
+        self._yielded = len(self.accounts)
+        for index, task in remaining:
+            if index not in self._started:
+                task.cancel()
+        await asyncio.gather(*(task for _, task in remaining), return_exceptions=True)
+        drained = []
+        for index, task in remaining:
+            if task.cancelled():
+                continue
+            exc = task.exception()
+            drained.append((self.accounts[index], _failed_send(exc) if exc is not None else task.result()))
+        return drained
+
+    async def aclose(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
 class MessageDispatcher:
     """Dispatches a campaign to every active social account."""
 
-    def __init__(self, context7_client: Context7Client | None = None):
-        self.context7_client = context7_client or Context7Client()
+    def __init__(
+        self,
+        concurrent: bool | None = None,
+        platform_concurrency: dict[str, int] | None = None,
+        log_batch_size: int | None = None,
+        providers: ProviderRegistry | None = None,
+        rate_limiter: RateLimiter | None = None,
+    ):
+        self.concurrent = settings.DISPATCH_CONCURRENT if concurrent is None else concurrent
+        self.platform_concurrency = {**settings.DISPATCH_PLATFORM_CONCURRENCY, **(platform_concurrency or {})}
+        self.log_batch_size = max(1, log_batch_size or settings.DISPATCH_LOG_BATCH_SIZE)
+        self.providers = providers or provider_registry
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.throttle_retries = max(0, settings.PROVIDER_THROTTLE_RETRIES)
+
+    def dispatch_campaign(
+        self,
+        campaign: MessageCampaign,
+        accounts=None,
+        exclude_delivered: bool = False,
+        progress: Callable[[dict], None] | None = None,
+        heartbeat: Heartbeat | None = None,
+    ) -> dict:
+        """Send `campaign` to `accounts` (default: every active account) and return delivery stats.
+
+        With `exclude_delivered`, accounts that already have a successful delivery for
+        this campaign are skipped, which makes resuming a crashed dispatch safe.
+        `progress` is called with the running stats once the targets are known and
+        after every batch of delivery logs is written. `heartbeat` guards a lock the
+        caller holds, such as a dispatch job's, instead of the campaign's own lease;
+        either way the dispatch stops with `LeaseLost` once the lock is gone.
+        """
+        accounts = self._prepare(campaign, accounts, exclude_delivered)
+        stats = {'total': len(accounts), 'sent': 0, 'failed': 0}
+        report = progress or (lambda stats: None)
+        report(stats)
+
+        # Provider calls run outside any transaction so the database write lock is
+        # only held while a batch of delivery logs is inserted.
+        pending: list[DeliveryLog] = []
+        lease = heartbeat or self._lease_heartbeat(campaign)
+        results = self._send_all(campaign, accounts)
+        try:
+            for account, result in results:
+                pending.append(self._delivery(campaign, account, result, stats))
+                if lease.lost:
+                    raise LeaseLost(f'Lock on campaign {campaign.id} was taken over')
+                if len(pending) >= self.log_batch_size:
+                    self._flush_deliveries(pending)
+                    pending = []
+                    report(stats)
+        except LeaseLost:
+            # The new owner decides the status and skips delivered accounts, so log every
+            # send this worker made, including those still in flight.
+            pending += self._deliveries(campaign, results.drain(), stats)
+            self._flush_deliveries(pending)
+            raise
+        except Exception:
+            # Whatever was already sent must still be recorded before giving up.
+            pending += self._deliveries(campaign, results.drain(), stats)
+            self._flush_deliveries(pending)
+            report(stats)
+            self._set_status(campaign, 'failed')
+            raise
+        finally:
+            results.close()
+            if heartbeat is None:
+                lease.stop()
+
+        self._flush_deliveries(pending)
+        report(stats)
+        self._finish(campaign, stats)
+        return stats
+
+    async def adispatch_campaign(self, campaign: MessageCampaign, accounts=None, exclude_delivered: bool = False) -> dict:
+        """`dispatch_campaign` on the event loop.
+
+        Provider requests are awaited rather than run on threads, so one worker can keep
+        many slow sends in flight; per-platform concurrency limits still apply. Database
+        work runs through `sync_to_async`.
+        """
+        accounts = await sync_to_async(self._prepare)(campaign, accounts, exclude_delivered)
+        stats = {'total': len(accounts), 'sent': 0, 'failed': 0}
+
+        pending: list[DeliveryLog] = []
+        heartbeat = self._lease_heartbeat(campaign)
+        results = self._asend_all(campaign, accounts)
+        try:
+            async for account, result in results:
+                pending.append(self._delivery(campaign, account, result, stats))
+                if heartbeat.lost:
+                    raise LeaseLost(f'Lease on campaign {campaign.id} was taken over')
+                if len(pending) >= self.log_batch_size:
+                    await sync_to_async(self._flush_deliveries)(pending)
+                    pending = []
+        except LeaseLost:
+            pending += self._deliveries(campaign, await results.adrain(), stats)
+            await sync_to_async(self._flush_deliveries)(pending)
+            raise
+        except BaseException:
+            # Also on cancellation, e.g. when the client disconnects mid-dispatch.
+            pending += self._deliveries(campaign, await results.adrain(), stats)
+            await sync_to_async(self._flush_deliveries)(pending)
+            await sync_to_async(self._set_status)(campaign, 'failed')
+            raise
+        finally:
+            await results.aclose()
+            heartbeat.stop()
 
-    def dispatch_campaign(self, campaign: MessageCampaign, accounts=None) -> dict:
+        await sync_to_async(self._flush_deliveries)(pending)
+        await sync_to_async(self._finish)(campaign, stats)
+        return stats
+
+    def redeliver(
+        self,
+        campaign: MessageCampaign,
+        accounts: list[SocialAccount],
+        heartbeat: Heartbeat | None = None,
+    ) -> tuple[list[DeliveryLog], dict]:
+        """Send `campaign` again to just `accounts`; returns the unsaved delivery logs and their stats.
+
+        Unlike `dispatch_campaign` nothing is written and the status is left alone:
+        `retries.DeliveryRetryEngine` saves the logs together with its own bookkeeping.
+        Sending stops early once `heartbeat` reports its lock lost; the deliveries made
+        so far, including the sends that were still in flight, are returned.
+        """
+        stats = {'total': len(accounts), 'sent': 0, 'failed': 0}
+        self.providers.refresh({platform: self.platform_limit(platform) for platform in {a.platform for a in accounts}})
+        deliveries: list[DeliveryLog] = []
+        results = self._send_all(campaign, accounts)
+        try:
+            for account, result in results:
+                deliveries.append(self._delivery(campaign, account, result, stats))
+                if heartbeat is not None and heartbeat.lost:
+                    deliveries += self._deliveries(campaign, results.drain(), stats)
+                    break
+        finally:
+            results.close()
+        return deliveries, stats
+
+    def record_undeliverable(self, campaign: MessageCampaign, accounts, error: str) -> dict:
+        """Log a failed delivery to each of `accounts` without calling a provider; returns the stats.
+
+        Used when a campaign cannot be posted to them at all, e.g. photo-only platforms
+        whose image failed to generate, so stats, rollups and retries still see them.
+        Accounts that already have a successful delivery are left alone.
+        """
+        delivered = DeliveryLog.objects.filter(campaign=campaign, success=True).values('account_id')
+        accounts = list(accounts.exclude(id__in=delivered))
+        stats = {'total': len(accounts), 'sent': 0, 'failed': 0}
+        if not accounts:
+            return stats
+        ensure_counters(campaign.id, {account.platform for account in accounts})
+        self._flush_deliveries([
+            self._delivery(campaign, account, (False, '', {'platform': account.platform, 'handle': account.handle}, error), stats)
+            for account in accounts
+        ])
+        self._finish(campaign, stats)
+        return stats
+
+    def finish_retries(self, campaign: MessageCampaign, stats: dict, outstanding: bool) -> None:
+        """Close a retry round: the campaign is `sent` once none of its accounts is left failing."""
+        self._set_status(
+            campaign,
+            'failed' if outstanding else 'sent',
+            event=('campaign.retried', {'campaign_id': campaign.id, 'title': campaign.title, 'stats': stats}),
+        )
+
+    @staticmethod
+    def _lease_heartbeat(campaign: MessageCampaign) -> Heartbeat:
+        """Keep a claimed campaign's lease alive while it is dispatched; idle for unleased campaigns."""
+        heartbeat = Heartbeat(lambda: renew_lease(campaign), settings.DISPATCH_LEASE_SECONDS / 3)
+        return heartbeat.start() if campaign.lease_owner else heartbeat
+
+    def _prepare(self, campaign: MessageCampaign, accounts, exclude_delivered: bool) -> list[SocialAccount]:
+        """Resolve the target accounts and mark the campaign as sending."""
         accounts = accounts if accounts is not None else SocialAccount.objects.filter(is_active=True)
-        stats = {'total': accounts.count(), 'sent': 0, 'failed': 0}
+        if exclude_delivered:
+            delivered = DeliveryLog.objects.filter(campaign=campaign, success=True).values('account_id')
+            accounts = accounts.exclude(id__in=delivered)
+        accounts = list(accounts)
+
+        platforms = {account.platform for account in accounts}
+        self.providers.refresh({platform: self.platform_limit(platform) for platform in platforms})
+        if platforms:
+            ensure_counters(campaign.id, platforms)
+        self._set_status(campaign, 'sending')
+        return accounts
 
+    @classmethod
+    def _deliveries(cls, campaign: MessageCampaign, sends: list[tuple[SocialAccount, SendResult]], stats: dict) -> list[DeliveryLog]:
+        return [cls._delivery(campaign, account, result, stats) for account, result in sends]
+
+    @staticmethod
+    def _delivery(campaign: MessageCampaign, account: SocialAccount, result: tuple, stats: dict) -> DeliveryLog:
+        success, provider_message_id, payload, error_message = result
+        stats['sent' if success else 'failed'] += 1
+        return DeliveryLog(
+            campaign=campaign,
+            account=account,
+            success=success,
+            provider_message_id=provider_message_id,
+            response_payload=payload,
+            error_message=error_message,
+        )
+
+    def _finish(self, campaign: MessageCampaign, stats: dict) -> None:
+        self._set_status(
+            campaign,
+            'sent' if stats['failed'] == 0 else 'failed',
+            event=('campaign.dispatched', {'campaign_id': campaign.id, 'title': campaign.title, 'stats': stats}),
+        )
+
+    def _set_status(self, campaign: MessageCampaign, status: str, event: tuple[str, dict] | None = None) -> bool:
+        """Save a status transition, together with its outbox event when one is given.
+
+        Finishing a leased campaign also releases the lease, but only while this worker
+        still holds it; otherwise nothing is written and False is returned.
+        """
         with transaction.atomic():
-            campaign.status = 'sending'
-            campaign.save(update_fields=['status', 'updated_at'])
-
-            for account in accounts:
-                # Placeholder for real provider adapters (Meta API, X API, LinkedIn API, etc.)
-                success, provider_message_id, payload, error_message = self._send_to_provider(
-                    campaign.message,
-                    account,
-                    image_url=campaign.image_url,
-                )
-                DeliveryLog.objects.create(
-                    campaign=campaign,
-                    account=account,
-                    success=success,
-                    provider_message_id=provider_message_id,
-                    response_payload=payload,
-                    error_message=error_message,
+            if status in {'sent', 'failed'} and campaign.lease_owner:
+                now = timezone.now()
+                released = MessageCampaign.objects.filter(pk=campaign.pk, lease_owner=campaign.lease_owner).update(
+                    status=status,
+                    lease_owner='',
+                    lease_expires_at=None,
+                    updated_at=now,
                 )
-                if success:
-                    stats['sent'] += 1
-                else:
-                    stats['failed'] += 1
-
-            campaign.status = 'sent' if stats['failed'] == 0 else 'failed'
-            campaign.save(update_fields=['status', 'updated_at'])
-
-        context7_result = self.context7_client.publish_event(
-            'campaign.dispatched',
-            {
-                'campaign_id': campaign.id,
-                'title': campaign.title,
-                'status': campaign.status,
-                'stats': stats,
-            },
-        )
-        if not context7_result.success:
-            logger.warning(
-                'Context7 event publish failed',
-                extra={
-                    'campaign_id': campaign.id,
-                    'status_code': context7_result.status_code,
-                    'payload': context7_result.payload,
-                },
-            )
-        return stats
+                if not released:
+                    logger.warning('Campaign lease lost; status not saved', extra={'campaign_id': campaign.pk, 'status': status})
+                    return False
+                campaign.lease_owner, campaign.lease_expires_at, campaign.updated_at = '', None, now
+                campaign.status = status
+            else:
+                campaign.status = status
+                campaign.save(update_fields=['status', 'updated_at'])
+            if event is not None:
+                event_name, payload = event
+                enqueue_event(event_name, {**payload, 'status': status})
+        return True
+
+    def _flush_deliveries(self, deliveries: list[DeliveryLog]) -> None:
+        if not deliveries:
+            return
+        with transaction.atomic():
+            record_deliveries(deliveries)
+            DeliveryLog.objects.bulk_create(deliveries, batch_size=self.log_batch_size)
+
+    def platform_limit(self, platform: str) -> int:
+        limit = self.platform_concurrency.get(platform, settings.DISPATCH_DEFAULT_PLATFORM_CONCURRENCY)
+        return max(1, limit)
+
+    def _send_all(self, campaign: MessageCampaign, accounts: list[SocialAccount]) -> SendBatch:
+        return SendBatch(self, campaign, accounts)
+
+    def _asend_all(self, campaign: MessageCampaign, accounts: list[SocialAccount]) -> AsyncSendBatch:
+        return AsyncSendBatch(self, campaign, accounts)
+
+    def _send_in_worker(self, message: str, account: SocialAccount, image_url: str = '') -> tuple[bool, str, dict, str]:
+        try:
+            return self._send_to_provider(message, account, image_url=image_url)
+        finally:
+            # The rate limiter may have opened a connection on this pool thread.
+            connections.close_all()
 
     def _send_to_provider(self, message: str, account: SocialAccount, image_url: str = '') -> tuple[bool, str, dict, str]:
-        # Stubbed provider behavior for now.
-        payload = {
-            'platform': account.platform,
-            'handle': account.handle,
-            'preview': message[:100],
-            'image_url': image_url,
-        }
-        return True, f'{account.platform}-{account.id}', payload, ''
+        # Checked out, so a concurrent `refresh` cannot close its session mid-send.
+        adapter = self.providers.acquire(account.platform)
+        try:
+            for attempt in range(self.throttle_retries + 1):
+                try:
+                    self.rate_limiter.acquire(account.platform, adapter.app_name)
+                    result = adapter.send(message, account, image_url=image_url)
+                    if result.is_throttled:
+                        # Even after the last attempt, so the next send honours the provider's Retry-After;
+                        # only then there is no reason for this worker to sleep it off.
+                        last = attempt == self.throttle_retries
+                        self.rate_limiter.block(account.platform, adapter.app_name, result.retry_after, wait=not last)
+                except RateLimitExceeded as exc:
+                    result = self._rate_limited(account, exc)
+                    break
+                if not result.is_throttled:
+                    break
+        finally:
+            self.providers.release(adapter)
+        return result.as_tuple()
+
+    async def _asend_to_provider(self, message: str, account: SocialAccount, image_url: str = '') -> tuple[bool, str, dict, str]:
+        adapter = self.providers.acquire(account.platform)
+        try:
+            for attempt in range(self.throttle_retries + 1):
+                try:
+                    await self.rate_limiter.aacquire(account.platform, adapter.app_name)
+                    result = await adapter.asend(message, account, image_url=image_url)
+                    if result.is_throttled:
+                        last = attempt == self.throttle_retries
+                        await self.rate_limiter.ablock(account.platform, adapter.app_name, result.retry_after, wait=not last)
+                except RateLimitExceeded as exc:
+                    result = self._rate_limited(account, exc)
+                    break
+                if not result.is_throttled:
+                    break
+        finally:
+            self.providers.release(adapter)
+        return result.as_tuple()
+
+    @staticmethod
+    def _rate_limited(account: SocialAccount, exc: RateLimitExceeded) -> ProviderResult:
+        return ProviderResult(
+            success=False,
+            provider_message_id='',
+            payload={'platform': account.platform, 'handle': account.handle},
+            error_message=str(exc),
+            status_code=429,
+        )
+
+
+def default_worker_id() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _claimable(now) -> Q:
+    # Due scheduled campaigns, plus campaigns whose dispatching worker stopped renewing its lease.
+    return Q(status='scheduled', send_at__lte=now) | Q(status='sending', lease_expires_at__lt=now)
+
+
+def claim_campaign(campaign_id: int, owner: str, lease_seconds: int | None = None) -> MessageCampaign | None:
+    """Atomically move one due campaign to `sending` under `owner`'s lease.
+
+    The conditional UPDATE only matches while the campaign is still claimable, so
+    when several workers race for the same row exactly one of them wins.
+    """
+    now = timezone.now()
+    lease_seconds = lease_seconds or settings.DISPATCH_LEASE_SECONDS
+    claimed = MessageCampaign.objects.filter(_claimable(now), pk=campaign_id).update(
+        status='sending',
+        lease_owner=owner,
+        lease_expires_at=now + timedelta(seconds=lease_seconds),
+        updated_at=now,
+    )
+    if not claimed:
+        return None
+    return MessageCampaign.objects.get(pk=campaign_id)
+
+
+def claim_next_due_campaign(owner: str, lease_seconds: int | None = None, candidates: int = 10) -> MessageCampaign | None:
+    now = timezone.now()
+    candidate_ids = (
+        MessageCampaign.objects.filter(_claimable(now))
+        .order_by('send_at', 'id')
+        .values_list('id', flat=True)[:candidates]
+    )
+    for campaign_id in candidate_ids:
+        campaign = claim_campaign(campaign_id, owner, lease_seconds)
+        if campaign is not None:
+            return campaign
+    return None
+
+
+def renew_lease(campaign: MessageCampaign, lease_seconds: int | None = None) -> bool:
+    lease_seconds = lease_seconds or settings.DISPATCH_LEASE_SECONDS
+    expires_at = timezone.now() + timedelta(seconds=lease_seconds)
+    renewed = MessageCampaign.objects.filter(pk=campaign.pk, lease_owner=campaign.lease_owner).update(
+        lease_expires_at=expires_at,
+    )
+    if renewed:
+        campaign.lease_expires_at = expires_at
+    return bool(renewed)
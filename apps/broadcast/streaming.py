@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import json
+import math
+import threading
+from collections import deque
+
+STREAMED_FIELDS = ('title', 'message')
+
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class JSONFieldStream:
+    """Pulls top-level string fields out of a JSON object while it is still arriving.
+
+    `feed()` takes the next chunk of raw JSON and returns `(field, text)` pairs with
+    the decoded characters each watched field gained in that chunk. Escapes split
+    across chunks are handled; everything outside the watched fields is skipped.
+    """
+
+    def __init__(self, fields: tuple[str, ...] = STREAMED_FIELDS):
+        self.fields = set(fields)
+        self.text = ''
+        self.values: dict[str, str] = {}
+        self._depth = 0
+        self._in_string = False
+        self._is_value = False
+        self._after_colon = False
+        self._escape = False
+        self._unicode = ''
+        self._high_surrogate = ''
+        self._buffer: list[str] = []
+        self._key = ''
+        self._field: str | None = None
+
+    def feed(self, chunk: str) -> list[tuple[str, str]]:
+        self.text += chunk
+        deltas: list[tuple[str, str]] = []
+        for char in chunk:
+            if self._in_string:
+                decoded = self._string_char(char)
+                if decoded and self._field is not None:
+                    self.values[self._field] = self.values.get(self._field, '') + decoded
+                    if deltas and deltas[-1][0] == self._field:
+                        deltas[-1] = (self._field, deltas[-1][1] + decoded)
+                    else:
+                        deltas.append((self._field, decoded))
+            elif char == '"':
+                self._in_string = True
+                self._is_value = self._after_colon
+                self._buffer = []
+                if self._is_value and self._depth == 1 and self._key in self.fields:
+                    self._field = self._key
+            elif char == ':':
+                self._after_colon = True
+            elif char in '{[':
+                self._depth += 1
+                self._after_colon = False
+            elif char in '}]':
+                self._depth -= 1
+            elif char == ',':
+                self._after_colon = False
+        return deltas
+
+    def _string_char(self, char: str) -> str:
+        """Consume one character inside a string; returns the decoded text it completes."""
+        if self._unicode:
+            self._unicode += char
+            if len(self._unicode) < 5:
+                return ''
+            code, self._unicode = int(self._unicode[1:], 16), ''
+            return self._append(chr(code))
+        if self._escape:
+            self._escape = False
+            if char == 'u':
+                self._unicode = 'u'
+                return ''
+            return self._append(_ESCAPES.get(char, char))
+        if char == '\\':
+            self._escape = True
+            return ''
+        if char == '"':
+            self._in_string = False
+            if not self._is_value:
+                self._key = ''.join(self._buffer)
+            self._after_colon = False
+            self._field = None
+            return ''
+        return self._append(char)
+
+    def _append(self, decoded: str) -> str:
+        if self._high_surrogate:
+            high, self._high_surrogate = self._high_surrogate, ''
+            if '\udc00' <= decoded <= '\udfff':
+                decoded = (high + decoded).encode('utf-16', 'surrogatepass').decode('utf-16')
+        elif '\ud800' <= decoded <= '\udbff':
+            self._high_surrogate = decoded
+            return ''
+        if not self._is_value:
+            self._buffer.append(decoded)
+        return decoded
+
+
+def sse_event(event: str, data: dict) -> bytes:
+    """One server-sent event with a JSON payload."""
+    return f'event: {event}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'.encode()
+
+
+class LatencyStats:
+    """Recent latency samples in seconds, summarised in milliseconds for `/api/health/`."""
+
+    def __init__(self, window: int = 500):
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+
+    def stats(self) -> dict[str, int | float | None]:
+        with self._lock:
+            samples = sorted(self._samples)
+            last = self._samples[-1] if self._samples else None
+        return {
+            'count': self.count,
+            'last_ms': _ms(last),
+            'p50_ms': _ms(_percentile(samples, 50)),
+            'p95_ms': _ms(_percentile(samples, 95)),
+        }
+
+
+def _percentile(samples: list[float], percent: int) -> float | None:
+    if not samples:
+        return None
+    return samples[max(0, math.ceil(len(samples) * percent / 100) - 1)]
+
+
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+# Time from sending the chat request to the first title/message token.
+time_to_first_token = LatencyStats()
@@ -1,8 +1,11 @@
 import json
+from unittest.mock import AsyncMock, patch
 
 from django.test import Client, TestCase
 
-from apps.broadcast.models import SocialAccount
+from apps.broadcast.ai_services import NewsArticle
+from apps.broadcast.models import MessageCampaign, SocialAccount
+from apps.broadcast.pagination import encode_cursor
 
 
 class BroadcastViewTests(TestCase):
@@ -31,3 +34,83 @@ class BroadcastViewTests(TestCase):
         self.assertEqual(payload['status'], 'success')
         self.assertIn('data', payload)
         self.assertIn('pagination', payload['data'])
+
+    def _create_accounts(self, groups: dict[str, list[str]]) -> None:
+        for name, platforms in groups.items():
+            for platform in platforms:
+                SocialAccount.objects.create(
+                    name=name,
+                    platform=platform,
+                    handle=f'{name.lower()}-{platform}',
+                    access_token='token',
+                )
+
+    def test_wizard_accounts_cursor_walk_keeps_name_groups_whole(self):
+        self._create_accounts({
+            'Acme': ['x', 'facebook', 'linkedin'],
+            'Bolt': ['x', 'tiktok'],
+            'Cora': ['instagram'],
+            'Dune': ['x', 'facebook', 'linkedin', 'tiktok'],
+        })
+
+        seen: dict[str, list[str]] = {}
+        pages = 0
+        url = '/api/wizard/accounts/?page_size=2'
+        while url:
+            payload = self.client.get(url).json()
+            pages += 1
+            for name, profiles in payload['data']['accounts'].items():
+                self.assertNotIn(name, seen, 'a name group was split across pages')
+                seen[name] = [profile['platform'] for profile in profiles]
+            cursor = payload['data']['pagination']['next_cursor']
+            url = f'/api/wizard/accounts/?page_size=2&cursor={cursor}' if cursor else ''
+
+        self.assertEqual(list(seen), ['Acme', 'Bolt', 'Cora', 'Dune'])
+        self.assertEqual(seen['Dune'], ['facebook', 'linkedin', 'tiktok', 'x'])
+        self.assertEqual(pages, 3)
+
+    def test_wizard_accounts_total_is_optional(self):
+        self._create_accounts({'Acme': ['x', 'facebook']})
+
+        without_total = self.client.get('/api/wizard/accounts/').json()['data']['pagination']
+        with_total = self.client.get('/api/wizard/accounts/?include_total=1').json()['data']['pagination']
+
+        self.assertIsNone(without_total['total'])
+        self.assertEqual(with_total['total'], 2)
+        self.assertFalse(with_total['has_next'])
+        self.assertIsNone(with_total['next_cursor'])
+
+    def test_wizard_accounts_rejects_tampered_cursor(self):
+        response = self.client.get('/api/wizard/accounts/?cursor=not-a-cursor')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_wizard_accounts_rejects_cursor_with_wrong_value_types(self):
+        for values in (['A', 'x', 'abc'], ['A', 'x', True], [1, 'x', 2], ['A', None, 2]):
+            with self.subTest(values=values):
+                response = self.client.get(f'/api/wizard/accounts/?cursor={encode_cursor(values)}')
+
+                self.assertEqual(response.status_code, 400)
+
+    @patch('apps.broadcast.views.OpenAIContentStudio')
+    @patch('apps.broadcast.views.NewsScanner')
+    def test_ai_compose_fans_out_keyword_variants_and_areas(self, scanner_class, studio_class):
+        scanner = scanner_class.return_value
+        scanner.afetch_many = AsyncMock(return_value=[NewsArticle('Headline', 'https://example.com', 'Wire', '')])
+        scanner.afetch = AsyncMock()
+        studio_class.return_value.acompose_post = AsyncMock(return_value={'title': 'T', 'message': 'M', 'image_prompt': ''})
+
+        response = self.client.post(
+            '/api/campaigns/ai-compose/',
+            data=json.dumps({'keywords': 'solar', 'keyword_variants': ['pv'], 'area': 'Austin', 'areas': ['Dallas']}),
+            content_type='application/json',
+        )
+
+        self.assertEqual(response.status_code, 201)
+        scanner.afetch.assert_not_called()
+        self.assertEqual(
+            scanner.afetch_many.call_args.args[0],
+            [('solar', 'Austin'), ('solar', 'Dallas'), ('pv', 'Austin'), ('pv', 'Dallas')],
+        )
+        campaign = MessageCampaign.objects.get()
+        self.assertEqual(campaign.metadata['keyword_variants'], ['pv'])
@@ -0,0 +1,155 @@
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import httpx
+from asgiref.sync import async_to_sync
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.broadcast.ai_cache import AIResponseStore, cache_key
+from apps.broadcast.ai_services import NewsArticle, OpenAIContentStudio
+from apps.broadcast.models import AIResponseCache
+
+CHAT_RESPONSE = {'choices': [{'message': {'content': '{"title": "T", "message": "M", "image_prompt": "P"}'}}]}
+
+
+def _openai_response(payload: dict):
+    response = MagicMock()
+    response.json.return_value = payload
+    response.raise_for_status.return_value = None
+    return response
+
+
+@override_settings(OPENAI_API_KEY='key')
+@patch('apps.broadcast.ai_services.requests.post')
+class OpenAIResponseCacheTests(TestCase):
+    def setUp(self):
+        AIResponseStore.flush_hits()
+
+    def _compose(self, studio: OpenAIContentStudio, **kwargs) -> dict:
+        articles = [NewsArticle('Solar grants expand', 'https://example.com', 'Wire', '')]
+        return studio.compose_post('solar', 'Austin', 'We install panels.', articles, **kwargs)
+
+    def test_identical_compose_is_served_from_cache(self, post):
+        post.return_value = _openai_response(CHAT_RESPONSE)
+        studio = OpenAIContentStudio()
+
+        first = self._compose(studio)
+        with self.assertNumQueries(1):  # lookup only: no hit counter UPDATE, no HTTP
+            second = self._compose(studio)
+
+        self.assertEqual(first, second)
+        self.assertEqual(post.call_count, 1)
+        self.assertEqual(AIResponseStore.flush_hits(), 1)
+        self.assertEqual(AIResponseCache.objects.get().hits, 1)
+
+    def test_different_prompt_misses(self, post):
+        post.return_value = _openai_response(CHAT_RESPONSE)
+        studio = OpenAIContentStudio()
+
+        self._compose(studio)
+        studio.compose_post('wind', 'Austin', 'We install panels.', [])
+
+        self.assertEqual(post.call_count, 2)
+
+    def test_bypass_calls_openai_and_refreshes_entry(self, post):
+        post.return_value = _openai_response(CHAT_RESPONSE)
+        studio = OpenAIContentStudio()
+
+        self._compose(studio)
+        self._compose(studio, use_cache=False)
+
+        self.assertEqual(post.call_count, 2)
+        self.assertEqual(AIResponseCache.objects.count(), 1)
+
+    def test_expired_entry_is_refetched(self, post):
+        post.return_value = _openai_response(CHAT_RESPONSE)
+        studio = OpenAIContentStudio()
+
+        self._compose(studio)
+        AIResponseCache.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self._compose(studio)
+
+        self.assertEqual(post.call_count, 2)
+
+    def test_image_urls_are_cached_separately(self, post):
+        post.return_value = _openai_response({'data': [{'url': 'https://img.example/1.png'}]})
+        studio = OpenAIContentStudio()
+
+        self.assertEqual(studio.generate_image('panels'), 'https://img.example/1.png')
+        self.assertEqual(studio.generate_image('panels'), 'https://img.example/1.png')
+
+        self.assertEqual(post.call_count, 1)
+        self.assertEqual(AIResponseCache.objects.get().kind, 'image')
+
+
+class AIResponseStoreTests(TestCase):
+    def setUp(self):
+        AIResponseStore.flush_hits()
+
+    def test_oldest_entries_are_evicted_beyond_max(self):
+        store = AIResponseStore(ttls={'chat': 60}, max_entries=2)
+        keys = [cache_key('chat', 'url', {'n': index}) for index in range(3)]
+        for key in keys:
+            store.put(key, 'chat', {'key': key})
+
+        self.assertIsNone(store.get(keys[0]))
+        self.assertEqual(store.get(keys[2]), {'key': keys[2]})
+        self.assertEqual(AIResponseCache.objects.count(), 2)
+
+    def test_evicts_only_when_an_insert_crosses_the_cap(self):
+        store = AIResponseStore(ttls={'chat': 60}, max_entries=2)
+        store.evict()
+        keys = [cache_key('chat', 'url', {'n': index}) for index in range(3)]
+
+        with patch.object(store, 'evict', wraps=store.evict) as evict:
+            store.put(keys[0], 'chat', {})
+            store.put(keys[1], 'chat', {})
+            store.put(keys[1], 'chat', {'refreshed': True})
+            self.assertEqual(evict.call_count, 0)
+
+            store.put(keys[2], 'chat', {})
+            self.assertEqual(evict.call_count, 1)
+
+        self.assertEqual(AIResponseCache.objects.count(), 2)
+
+    @patch('apps.broadcast.ai_cache.HIT_FLUSH_SIZE', 3)
+    def test_hits_are_written_in_batches(self):
+        store = AIResponseStore(ttls={'chat': 60})
+        key = cache_key('chat', 'url', {})
+        store.put(key, 'chat', {})
+
+        store.get(key)
+        store.get(key)
+        self.assertEqual(AIResponseCache.objects.get().hits, 0)
+
+        store.get(key)
+        self.assertEqual(AIResponseCache.objects.get().hits, 3)
+
+    def test_key_ignores_dict_ordering(self):
+        self.assertEqual(cache_key('chat', 'u', {'a': 1, 'b': 2}), cache_key('chat', 'u', {'b': 2, 'a': 1}))
+
+
+@override_settings(OPENAI_API_KEY='key')
+class AsyncOpenAIClientTests(TestCase):
+    def test_async_calls_share_the_response_cache(self):
+        seen = []
+
+        def handler(request):
+            seen.append(request.url.path)
+            if request.url.path.endswith('/images/generations'):
+                return httpx.Response(200, json={'data': [{'url': 'https://img.example/1.png'}]})
+            return httpx.Response(200, json=CHAT_RESPONSE)
+
+        studio = OpenAIContentStudio(async_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        articles = [NewsArticle('Solar grants expand', 'https://example.com', 'Wire', '')]
+
+        generated = async_to_sync(studio.acompose_post)('solar', 'Austin', 'We install panels.', articles)
+        with patch('apps.broadcast.ai_services.requests.post') as post:
+            self.assertEqual(studio.compose_post('solar', 'Austin', 'We install panels.', articles), generated)
+        post.assert_not_called()
+
+        self.assertEqual(async_to_sync(studio.agenerate_image)('P'), 'https://img.example/1.png')
+        self.assertEqual(async_to_sync(studio.agenerate_image)('P'), 'https://img.example/1.png')
+        self.assertEqual(seen, ['/v1/chat/completions', '/v1/images/generations'])
+        self.assertEqual(generated['title'], 'T')
@@ -0,0 +1,111 @@
+import gzip
+import json
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.broadcast.archive import LogArchiver, archive_path, read_archive, restore_campaign
+from apps.broadcast.models import AuditLog, DeliveryLog, MessageCampaign, RollupWatermark, SocialAccount
+from apps.broadcast.rollups import DELIVERY_ROLLUP, roll_up_deliveries
+
+
+class LogArchiveTests(TestCase):
+    def setUp(self):
+        self.directory = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.account = SocialAccount.objects.create(name='Acme', platform='x', handle='acme', access_token='token')
+        self.campaign = MessageCampaign.objects.create(title='T', message='M')
+        self.other = MessageCampaign.objects.create(title='Other', message='M')
+        now = timezone.now()
+        self.old_day = (now - timedelta(days=100)).replace(hour=0, minute=0, second=0, microsecond=0)
+        DeliveryLog.objects.bulk_create(
+            DeliveryLog(
+                campaign=self.campaign if index % 2 else self.other,
+                account=self.account,
+                success=bool(index % 3),
+                response_payload={'index': index},
+                created_at=self.old_day + timedelta(hours=index * 6, microseconds=index),
+            )
+            for index in range(7)
+        )
+        self.recent = DeliveryLog.objects.create(campaign=self.campaign, account=self.account, success=True)
+        AuditLog.objects.create(action='campaign.send', entity='MessageCampaign', entity_id=self.campaign.id, created_at=self.old_day)
+        AuditLog.objects.create(action='campaign.send', entity='MessageCampaign', entity_id=self.campaign.id)
+        self.cutoff = now - timedelta(days=90)
+        roll_up_deliveries()
+
+    def test_archives_old_rows_by_day_and_deletes_them_in_chunks(self):
+        archiver = LogArchiver(directory=self.directory, chunk_size=3)
+
+        with CaptureQueriesContext(connection) as queries:
+            counts = archiver.archive_all(self.cutoff)
+
+        self.assertEqual(counts, {'broadcast_deliverylog': 7, 'broadcast_auditlog': 1})
+        self.assertEqual(list(DeliveryLog.objects.values_list('id', flat=True)), [self.recent.id])
+        self.assertEqual(AuditLog.objects.count(), 1)
+        deletes = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('DELETE FROM "broadcast_deliverylog"')]
+        self.assertEqual(len(deletes), 3)  # 7 rows in chunks of 3
+
+        files = sorted(path.name for path in (self.directory / 'broadcast_deliverylog').iterdir())
+        self.assertEqual(len(files), 2)  # 7 rows six hours apart span two days
+        rows = list(read_archive(self.directory, DeliveryLog))
+        self.assertEqual(len(rows), 7)
+        self.assertEqual({row['response_payload']['index'] for row in rows}, set(range(7)))
+
+    def test_deliveries_not_rolled_up_yet_are_kept(self):
+        RollupWatermark.objects.filter(name=DELIVERY_ROLLUP).update(last_id=DeliveryLog.objects.order_by('pk')[2].pk)
+
+        self.assertEqual(LogArchiver(directory=self.directory).archive(DeliveryLog, self.cutoff), 3)
+        self.assertEqual(DeliveryLog.objects.count(), 5)
+
+    def test_archive_files_are_appended_as_gzip_members(self):
+        LogArchiver(directory=self.directory, chunk_size=1).archive(DeliveryLog, self.cutoff)
+
+        path = next((self.directory / 'broadcast_deliverylog').iterdir())
+        with gzip.open(path, 'rt') as archive:
+            lines = [json.loads(line) for line in archive]
+        self.assertGreater(len(lines), 1)
+
+    def test_restore_brings_back_one_campaign_with_its_timestamps(self):
+        original = {row.id: row.created_at for row in DeliveryLog.objects.filter(campaign=self.campaign, created_at__lt=self.cutoff)}
+        LogArchiver(directory=self.directory).archive_all(self.cutoff)
+
+        counts = restore_campaign(self.campaign.id, directory=self.directory)
+
+        self.assertEqual(counts, {'deliveries': 3, 'audit_entries': 1, 'skipped': 0})
+        restored = dict(DeliveryLog.objects.filter(id__in=original).values_list('id', 'created_at'))
+        self.assertEqual(restored, original)
+        self.assertFalse(DeliveryLog.objects.filter(campaign=self.other).exists())
+        self.assertEqual(restore_campaign(self.campaign.id, directory=self.directory)['deliveries'], 0)
+
+    def test_chunk_archived_twice_is_restored_once(self):
+        archiver = LogArchiver(directory=self.directory)
+        archiver.archive(DeliveryLog, self.cutoff)
+        # A crash between writing a chunk and deleting it leaves the chunk in the archive twice.
+        replayed = next(row for row in read_archive(self.directory, DeliveryLog) if row['campaign_id'] == self.campaign.id)
+        archiver._append(archive_path(self.directory, DeliveryLog, self.old_day.date()), [json.dumps(replayed)])
+
+        self.assertEqual(restore_campaign(self.campaign.id, directory=self.directory)['deliveries'], 3)
+
+    def test_restore_skips_deliveries_of_deleted_accounts(self):
+        LogArchiver(directory=self.directory).archive(DeliveryLog, self.cutoff)
+        self.recent.delete()
+        self.account.delete()
+
+        counts = restore_campaign(self.campaign.id, directory=self.directory)
+
+        self.assertEqual((counts['deliveries'], counts['skipped']), (0, 3))
+
+    def test_commands(self):
+        call_command('archive_logs', '--dir', str(self.directory), '--chunk-size', '2', stdout=StringIO())
+        self.assertEqual(DeliveryLog.objects.count(), 1)
+
+        out = StringIO()
+        call_command('restore_campaign_logs', str(self.campaign.id), '--dir', str(self.directory), stdout=out)
+        self.assertIn('Restored 3 delivery log(s)', out.getvalue())
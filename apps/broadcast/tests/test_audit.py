@@ -0,0 +1,83 @@
+import threading
+
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.broadcast.audit import BufferedAuditSink
+from apps.broadcast.models import AuditLog
+
+
+def _entry(entity_id: int) -> AuditLog:
+    return AuditLog(action='campaign.create', entity='MessageCampaign', entity_id=entity_id)
+
+
+class BufferedAuditSinkTests(TransactionTestCase):
+    def _sink(self, **kwargs) -> BufferedAuditSink:
+        kwargs.setdefault('flush_interval', 60)
+        sink = BufferedAuditSink(**kwargs)
+        self.addCleanup(sink.close)
+        return sink
+
+    def test_entries_are_written_in_bulk_on_flush(self):
+        sink = self._sink()
+        for entity_id in range(5):
+            sink.write(_entry(entity_id))
+
+        self.assertEqual(sink.metrics()['queue_depth'], 5)
+        self.assertEqual(AuditLog.objects.count(), 0)
+
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(sink.flush(), 5)
+        self.assertEqual(sum(query['sql'].startswith('INSERT') for query in captured), 1)
+        self.assertEqual(sink.metrics()['flushed'], 5)
+        self.assertEqual(sorted(AuditLog.objects.values_list('entity_id', flat=True)), list(range(5)))
+
+    def test_full_queue_drops_and_counts_entries(self):
+        sink = self._sink(max_queue=2)
+        for entity_id in range(4):
+            sink.write(_entry(entity_id))
+
+        metrics = sink.metrics()
+        self.assertEqual((metrics['queue_depth'], metrics['dropped']), (2, 2))
+
+    def test_drops_from_many_request_threads_are_all_counted(self):
+        sink = self._sink(max_queue=10)
+
+        def write_many():
+            for entity_id in range(500):
+                sink._enqueue(_entry(entity_id))
+
+        threads = [threading.Thread(target=write_many) for _ in range(8)]
+        with self.assertLogs('apps.broadcast.audit', level='WARNING'):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(sink.metrics()['dropped'], 8 * 500 - 10)
+
+    def test_full_batch_wakes_background_thread(self):
+        sink = self._sink(batch_size=3)
+        for entity_id in range(3):
+            sink.write(_entry(entity_id))
+
+        sink._thread.join(timeout=0.3)  # the thread keeps running; this just gives it time to write
+        self.assertEqual(AuditLog.objects.count(), 3)
+
+    def test_background_thread_flushes_after_interval(self):
+        sink = self._sink(flush_interval=0.05)
+        sink.write(_entry(1))
+
+        sink._thread.join(timeout=0.3)  # the thread keeps running; this just waits a few intervals
+        self.assertEqual(AuditLog.objects.count(), 1)
+        self.assertEqual(sink.metrics()['queue_depth'], 0)
+
+    def test_close_writes_remaining_entries(self):
+        sink = self._sink()
+        sink.write(_entry(1))
+
+        sink.close()
+
+        self.assertEqual(AuditLog.objects.count(), 1)
+        self.assertFalse(sink._thread.is_alive())
@@ -0,0 +1,122 @@
+import json
+import tempfile
+import threading
+import time
+from io import StringIO
+from unittest.mock import patch
+
+import requests
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.broadcast.ai_services import NewsArticle
+from apps.broadcast.composer import bulk_compose
+from apps.broadcast.models import MessageCampaign, SocialAccount
+
+
+class FakeStudio:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def compose_post(self, keywords, area, business_perspective, articles, use_cache=True):
+        if keywords == 'broken':
+            raise requests.ConnectionError('down')
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return {'title': f'{keywords} news', 'message': f'About {keywords}', 'image_prompt': ''}
+
+
+class FakeScanner:
+    def fetch(self, keywords, area='', limit=5):
+        return [NewsArticle(f'{keywords} headline', f'https://example.com/{keywords}', 'Wire', '')]
+
+
+class BulkComposeTests(TestCase):
+    def test_results_are_mapped_per_item_and_saved_in_one_insert(self):
+        specs = [
+            {'key': 'solar-tx', 'keywords': 'solar', 'area': 'Texas'},
+            {'keywords': ''},
+            {'keywords': 'broken'},
+        ]
+
+        with CaptureQueriesContext(connection) as captured:
+            results = bulk_compose(specs, scanner=FakeScanner(), studio=FakeStudio())
+
+        self.assertEqual(list(results), ['solar-tx', '1', '2'])
+        self.assertTrue(results['solar-tx']['ok'])
+        self.assertEqual(results['solar-tx']['title'], 'solar news')
+        self.assertEqual(results['1'], {'ok': False, 'error': 'keywords is required'})
+        self.assertEqual(results['2'], {'ok': False, 'error': 'AI/news provider temporarily unavailable'})
+        campaign = MessageCampaign.objects.get()
+        self.assertEqual(campaign.id, results['solar-tx']['campaign_id'])
+        self.assertEqual(campaign.metadata['articles'][0]['title'], 'solar headline')
+        inserts = [query for query in captured if query['sql'].startswith('INSERT INTO "broadcast_messagecampaign"')]
+        self.assertEqual(len(inserts), 1)
+
+    def test_generation_runs_concurrently_within_limit(self):
+        studio = FakeStudio(delay=0.1)
+        specs = [{'keywords': f'topic{index}'} for index in range(6)]
+
+        started = time.monotonic()
+        results = bulk_compose(specs, scanner=FakeScanner(), studio=studio, concurrency=3)
+
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(studio.max_active, 3)
+        self.assertEqual(MessageCampaign.objects.count(), 6)
+        self.assertTrue(all(result['ok'] for result in results.values()))
+
+    def test_autopost_dispatches_each_campaign(self):
+        SocialAccount.objects.create(name='Acme', platform='x', handle='acme', access_token='t')
+        specs = [
+            {'keywords': 'solar', 'autopost': True, 'account_names': ['Acme'], 'platforms': ['x']},
+            {'keywords': 'wind', 'autopost': True, 'account_names': ['Nobody'], 'platforms': ['x']},
+        ]
+
+        results = bulk_compose(specs, scanner=FakeScanner(), studio=FakeStudio())
+
+        self.assertEqual(results['0']['stats'], {'total': 1, 'sent': 1, 'failed': 0})
+        self.assertEqual(results['0']['status'], 'sent')
+        self.assertEqual(results['1']['dispatch_error'], 'No active account match for your selection')
+
+
+@patch('apps.broadcast.views.OpenAIContentStudio', FakeStudio)
+@patch('apps.broadcast.views.NewsScanner', FakeScanner)
+class BulkComposeEndpointTests(TestCase):
+    def _post(self, body):
+        return self.client.post('/api/campaigns/ai-compose/bulk/', data=json.dumps(body), content_type='application/json')
+
+    def test_endpoint_returns_result_map(self):
+        response = self._post({'items': [{'keywords': 'solar'}, {'keywords': ''}]})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()['data']
+        self.assertEqual((data['created'], data['failed']), (1, 1))
+        self.assertTrue(data['results']['0']['ok'])
+        self.assertFalse(data['results']['1']['ok'])
+
+    def test_rejects_bad_bodies(self):
+        self.assertEqual(self._post({'items': []}).status_code, 400)
+        self.assertEqual(self._post({'items': [{'key': 'a', 'keywords': 'x'}, {'key': 'a', 'keywords': 'y'}]}).status_code, 400)
+
+
+class BulkComposeCommandTests(TestCase):
+    @patch('apps.broadcast.composer.OpenAIContentStudio', FakeStudio)
+    @patch('apps.broadcast.composer.NewsScanner', FakeScanner)
+    def test_command_reads_specs_file(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as handle:
+            json.dump([{'keywords': 'solar'}, {'keywords': 'wind'}], handle)
+            handle.flush()
+            out = StringIO()
+            call_command('ai_compose_bulk', handle.name, '--concurrency', '2', stdout=out, stderr=StringIO())
+
+        self.assertIn('Generated 2 of 2 campaigns.', out.getvalue())
+        self.assertEqual(MessageCampaign.objects.count(), 2)
@@ -1,3 +1,7 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import MagicMock, patch
 
 import requests
@@ -43,3 +47,69 @@ class Context7ClientTests(SimpleTestCase):
         self.assertFalse(result.success)
         self.assertEqual(result.status_code, 502)
         self.assertEqual(result.payload['error'], 'Invalid JSON response from Context7')
+
+
+class StubContext7Handler(BaseHTTPRequestHandler):
+    """Accepts batches, rejecting events whose payload has `"reject": true`."""
+
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.requests.append((self.path, dict(self.headers), len(raw)))
+        events = json.loads(gzip.decompress(raw))['events']
+        self.server.events.extend(events)
+        results = [
+            {'accepted': False, 'error': 'rejected'} if event['payload'].get('reject') else {'accepted': True}
+            for event in events
+        ]
+        body = json.dumps({'results': results}).encode()
+        self.send_response(207 if any(not item['accepted'] for item in results) else 200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Context7BatchTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubContext7Handler)
+        self.server.requests, self.server.events = [], []
+        threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.client = Context7Client(api_key='token', base_url=f'http://127.0.0.1:{self.server.server_port}')
+
+    def test_publish_events_sends_one_gzip_request(self):
+        events = [('campaign.dispatched', {'campaign_id': index, 'message': 'x' * 200}) for index in range(50)]
+
+        result = self.client.publish_events(events)
+
+        self.assertTrue(result.success)
+        self.assertEqual(len(self.server.requests), 1)
+        path, headers, size = self.server.requests[0]
+        self.assertEqual(path, '/events/batch')
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertLess(size, len(json.dumps(events)) / 5)
+        self.assertEqual([event['payload']['campaign_id'] for event in self.server.events], list(range(50)))
+
+    def test_partial_failure_reports_each_event(self):
+        result = self.client.publish_events([
+            ('campaign.dispatched', {'campaign_id': 1}),
+            ('campaign.dispatched', {'campaign_id': 2, 'reject': True}),
+            ('campaign.dispatched', {'campaign_id': 3}),
+        ])
+
+        self.assertFalse(result.success)
+        self.assertEqual(result.status_code, 207)
+        self.assertEqual(result.accepted, [True, False, True])
+        self.assertEqual(result.failed_indexes, [1])
+        self.assertEqual(result.errors, {1: 'rejected'})
+
+    def test_publish_events_without_api_key_fails_every_event(self):
+        result = Context7Client(api_key='').publish_events([('a', {}), ('b', {})])
+
+        self.assertEqual(result.accepted, [False, False])
+        self.assertEqual(result.errors[0], 'Missing CONTEXT7_API_KEY')
+
@@ -0,0 +1,70 @@
+from django.test import TestCase
+
+from apps.broadcast.delivery_stats import campaign_stats, record_deliveries
+from apps.broadcast.models import CampaignDeliveryStats, DeliveryLog, MessageCampaign, SocialAccount
+from apps.broadcast.providers import ProviderResult
+from apps.broadcast.services import MessageDispatcher
+
+
+class DeliveryStatsTests(TestCase):
+    def setUp(self):
+        self.x = SocialAccount.objects.create(name='Acme', platform='x', handle='acme-x', access_token='token')
+        self.facebook = SocialAccount.objects.create(name='Acme', platform='facebook', handle='acme-fb', access_token='token')
+        self.campaign = MessageCampaign.objects.create(title='T', message='M')
+
+    def test_dispatch_keeps_per_platform_counters(self):
+        dispatcher = MessageDispatcher(concurrent=False, log_batch_size=1)
+        results = {
+            'x': ProviderResult(True, 'x-1', {}, ''),
+            'facebook': ProviderResult(False, '', {}, 'token expired', status_code=401),
+        }
+
+        def send(message, account, image_url=''):
+            return results[account.platform].as_tuple()
+
+        dispatcher._send_to_provider = send
+        dispatcher.dispatch_campaign(self.campaign)
+        dispatcher.dispatch_campaign(self.campaign, exclude_delivered=True)
+
+        # The re-sent facebook account failed again, so it is still counted once.
+        stats = campaign_stats(self.campaign.id)
+        self.assertEqual((stats['total'], stats['sent'], stats['failed']), (2, 1, 1))
+        self.assertEqual(stats['platforms'], {
+            'facebook': {'total': 1, 'sent': 0, 'failed': 1},
+            'x': {'total': 1, 'sent': 1, 'failed': 0},
+        })
+        self.assertEqual(DeliveryLog.objects.filter(campaign=self.campaign).count(), 3)
+
+        results['facebook'] = ProviderResult(True, 'fb-1', {}, '')
+        dispatcher.dispatch_campaign(self.campaign, exclude_delivered=True)
+
+        stats = campaign_stats(self.campaign.id)
+        self.assertEqual((stats['total'], stats['sent'], stats['failed']), (2, 2, 0))
+
+    def test_counters_survive_deleted_delivery_logs(self):
+        MessageDispatcher(concurrent=False).dispatch_campaign(self.campaign)
+        DeliveryLog.objects.all().delete()
+
+        self.assertEqual(campaign_stats(self.campaign.id)['sent'], 2)
+
+    def test_record_creates_missing_counter_rows(self):
+        record_deliveries([DeliveryLog(campaign=self.campaign, account=self.x, success=True)])
+        record_deliveries([DeliveryLog(campaign=self.campaign, account=self.x, success=False)])
+
+        counters = CampaignDeliveryStats.objects.get(campaign=self.campaign, platform='x')
+        self.assertEqual((counters.sent, counters.failed), (1, 1))
+
+    def test_campaign_without_deliveries_reports_zeroes(self):
+        self.assertEqual(
+            campaign_stats(self.campaign.id),
+            {'total': 0, 'sent': 0, 'failed': 0, 'platforms': {}, 'updated_at': None},
+        )
+
+    def test_stats_endpoint(self):
+        MessageDispatcher(concurrent=False).dispatch_campaign(self.campaign)
+
+        data = self.client.get(f'/api/campaigns/{self.campaign.id}/stats/').json()['data']
+
+        self.assertEqual((data['campaign_id'], data['status'], data['sent']), (self.campaign.id, 'sent', 2))
+        self.assertEqual(set(data['platforms']), {'x', 'facebook'})
+        self.assertEqual(self.client.get('/api/campaigns/999/stats/').status_code, 404)
@@ -0,0 +1,182 @@
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import requests
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.broadcast.ai_services import NewsArticle
+from apps.broadcast.delivery_stats import campaign_stats
+from apps.broadcast.image_tasks import run_image_task
+from apps.broadcast.models import DeliveryLog, MessageCampaign, SocialAccount
+from apps.broadcast.retries import failed_accounts
+
+
+@patch('apps.broadcast.views.OpenAIContentStudio')
+@patch('apps.broadcast.views.NewsScanner')
+class AsyncImageComposeTests(TestCase):
+    def _compose(self, scanner_class, studio_class, **payload):
+        scanner_class.return_value.afetch = AsyncMock(return_value=[NewsArticle('Headline', 'https://example.com', 'Wire', '')])
+        studio = studio_class.return_value
+        studio.acompose_post = AsyncMock(return_value={'title': 'T', 'message': 'M', 'image_prompt': 'Solar panels'})
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                '/api/campaigns/ai-compose/',
+                data=json.dumps({'keywords': 'solar', **payload}),
+                content_type='application/json',
+            )
+        return response, studio, callbacks
+
+    def test_campaign_is_created_before_image_is_generated(self, scanner_class, studio_class):
+        response, studio, callbacks = self._compose(scanner_class, studio_class)
+
+        self.assertEqual(response.status_code, 201)
+        data = response.json()['data']
+        self.assertEqual(data['image_url'], '')
+        self.assertEqual(data['image_task']['state'], 'pending')
+        studio.generate_image.assert_not_called()
+        self.assertEqual(len(callbacks), 1)
+
+        status = self.client.get(f"/api/campaigns/{data['campaign_id']}/image/").json()['data']
+        self.assertEqual(status['image_task']['state'], 'pending')
+
+    def test_text_platforms_are_posted_without_waiting(self, scanner_class, studio_class):
+        SocialAccount.objects.create(name='Acme', platform='x', handle='acme', access_token='t')
+
+        response, _, _ = self._compose(
+            scanner_class, studio_class, autopost=True, account_names=['Acme'], platforms=['x']
+        )
+
+        data = response.json()['data']
+        self.assertEqual(data['stats'], {'total': 1, 'sent': 1, 'failed': 0})
+        self.assertNotIn('dispatch', data)
+        self.assertNotIn('dispatch_account_ids', MessageCampaign.objects.get().metadata['image_task'])
+
+    def test_only_photo_platforms_wait_for_the_image(self, scanner_class, studio_class):
+        x = SocialAccount.objects.create(name='Acme', platform='x', handle='acme', access_token='t')
+        instagram = SocialAccount.objects.create(name='Acme', platform='instagram', handle='acme', access_token='t')
+
+        response, _, _ = self._compose(
+            scanner_class, studio_class, autopost=True, account_names=['Acme'], platforms=['x', 'instagram']
+        )
+
+        data = response.json()['data']
+        self.assertEqual((data['stats']['total'], data['dispatch']), (1, 'after_image'))
+        self.assertEqual(list(DeliveryLog.objects.values_list('account_id', flat=True)), [x.id])
+        task = MessageCampaign.objects.get().metadata['image_task']
+        self.assertEqual((task['dispatch_account_ids'], task['use_cache']), ([instagram.id], True))
+
+    def test_campaign_without_image_prompt_is_posted_right_away(self, scanner_class, studio_class):
+        SocialAccount.objects.create(name='Acme', platform='x', handle='acme', access_token='t')
+        scanner_class.return_value.afetch = AsyncMock(return_value=[])
+        studio_class.return_value.acompose_post = AsyncMock(return_value={'title': 'T', 'message': 'M', 'image_prompt': ''})
+
+        response = self.client.post(
+            '/api/campaigns/ai-compose/',
+            data=json.dumps({'keywords': 'solar', 'autopost': True, 'account_names': ['Acme'], 'platforms': ['x']}),
+            content_type='application/json',
+        )
+
+        data = response.json()['data']
+        self.assertEqual(data['stats'], {'total': 1, 'sent': 1, 'failed': 0})
+        self.assertNotIn('dispatch', data)
+
+    def test_photo_platforms_wait_for_the_image(self, scanner_class, studio_class):
+        account = SocialAccount.objects.create(name='Acme', platform='instagram', handle='acme', access_token='t')
+
+        response, _, _ = self._compose(
+            scanner_class, studio_class, autopost=True, account_names=['Acme'], platforms=['instagram']
+        )
+
+        data = response.json()['data']
+        self.assertEqual(data['dispatch'], 'after_image')
+        self.assertFalse(DeliveryLog.objects.exists())
+
+        studio = MagicMock()
+        studio.generate_image.return_value = 'https://img.example/1.png'
+        self.assertEqual(run_image_task(data['campaign_id'], 'Solar panels', True, [account.id], studio=studio), 'succeeded')
+
+        campaign = MessageCampaign.objects.get()
+        self.assertEqual(campaign.image_url, 'https://img.example/1.png')
+        self.assertEqual(campaign.status, 'sent')
+        self.assertEqual(campaign.metadata['image_task']['dispatch'], {'total': 1, 'sent': 1, 'failed': 0})
+        self.assertEqual(DeliveryLog.objects.get().response_payload['image_url'], 'https://img.example/1.png')
+
+
+class ImageTaskTests(TestCase):
+    def test_failure_is_recorded_and_dispatch_skipped(self):
+        campaign = MessageCampaign.objects.create(title='T', message='M', metadata={'image_task': {'state': 'pending'}})
+        studio = MagicMock()
+        studio.generate_image.side_effect = requests.Timeout('slow')
+
+        self.assertEqual(run_image_task(campaign.id, 'prompt', dispatch_account_ids=[1], studio=studio), 'failed')
+
+        campaign.refresh_from_db()
+        task = campaign.metadata['image_task']
+        self.assertEqual(task['state'], 'failed')
+        self.assertEqual(task['error'], 'slow')
+        self.assertEqual(task['dispatch'], 'skipped: image unavailable')
+        self.assertEqual(campaign.status, 'draft')
+
+    def test_unexpected_error_marks_the_task_failed(self):
+        campaign = MessageCampaign.objects.create(title='T', message='M', metadata={'image_task': {'state': 'pending'}})
+        studio = MagicMock()
+        studio.generate_image.side_effect = IndexError('list index out of range')
+
+        self.assertEqual(run_image_task(campaign.id, 'prompt', studio=studio), 'failed')
+
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.metadata['image_task']['state'], 'failed')
+
+    def test_failed_image_posts_text_platforms_and_logs_photo_platforms_as_failed(self):
+        x = SocialAccount.objects.create(name='Acme', platform='x', handle='acme', access_token='t')
+        instagram = SocialAccount.objects.create(name='Acme', platform='instagram', handle='acme', access_token='t')
+        campaign = MessageCampaign.objects.create(title='T', message='M', metadata={'image_task': {'state': 'pending'}})
+        studio = MagicMock()
+        studio.generate_image.side_effect = requests.Timeout('slow')
+
+        run_image_task(campaign.id, 'prompt', dispatch_account_ids=[x.id, instagram.id], studio=studio)
+
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.metadata['image_task']['dispatch'], {'total': 1, 'sent': 1, 'failed': 0})
+        self.assertEqual(
+            sorted(DeliveryLog.objects.values_list('account_id', 'success')), [(x.id, True), (instagram.id, False)]
+        )
+        stats = campaign_stats(campaign.id)
+        self.assertEqual((stats['sent'], stats['failed'], campaign.status), (1, 1, 'failed'))
+        self.assertEqual(set(failed_accounts(campaign)), {instagram.id})
+
+    def test_stale_tasks_are_recovered_from_the_database(self):
+        account = SocialAccount.objects.create(name='Acme', platform='instagram', handle='acme', access_token='t')
+        old = (timezone.now() - timedelta(hours=1)).isoformat()
+        lost = MessageCampaign.objects.create(
+            title='Lost',
+            message='M',
+            metadata={
+                'image_prompt': 'Solar panels',
+                'image_task': {'state': 'running', 'started_at': old, 'use_cache': False, 'dispatch_account_ids': [account.id]},
+            },
+        )
+        fresh = MessageCampaign.objects.create(
+            title='Fresh',
+            message='M',
+            metadata={'image_prompt': 'Wind', 'image_task': {'state': 'pending', 'queued_at': timezone.now().isoformat()}},
+        )
+        MessageCampaign.objects.create(title='Done', message='M', metadata={'image_task': {'state': 'succeeded'}})
+
+        with patch('apps.broadcast.image_tasks.OpenAIContentStudio') as studio_class:
+            studio_class.return_value.generate_image.return_value = 'https://img.example/1.png'
+            call_command('recover_image_tasks', stdout=StringIO())
+
+        studio_class.return_value.generate_image.assert_called_once_with('Solar panels', use_cache=False)
+        lost.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual((lost.metadata['image_task']['state'], lost.metadata['image_task']['recoveries']), ('succeeded', 1))
+        self.assertEqual((lost.image_url, lost.status), ('https://img.example/1.png', 'sent'))
+        self.assertEqual(fresh.metadata['image_task']['state'], 'pending')
+
+    def test_status_endpoint_reports_missing_campaign(self):
+        self.assertEqual(self.client.get('/api/campaigns/999/image/').status_code, 404)
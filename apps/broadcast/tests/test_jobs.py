@@ -0,0 +1,222 @@
+import json
+from io import StringIO
+from datetime import timedelta
+from unittest import skipUnless
+from unittest.mock import PropertyMock, patch
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.broadcast.delivery_stats import campaign_stats
+from apps.broadcast.jobs import DispatchWorker, claim_next_job, enqueue_dispatch, job_summary, run_job
+from apps.broadcast.models import DeliveryLog, DispatchJob, MessageCampaign, SocialAccount
+from apps.broadcast.services import Heartbeat, MessageDispatcher
+
+
+class DispatchJobTestMixin:
+    def setUp(self):
+        for index in range(5):
+            SocialAccount.objects.create(name='Acme', platform='x', handle=f'acme{index}', access_token='token')
+        self.campaign = MessageCampaign.objects.create(title='T', message='M')
+        self.dispatcher = MessageDispatcher(concurrent=False, log_batch_size=2)
+
+
+class DispatchJobQueueTests(DispatchJobTestMixin, TestCase):
+    def test_enqueue_returns_the_live_job_instead_of_queueing_twice(self):
+        job = enqueue_dispatch(self.campaign)
+
+        self.assertEqual((job.status, job.total, job.account_ids), ('queued', 5, None))
+        self.assertEqual(enqueue_dispatch(self.campaign).pk, job.pk)
+
+        DispatchJob.objects.filter(pk=job.pk).update(status='completed')
+        self.assertNotEqual(enqueue_dispatch(self.campaign).pk, job.pk)
+
+    def test_worker_runs_job_and_releases_its_lock(self):
+        job = enqueue_dispatch(self.campaign, accounts=list(SocialAccount.objects.all()[:3]))
+        worker = DispatchWorker(dispatcher=self.dispatcher, worker_id='w1')
+        self.assertEqual(worker.run_once().pk, job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.total, job.sent, job.failed, job.attempts), ('completed', 3, 3, 0, 1))
+        self.assertEqual((job.locked_by, job.locked_until), ('', None))
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(DeliveryLog.objects.filter(campaign=self.campaign).count(), 3)
+        self.assertEqual(MessageCampaign.objects.get(pk=self.campaign.pk).status, 'sent')
+        self.assertIsNone(worker.run_once())
+
+    def test_dispatcher_reports_progress_after_each_log_batch(self):
+        reports = []
+
+        self.dispatcher.dispatch_campaign(self.campaign, progress=lambda stats: reports.append(dict(stats)))
+
+        self.assertEqual([report['sent'] for report in reports], [0, 2, 4, 5])
+        self.assertEqual({report['total'] for report in reports}, {5})
+
+    def test_claim_skips_jobs_that_are_not_due_or_locked(self):
+        job = enqueue_dispatch(self.campaign)
+        DispatchJob.objects.filter(pk=job.pk).update(available_at=timezone.now() + timedelta(minutes=1))
+        self.assertIsNone(claim_next_job('w1'))
+
+        DispatchJob.objects.filter(pk=job.pk).update(available_at=timezone.now())
+        self.assertEqual(claim_next_job('w1').locked_by, 'w1')
+        self.assertIsNone(claim_next_job('w2'))
+
+    def test_job_abandoned_by_a_crashed_worker_is_resumed(self):
+        job = enqueue_dispatch(self.campaign)
+        claimed = claim_next_job('crashed')
+        first = SocialAccount.objects.order_by('id').first()
+        DeliveryLog.objects.create(campaign=self.campaign, account=first, success=True)
+        DispatchJob.objects.filter(pk=job.pk).update(sent=1, locked_until=timezone.now() - timedelta(seconds=1))
+
+        resumed = claim_next_job('w2')
+        self.assertEqual((resumed.pk, resumed.attempts), (claimed.pk, 2))
+        self.assertEqual(run_job(resumed, self.dispatcher), 'completed')
+
+        job.refresh_from_db()
+        self.assertEqual((job.total, job.sent, job.failed), (5, 5, 0))
+        # The account delivered before the crash is not posted to again.
+        self.assertEqual(DeliveryLog.objects.filter(campaign=self.campaign, account=first).count(), 1)
+
+    def test_failing_dispatch_is_retried_with_backoff_then_failed(self):
+        job = enqueue_dispatch(self.campaign)
+
+        with patch.object(self.dispatcher, '_send_to_provider', side_effect=RuntimeError('provider exploded')):
+            self.assertEqual(run_job(claim_next_job('w1'), self.dispatcher, max_attempts=2), 'queued')
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.locked_by, job.error), ('queued', '', 'provider exploded'))
+            self.assertGreater(job.available_at, timezone.now())
+            self.assertIsNone(claim_next_job('w1'))
+
+            DispatchJob.objects.filter(pk=job.pk).update(available_at=timezone.now())
+            self.assertEqual(run_job(claim_next_job('w1'), self.dispatcher, max_attempts=2), 'failed')
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_job_retry_counts_each_account_once(self):
+        job = enqueue_dispatch(self.campaign)
+        calls = []
+
+        def flaky_send(message, account, image_url=''):
+            calls.append(account.id)
+            if len(calls) == 4:
+                raise RuntimeError('provider exploded')
+            if len(calls) < 4 and len(calls) % 2:
+                return False, '', {}, 'upstream timeout'
+            return True, f'x-{account.id}', {}, ''
+
+        self.dispatcher._send_to_provider = flaky_send
+        self.assertEqual(run_job(claim_next_job('w1'), self.dispatcher), 'queued')
+        DispatchJob.objects.filter(pk=job.pk).update(available_at=timezone.now())
+        self.assertEqual(run_job(claim_next_job('w1'), self.dispatcher), 'completed')
+
+        # Accounts that failed on the first attempt were re-sent and now count as sent only.
+        stats = campaign_stats(self.campaign.id)
+        self.assertEqual((stats['sent'], stats['failed']), (5, 0))
+        self.assertEqual(stats['sent'] + stats['failed'], SocialAccount.objects.count())
+
+    def test_dispatch_stops_when_another_worker_takes_the_job_over(self):
+        job = enqueue_dispatch(self.campaign)
+        claimed = claim_next_job('w1')
+        sent = []
+
+        def send(message, account, image_url=''):
+            sent.append(account.id)
+            if len(sent) == 2:
+                DispatchJob.objects.filter(pk=job.pk).update(locked_by='w2')
+            return True, f'ok-{account.id}', {}, ''
+
+        with patch.object(self.dispatcher, '_send_to_provider', side_effect=send):
+            self.assertEqual(run_job(claimed, self.dispatcher), 'running')
+
+        # The first batch of two was sent before its progress update found the lock gone.
+        self.assertEqual(len(sent), 2)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by, job.sent), ('running', 'w2', 0))
+        self.assertEqual(DeliveryLog.objects.filter(campaign=self.campaign).count(), 2)
+
+    def test_lost_heartbeat_stops_the_dispatch_between_sends(self):
+        enqueue_dispatch(self.campaign)
+
+        with patch.object(Heartbeat, 'lost', new_callable=PropertyMock, return_value=True):
+            self.assertEqual(run_job(claim_next_job('w1'), self.dispatcher), 'running')
+
+        self.assertEqual(DeliveryLog.objects.filter(campaign=self.campaign).count(), 1)
+
+    @override_settings(DISPATCH_JOB_MAX_ATTEMPTS=1)
+    def test_once_command_drains_the_queue(self):
+        enqueue_dispatch(self.campaign)
+        other = MessageCampaign.objects.create(title='Other', message='M')
+        enqueue_dispatch(other)
+
+        call_command('run_dispatch_worker', '--once', stdout=StringIO())
+
+        self.assertEqual(set(DispatchJob.objects.values_list('status', flat=True)), {'completed'})
+
+    def test_summary_counts_the_accounts_still_waiting(self):
+        job = DispatchJob(campaign=self.campaign, status='running', total=10, sent=4, failed=1)
+
+        self.assertEqual(job_summary(job)['queued'], 5)
+
+    @skipUnless(connection.vendor == 'sqlite', 'Plan assertions are written for SQLite')
+    def test_worker_polls_read_the_partial_indexes(self):
+        now = timezone.now()
+        plans = {
+            'dispatch_job_queued_idx': DispatchJob.objects.filter(status='queued', available_at__lte=now).order_by('available_at', 'id'),
+            'dispatch_job_running_idx': DispatchJob.objects.filter(status='running', locked_until__lt=now).order_by('locked_until'),
+        }
+        for index_name, queryset in plans.items():
+            with self.subTest(index=index_name):
+                plan = queryset.values('id').explain()
+                self.assertIn(index_name, plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_idle_poll_costs_two_queries(self):
+        enqueue_dispatch(self.campaign)
+        DispatchJob.objects.update(status='completed')
+
+        with self.assertNumQueries(2):
+            self.assertIsNone(claim_next_job('w1'))
+
+
+class DispatchJobViewTests(DispatchJobTestMixin, TestCase):
+    def _post(self, path: str, payload: dict):
+        return self.client.post(path, data=json.dumps(payload), content_type='application/json')
+
+    def test_send_returns_202_and_progress_endpoint_tracks_the_worker(self):
+        response = self._post(f'/api/campaigns/{self.campaign.id}/send/', {})
+
+        self.assertEqual(response.status_code, 202)
+        data = response.json()['data']
+        self.assertEqual(data['job']['status'], 'queued')
+        self.assertEqual((data['job']['total'], data['job']['queued'], data['job']['sent']), (5, 5, 0))
+        self.assertFalse(DeliveryLog.objects.exists())
+
+        progress = self.client.get(data['progress_url']).json()['data']
+        self.assertEqual(progress['job_id'], data['job']['job_id'])
+        self.assertEqual(progress['status'], 'queued')
+
+        DispatchWorker(dispatcher=self.dispatcher, worker_id='w1').run_once()
+
+        progress = self.client.get(data['progress_url']).json()['data']
+        self.assertEqual((progress['status'], progress['queued'], progress['sent'], progress['failed']), ('completed', 0, 5, 0))
+
+    def test_compose_send_queues_only_the_matched_accounts(self):
+        SocialAccount.objects.create(name='Bolt', platform='x', handle='bolt', access_token='token')
+
+        response = self._post(
+            '/api/campaigns/compose-send/',
+            {'title': 'T', 'message': 'M', 'account_names': ['Bolt'], 'platforms': ['x']},
+        )
+
+        self.assertEqual(response.status_code, 202)
+        data = response.json()['data']
+        self.assertEqual(data['targets'], ['Bolt on X / Twitter (@bolt)'])
+        job = DispatchJob.objects.get(pk=data['job']['job_id'])
+        self.assertEqual((job.total, len(job.account_ids)), (1, 1))
+
+    def test_unknown_job_is_404(self):
+        self.assertEqual(self.client.get('/api/dispatch-jobs/999/').status_code, 404)
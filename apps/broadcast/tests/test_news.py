@@ -0,0 +1,314 @@
+import asyncio
+import io
+import threading
+import time
+from unittest.mock import MagicMock
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+import requests
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase
+
+from apps.broadcast.ai_services import FeedCache, NewsArticle, NewsScanner, merge_articles
+
+
+def _feed(*titles: str) -> bytes:
+    items = ''.join(
+        f'<item><title>{title}</title><link>https://example.com/{index}</link>'
+        f'<source>Wire</source><pubDate>Mon, 06 Jan 2025 10:0{index}:00 GMT</pubDate></item>'
+        for index, title in enumerate(titles)
+    )
+    return f'<rss><channel>{items}</channel></rss>'.encode()
+
+
+def _response(status_code: int = 200, content: bytes = b'', headers: dict | None = None):
+    response = MagicMock(status_code=status_code, content=content, headers=headers or {}, raw=io.BytesIO(content))
+    response.raise_for_status.return_value = None
+    return response
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class NewsScannerCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = FeedCache(ttl=60, max_entries=2, clock=self.clock)
+        self.session = MagicMock()
+        self.scanner = NewsScanner(session=self.session, cache=self.cache)
+
+    def test_repeated_query_is_served_from_cache(self):
+        self.session.get.return_value = _response(content=_feed('Solar grants', 'Wind farms'))
+
+        first = self.scanner.fetch('Solar ', 'Austin')
+        second = self.scanner.fetch('solar', '  austin')
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.session.get.call_count, 1)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    def test_stale_entry_is_revalidated_with_conditional_get(self):
+        self.session.get.return_value = _response(
+            content=_feed('Solar grants'),
+            headers={'ETag': '"v1"', 'Last-Modified': 'Mon, 06 Jan 2025 10:00:00 GMT'},
+        )
+        articles = self.scanner.fetch('solar')
+
+        self.clock.now = 61
+        self.session.get.return_value = _response(status_code=304)
+        revalidated = self.scanner.fetch('solar')
+
+        headers = self.session.get.call_args.kwargs['headers']
+        self.assertEqual(headers['If-None-Match'], '"v1"')
+        self.assertEqual(headers['If-Modified-Since'], 'Mon, 06 Jan 2025 10:00:00 GMT')
+        self.assertEqual(revalidated, articles)
+        self.assertEqual(self.cache.stats()['not_modified'], 1)
+
+        # The 304 restarted the TTL.
+        self.scanner.fetch('solar')
+        self.assertEqual(self.session.get.call_count, 2)
+
+    def test_least_recently_used_query_is_evicted(self):
+        self.session.get.side_effect = lambda *args, **kwargs: _response(content=_feed('Headline'))
+
+        self.scanner.fetch('solar')
+        self.scanner.fetch('wind')
+        self.scanner.fetch('solar')
+        self.scanner.fetch('hydro')
+
+        self.assertIsNotNone(self.cache.get('solar'))
+        self.assertIsNone(self.cache.get('wind'))
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+
+    def test_larger_limit_than_cached_refetches(self):
+        self.session.get.side_effect = lambda *args, **kwargs: _response(content=_feed('A', 'B', 'C'))
+
+        self.assertEqual(len(self.scanner.fetch('solar', limit=1)), 1)
+        self.assertEqual(len(self.scanner.fetch('solar', limit=3)), 3)
+        self.assertEqual(self.session.get.call_count, 2)
+
+
+class CountingReader(io.BytesIO):
+    def __init__(self, content: bytes):
+        super().__init__(content)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+class StreamingParserTests(SimpleTestCase):
+    def test_streaming_matches_buffered_parse(self):
+        content = _feed('A', 'B', 'C', 'D')
+
+        self.assertEqual(
+            NewsScanner._parse_stream(io.BytesIO(content), 3),
+            NewsScanner._parse(content, 3),
+        )
+
+    def test_streaming_stops_reading_at_limit(self):
+        content = _feed(*[f'Headline {index} ' + 'x' * 500 for index in range(2000)])
+        raw = CountingReader(content)
+
+        articles = NewsScanner._parse_stream(raw, 5)
+
+        self.assertEqual(len(articles), 5)
+        self.assertLess(raw.bytes_read, len(content) / 10)
+
+    def test_scanner_streams_and_closes_response(self):
+        session = MagicMock()
+        response = _response(content=_feed('A', 'B'))
+        session.get.return_value = response
+        scanner = NewsScanner(session=session, cache=FeedCache(ttl=60, max_entries=2), streaming=True)
+
+        self.assertEqual([article.title for article in scanner.fetch('solar', limit=1)], ['A'])
+        self.assertTrue(session.get.call_args.kwargs['stream'])
+        response.close.assert_called_once()
+
+
+class FeedSession:
+    """Serves a canned feed per query, optionally slowly or with an error."""
+
+    def __init__(self, feeds: dict, delay: float = 0.0):
+        self.feeds = feeds
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+        query = parse_qs(urlsplit(url).query)['q'][0]
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            feed = self.feeds[query]
+            if isinstance(feed, Exception):
+                raise feed
+            time.sleep(feed[0] if isinstance(feed, tuple) else self.delay)
+            content = feed[1] if isinstance(feed, tuple) else feed
+            return _response(content=content)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _item_feed(*items) -> bytes:
+    body = ''.join(
+        f'<item><title>{title}</title><link>{link}</link><pubDate>{published}</pubDate></item>'
+        for title, link, published in items
+    )
+    return f'<rss><channel>{body}</channel></rss>'.encode()
+
+
+class FetchManyTests(SimpleTestCase):
+    def _scanner(self, session) -> NewsScanner:
+        return NewsScanner(session=session, cache=FeedCache(ttl=60, max_entries=10), streaming=False)
+
+    def test_queries_run_concurrently_within_pool_bound(self):
+        feeds = {
+            f'topic {index}': _item_feed((f'Story {index}', f'https://example.com/{index}', ''))
+            for index in range(4)
+        }
+        session = FeedSession(feeds, delay=0.2)
+
+        started = time.monotonic()
+        articles = self._scanner(session).fetch_many(
+            [(f'topic {index}', '') for index in range(4)], limit=10, max_workers=4
+        )
+
+        self.assertLess(time.monotonic() - started, 0.6)
+        self.assertEqual(session.max_active, 4)
+        self.assertEqual(len(articles), 4)
+
+    def test_results_are_deduped_and_ranked_by_recency(self):
+        session = FeedSession({
+            'solar austin': _item_feed(
+                ('Solar grants expand', 'https://a.example/story?utm_source=x', 'Mon, 06 Jan 2025 09:00:00 GMT'),
+                ('Old news', 'https://a.example/old', 'Sun, 05 Jan 2025 09:00:00 GMT'),
+            ),
+            'solar dallas': _item_feed(
+                ('Solar Grants Expand!', 'https://b.example/other', 'Mon, 06 Jan 2025 09:30:00 GMT'),
+                ('Fresh take', 'https://a.example/story/', 'Mon, 06 Jan 2025 11:00:00 GMT'),
+                ('Newest', 'https://c.example/new', 'Mon, 06 Jan 2025 12:00:00 GMT'),
+            ),
+        })
+
+        articles = self._scanner(session).fetch_many([('solar', 'austin'), ('solar', 'dallas')], limit=10)
+
+        # "Fresh take" shares a link with "Solar grants expand", and "Solar Grants Expand!" shares its title.
+        self.assertEqual([article.title for article in articles], ['Newest', 'Fresh take', 'Solar Grants Expand!', 'Old news'])
+
+    def test_slow_and_failing_queries_are_skipped(self):
+        session = FeedSession({
+            'fast': _feed('Fast story'),
+            'slow': (1.0, _feed('Slow story')),
+            'broken': requests.ConnectionError('down'),
+        })
+
+        articles = self._scanner(session).fetch_many([('fast', ''), ('slow', ''), ('broken', '')], timeout=0.3)
+
+        self.assertEqual([article.title for article in articles], ['Fast story'])
+
+    def test_error_is_raised_when_every_query_fails(self):
+        session = FeedSession({'a': requests.ConnectionError('down'), 'b': requests.ConnectionError('down')})
+
+        with self.assertRaises(requests.ConnectionError):
+            self._scanner(session).fetch_many([('a', ''), ('b', '')])
+
+    def test_undated_articles_rank_last(self):
+        undated = NewsArticle('Undated', 'https://x.example/1', 'Wire', '')
+        dated = NewsArticle('Dated', 'https://x.example/2', 'Wire', 'Mon, 06 Jan 2025 09:00:00 GMT')
+
+        self.assertEqual(merge_articles([[undated], [dated]], limit=5), [dated, undated])
+
+
+class FeedTransport:
+    """httpx transport serving feeds by query, with optional latency, counting concurrent requests."""
+
+    def __init__(self, feeds: dict, delay: float = 0.0):
+        self.feeds = feeds
+        self.delay = delay
+        self.requests: list[httpx.Request] = []
+        self.active = 0
+        self.max_active = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        feed = self.feeds[parse_qs(request.url.query.decode())['q'][0]]
+        if isinstance(feed, int):
+            return httpx.Response(feed)
+        return httpx.Response(200, content=feed, headers={'ETag': '"v1"'})
+
+
+class AsyncNewsScannerTests(SimpleTestCase):
+    def _scanner(self, transport: FeedTransport, **kwargs) -> NewsScanner:
+        return NewsScanner(
+            cache=FeedCache(ttl=60, max_entries=10, clock=kwargs.pop('clock', time.monotonic)),
+            async_client=httpx.AsyncClient(transport=httpx.MockTransport(transport)),
+            **kwargs,
+        )
+
+    def test_afetch_parses_streamed_feed_and_shares_the_cache(self):
+        transport = FeedTransport({'solar': _feed('Solar grants', 'Wind farms', 'Heat pumps')})
+        scanner = self._scanner(transport)
+
+        articles = async_to_sync(scanner.afetch)('solar', limit=2)
+
+        self.assertEqual([article.title for article in articles], ['Solar grants', 'Wind farms'])
+        self.assertEqual(scanner.fetch('solar', limit=2), articles)
+        self.assertEqual(len(transport.requests), 1)
+
+    def test_afetch_revalidates_stale_entry(self):
+        clock = FakeClock()
+        transport = FeedTransport({'solar': _feed('Solar grants')})
+        scanner = self._scanner(transport, clock=clock)
+        first = async_to_sync(scanner.afetch)('solar')
+
+        clock.now = 120
+        transport.feeds['solar'] = 304
+        second = async_to_sync(scanner.afetch)('solar')
+
+        self.assertEqual(first, second)
+        self.assertEqual(transport.requests[1].headers['If-None-Match'], '"v1"')
+        self.assertEqual(scanner.cache.stats()['not_modified'], 1)
+
+    def test_afetch_many_runs_queries_concurrently_within_bound(self):
+        transport = FeedTransport(
+            {f'topic {index}': _item_feed((f'Story {index}', f'https://example.com/{index}', '')) for index in range(6)},
+            delay=0.2,
+        )
+
+        started = time.monotonic()
+        articles = async_to_sync(self._scanner(transport).afetch_many)(
+            [(f'topic {index}', '') for index in range(6)], limit=10, max_workers=3
+        )
+
+        self.assertLess(time.monotonic() - started, 0.8)
+        self.assertEqual(transport.max_active, 3)
+        self.assertEqual(len(articles), 6)
+
+    def test_afetch_many_skips_failures_and_raises_when_all_fail(self):
+        transport = FeedTransport({'fast': _feed('Fast story'), 'broken': 500})
+        scanner = self._scanner(transport)
+
+        articles = async_to_sync(scanner.afetch_many)([('fast', ''), ('broken', '')])
+
+        self.assertEqual([article.title for article in articles], ['Fast story'])
+        with self.assertRaises(httpx.HTTPStatusError):
+            async_to_sync(scanner.afetch_many)([('broken', '')])
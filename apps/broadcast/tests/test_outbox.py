@@ -0,0 +1,111 @@
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.broadcast.context7 import Context7BatchResult
+from apps.broadcast.models import MessageCampaign, OutboxEvent, SocialAccount
+from apps.broadcast.outbox import OutboxFlusher, enqueue_event
+from apps.broadcast.services import MessageDispatcher
+
+
+def _batch(*accepted):
+    return Context7BatchResult(
+        status_code=200,
+        payload={},
+        accepted=list(accepted),
+        errors={index: 'unavailable' for index, ok in enumerate(accepted) if not ok},
+    )
+
+
+class OutboxEnqueueTests(TestCase):
+    @patch('apps.broadcast.context7.Context7Client.publish_event')
+    def test_dispatch_writes_event_instead_of_calling_context7(self, publish_event):
+        SocialAccount.objects.create(name='Acme', platform='x', handle='acme', access_token='token')
+        campaign = MessageCampaign.objects.create(title='Launch', message='Hello')
+
+        MessageDispatcher(concurrent=False).dispatch_campaign(campaign)
+
+        publish_event.assert_not_called()
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.event_name, 'campaign.dispatched')
+        self.assertEqual(event.status, 'pending')
+        self.assertEqual(event.payload['campaign_id'], campaign.id)
+        self.assertEqual(event.payload['status'], 'sent')
+
+    def test_failed_status_save_rolls_back_event(self):
+        campaign = MessageCampaign.objects.create(title='Launch', message='Hello')
+        dispatcher = MessageDispatcher(concurrent=False)
+
+        with patch.object(MessageCampaign, 'save', side_effect=RuntimeError('db down')):
+            with self.assertRaises(RuntimeError):
+                dispatcher._set_status(campaign, 'sent', event=('campaign.dispatched', {'campaign_id': campaign.id}))
+
+        self.assertFalse(OutboxEvent.objects.exists())
+
+
+class OutboxFlusherTests(TestCase):
+    def _flusher(self, *results, **kwargs):
+        client = MagicMock()
+        client.publish_events.side_effect = list(results)
+        return OutboxFlusher(client=client, **kwargs), client
+
+    def test_events_are_delivered_in_one_ordered_batch(self):
+        for index in range(3):
+            enqueue_event('campaign.dispatched', {'campaign_id': index})
+        flusher, client = self._flusher(_batch(True, True, True))
+
+        self.assertEqual(flusher.flush(), 3)
+
+        client.publish_events.assert_called_once()
+        sent = [payload['campaign_id'] for _, payload in client.publish_events.call_args.args[0]]
+        self.assertEqual(sent, [0, 1, 2])
+        self.assertEqual(set(OutboxEvent.objects.values_list('status', flat=True)), {'delivered'})
+
+    def test_rejected_event_backs_off_and_blocks_later_batches(self):
+        first = enqueue_event('campaign.dispatched', {'campaign_id': 1})
+        second = enqueue_event('campaign.dispatched', {'campaign_id': 2})
+        flusher, client = self._flusher(_batch(False, True), base_delay=4)
+
+        self.assertEqual(flusher.flush(), 0)
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        # Accepted, but behind a rejected event: it waits for a later batch.
+        self.assertEqual((second.status, second.attempts), ('pending', 0))
+        self.assertEqual((first.status, first.attempts), ('pending', 1))
+        self.assertIn('unavailable', first.last_error)
+        self.assertGreater(first.available_at, timezone.now() + timedelta(seconds=3))
+
+        # Still backing off: newer events wait behind it.
+        enqueue_event('campaign.dispatched', {'campaign_id': 3})
+        self.assertEqual(flusher.flush(), 0)
+        self.assertEqual(client.publish_events.call_count, 1)
+
+    def test_only_the_prefix_before_a_rejection_is_delivered(self):
+        events = [enqueue_event('campaign.dispatched', {'campaign_id': index}) for index in range(4)]
+        flusher, client = self._flusher(_batch(True, True, False, True), _batch(True, True))
+
+        self.assertEqual(flusher.flush(), 2)
+        statuses = [OutboxEvent.objects.get(pk=event.pk).status for event in events]
+        self.assertEqual(statuses, ['delivered', 'delivered', 'pending', 'pending'])
+
+        OutboxEvent.objects.update(available_at=timezone.now())
+        self.assertEqual(flusher.flush(), 2)
+        sent = [payload['campaign_id'] for _, payload in client.publish_events.call_args.args[0]]
+        self.assertEqual(sent, [2, 3])
+
+    def test_event_is_dead_after_max_attempts(self):
+        event = enqueue_event('campaign.dispatched', {'campaign_id': 1})
+        OutboxEvent.objects.filter(pk=event.pk).update(attempts=2)
+        later = enqueue_event('campaign.dispatched', {'campaign_id': 2})
+        flusher, client = self._flusher(_batch(False), _batch(True), batch_size=1, max_attempts=3)
+
+        flusher.flush()
+        self.assertEqual(flusher.flush(), 1)
+
+        event.refresh_from_db()
+        later.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), ('dead', 3))
+        self.assertEqual(later.status, 'delivered')
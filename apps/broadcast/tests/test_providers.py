@@ -0,0 +1,185 @@
+import time
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+
+from apps.broadcast.fake_provider import FakeProviderServer
+from apps.broadcast.models import DeliveryLog, MessageCampaign, SocialAccount, SocialAPICredential
+from apps.broadcast.providers import InstagramAdapter, ProviderAdapter, ProviderRegistry, XAdapter
+from apps.broadcast.services import MessageDispatcher
+
+
+class ProviderAdapterTests(TestCase):
+    def setUp(self):
+        self.server = FakeProviderServer(seed=7)
+        self.server.start_in_thread()
+        self.addCleanup(self.server.stop)
+        self.account = SocialAccount.objects.create(name='Acme', platform='x', handle='acme', access_token='token')
+
+    def _credential(self, platform: str = 'x') -> SocialAPICredential:
+        return SocialAPICredential.objects.create(
+            platform=platform,
+            app_name='Acme app',
+            client_id='client',
+            client_secret='secret',
+            api_base_url=self.server.base_url,
+        )
+
+    def test_adapter_without_credential_is_stubbed(self):
+        result = XAdapter().send('Hello', self.account)
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.provider_message_id, f'x-{self.account.id}')
+        self.assertEqual(self.server.request_count, 0)
+
+    def test_adapter_reuses_pooled_connection(self):
+        adapter = XAdapter(credential=self._credential(), pool_size=2)
+        self.addCleanup(adapter.close)
+
+        results = [adapter.send(f'Post {index}', self.account) for index in range(5)]
+
+        self.assertTrue(all(result.success and result.provider_message_id for result in results))
+        self.assertEqual(self.server.request_count, 5)
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_adapter_reports_provider_errors(self):
+        self.server.error_rate = 1.0
+        adapter = XAdapter(credential=self._credential())
+        self.addCleanup(adapter.close)
+
+        result = adapter.send('Hello', self.account)
+
+        self.assertFalse(result.success)
+        self.assertEqual(result.status_code, 503)
+        self.assertIn('HTTP 503', result.error_message)
+
+    def test_registry_rebuilds_adapter_when_credential_changes(self):
+        registry = ProviderRegistry()
+        self.addCleanup(registry.close)
+        registry.refresh({'x': 2})
+        stub = registry.get('x')
+        self.assertTrue(stub.is_stub)
+
+        self._credential()
+        registry.refresh({'x': 2})
+        live = registry.get('x')
+        registry.refresh({'x': 2})
+
+        self.assertIsNot(stub, live)
+        self.assertFalse(live.is_stub)
+        self.assertIs(registry.get('x'), live)
+
+    def test_replaced_adapter_is_closed_only_after_its_last_send(self):
+        registry = ProviderRegistry()
+        self.addCleanup(registry.close)
+        registry.refresh({'x': 2})
+        in_use = registry.acquire('x')
+
+        self._credential()
+        with patch.object(in_use, 'close') as close:
+            registry.refresh({'x': 2})
+            self.assertIsNot(registry.get('x'), in_use)
+            close.assert_not_called()
+
+            registry.release(in_use)
+            close.assert_called_once()
+
+    def test_smaller_pool_reuses_the_adapter(self):
+        registry = ProviderRegistry()
+        self.addCleanup(registry.close)
+        registry.refresh({'x': 8})
+        adapter = registry.get('x')
+
+        registry.refresh({'x': 2})
+        self.assertIs(registry.get('x'), adapter)
+        registry.refresh({'x': 16})
+        self.assertEqual(registry.get('x').pool_size, 16)
+
+    def test_adapters_must_build_their_requests(self):
+        with self.assertRaises(TypeError):
+            ProviderAdapter()
+
+    def test_dispatcher_posts_through_registered_adapters(self):
+        self._credential()
+        for index in range(4):
+            SocialAccount.objects.create(name='Acme', platform='x', handle=f'acme{index}', access_token='token')
+        campaign = MessageCampaign.objects.create(title='Live', message='Hello')
+        registry = ProviderRegistry()
+        self.addCleanup(registry.close)
+
+        stats = MessageDispatcher(providers=registry, platform_concurrency={'x': 2}).dispatch_campaign(campaign)
+
+        self.assertEqual(stats, {'total': 5, 'sent': 5, 'failed': 0})
+        self.assertEqual(self.server.request_count, 5)
+        self.assertLessEqual(len(self.server.connections), 2)
+        self.assertFalse(DeliveryLog.objects.filter(campaign=campaign, provider_message_id='').exists())
+
+
+class AsyncProviderTests(TestCase):
+    def setUp(self):
+        self.server = FakeProviderServer(seed=7)
+        self.server.start_in_thread()
+        self.addCleanup(self.server.stop)
+        self.credential = SocialAPICredential.objects.create(
+            platform='x',
+            app_name='Acme app',
+            client_id='client',
+            client_secret='secret',
+            api_base_url=self.server.base_url,
+        )
+        self.account = SocialAccount.objects.create(name='Acme', platform='x', handle='acme', access_token='token')
+
+    async def test_asend_posts_through_pooled_async_client(self):
+        adapter = XAdapter(credential=self.credential, pool_size=2)
+        self.addCleanup(adapter.close)
+
+        results = [await adapter.asend(f'Post {index}', self.account) for index in range(3)]
+
+        self.assertTrue(all(result.success and result.provider_message_id for result in results))
+        self.assertEqual(self.server.request_count, 3)
+        self.assertEqual(len(self.server.connections), 1)
+
+    async def test_asend_reports_provider_errors(self):
+        self.server.error_rate = 1.0
+        adapter = XAdapter(credential=self.credential)
+        self.addCleanup(adapter.close)
+
+        result = await adapter.asend('Hello', self.account)
+
+        self.assertFalse(result.success)
+        self.assertEqual(result.status_code, 503)
+
+    async def test_instagram_publishes_container_in_two_async_steps(self):
+        credential = await SocialAPICredential.objects.acreate(
+            platform='instagram', app_name='Acme app', client_id='c', client_secret='s', api_base_url=self.server.base_url
+        )
+        account = await SocialAccount.objects.acreate(name='Acme', platform='instagram', handle='acme', access_token='t')
+        adapter = InstagramAdapter(credential=credential)
+        self.addCleanup(adapter.close)
+
+        result = await adapter.asend('Hello', account, image_url='https://img.example/1.png')
+
+        self.assertTrue(result.success)
+        self.assertEqual(self.server.request_count, 2)
+
+    def test_async_dispatch_keeps_many_slow_sends_in_flight(self):
+        self.server.latency = 0.2
+        SocialAccount.objects.bulk_create(
+            SocialAccount(name='Acme', platform='x', handle=f'acme{index}', access_token='token') for index in range(99)
+        )
+        campaign = MessageCampaign.objects.create(title='Live', message='Hello')
+        registry = ProviderRegistry()
+        self.addCleanup(registry.close)
+        dispatcher = MessageDispatcher(providers=registry, platform_concurrency={'x': 100})
+
+        started = time.monotonic()
+        stats = async_to_sync(dispatcher.adispatch_campaign)(campaign)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(stats, {'total': 100, 'sent': 100, 'failed': 0})
+        # 100 sends of 0.2s each, all awaited together on one thread; serially this takes 20s.
+        self.assertLess(elapsed, 3)
+        self.assertEqual(DeliveryLog.objects.filter(campaign=campaign, success=True).count(), 100)
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.status, 'sent')
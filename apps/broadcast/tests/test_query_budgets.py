@@ -0,0 +1,161 @@
+import json
+import re
+from datetime import timedelta
+from unittest import skipUnless
+from unittest.mock import AsyncMock, patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.broadcast.ai_services import NewsArticle
+from apps.broadcast.models import AuditLog, DeliveryLog, MessageCampaign, SocialAccount
+from apps.broadcast.search import ACCOUNT_FTS_TABLE, fts_available
+from apps.broadcast.services import MessageDispatcher, claim_next_due_campaign
+
+HOT_TABLES = ('broadcast_socialaccount', 'broadcast_messagecampaign', 'broadcast_deliverylog', 'broadcast_auditlog')
+# A bare "SCAN <table>" (no index) means SQLite reads the whole table.
+FULL_SCAN = re.compile(r'\bSCAN (%s)\b(?! USING (COVERING )?INDEX)' % '|'.join(HOT_TABLES))
+
+
+class QueryBudgetMixin:
+    def _accounts(self, count: int, name: str = 'Acme') -> None:
+        SocialAccount.objects.bulk_create(
+            SocialAccount(name=name, platform='x' if index % 2 else 'facebook', handle=f'{name}{index}', access_token='t')
+            for index in range(count)
+        )
+
+    def _post(self, path: str, payload: dict):
+        return self.client.post(path, data=json.dumps(payload), content_type='application/json')
+
+    def _full_scans(self, queries) -> list[str]:
+        scans = []
+        with connection.cursor() as cursor:
+            for query in queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT'):
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                for row in cursor.fetchall():
+                    if FULL_SCAN.search(row[-1]):
+                        scans.append(f'{row[-1]} <- {sql}')
+        return scans
+
+    def assertQueryBudget(self, num_queries: int, func):
+        """Run `func`, pin its query count and check no hot table is fully scanned."""
+        with CaptureQueriesContext(connection) as queries:
+            result = func()
+        executed = [query['sql'] for query in queries.captured_queries]
+        self.assertEqual(len(executed), num_queries, '\n'.join(executed))
+        if connection.vendor == 'sqlite':
+            self.assertEqual(self._full_scans(queries.captured_queries), [])
+        return result
+
+
+class ViewQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def test_health_and_wizard_page_hit_no_database(self):
+        with self.assertNumQueries(0):
+            self.client.get('/api/health/')
+        with self.assertNumQueries(0):
+            self.client.get('/')
+
+    def test_wizard_accounts_budget(self):
+        for index in range(30):
+            self._accounts(1, name=f'Acme {index:02d}')
+        fts_available(ACCOUNT_FTS_TABLE)  # probed once per process, not per request
+
+        first = self.assertQueryBudget(1, lambda: self.client.get('/api/wizard/accounts/?q=acme&page_size=10'))
+        cursor = first.json()['data']['pagination']['next_cursor']
+        # Deep pages cost the same single keyset query as the first one.
+        self.assertQueryBudget(1, lambda: self.client.get(f'/api/wizard/accounts/?q=acme&page_size=10&cursor={cursor}'))
+
+    def test_create_campaign_budget(self):
+        with self.assertNumQueries(2):
+            response = self._post('/api/campaigns/', {'title': 'T', 'message': 'M'})
+        self.assertEqual(response.status_code, 201)
+
+    def test_send_campaign_budget_does_not_grow_with_accounts(self):
+        for count in (3, 30):
+            SocialAccount.objects.all().delete()
+            self._accounts(count)
+            campaign = MessageCampaign.objects.create(title='T', message='M')
+
+            # The send is queued for a dispatch worker, so the request never touches the providers.
+            response = self.assertQueryBudget(6, lambda: self._post(f'/api/campaigns/{campaign.id}/send/', {}))
+            self.assertEqual(response.status_code, 202)
+
+    def test_compose_and_send_budget(self):
+        self._accounts(10)
+
+        # The matched accounts are loaded once and reused for the queued job and the audit targets.
+        response = self.assertQueryBudget(
+            6,
+            lambda: self._post(
+                '/api/campaigns/compose-send/',
+                {'title': 'T', 'message': 'M', 'account_names': ['Acme'], 'platforms': ['x', 'facebook']},
+            ),
+        )
+        self.assertEqual(response.status_code, 202)
+
+    def test_campaign_stats_budget_does_not_grow_with_deliveries(self):
+        self._accounts(30)
+        campaign = MessageCampaign.objects.create(title='T', message='M')
+        MessageDispatcher(concurrent=False, log_batch_size=7).dispatch_campaign(campaign)
+
+        response = self.assertQueryBudget(2, lambda: self.client.get(f'/api/campaigns/{campaign.id}/stats/'))
+        self.assertEqual(response.json()['data']['total'], 30)
+
+    @patch('apps.broadcast.views.OpenAIContentStudio')
+    @patch('apps.broadcast.views.NewsScanner')
+    def test_ai_compose_budget(self, scanner_class, studio_class):
+        scanner_class.return_value.afetch = AsyncMock(return_value=[NewsArticle('Headline', 'https://example.com', 'Wire', '')])
+        studio_class.return_value.acompose_post = AsyncMock(return_value={'title': 'T', 'message': 'M', 'image_prompt': ''})
+        self._accounts(10)
+
+        # The autopost's log batch also reads the accounts' earlier outcomes for the counters.
+        response = self.assertQueryBudget(
+            17,
+            lambda: self._post(
+                '/api/campaigns/ai-compose/',
+                {'keywords': 'solar', 'autopost': True, 'account_names': ['Acme'], 'platforms': ['x']},
+            ),
+        )
+        self.assertEqual(response.status_code, 201)
+
+
+class HotQueryPlanTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self._accounts(20)
+        self.dispatcher = MessageDispatcher(concurrent=False)
+
+    @skipUnless(connection.vendor == 'sqlite', 'Plan assertions are written for SQLite')
+    def test_hot_lookups_use_composite_indexes(self):
+        campaign = MessageCampaign.objects.create(title='T', message='M')
+        plans = {
+            'campaign_status_send_at_idx': MessageCampaign.objects.filter(status='scheduled', send_at__lte=timezone.now()),
+            'campaign_status_updated_idx': MessageCampaign.objects.filter(
+                status='scheduled', updated_at__gte=timezone.now() - timedelta(seconds=5)
+            ),
+            'account_active_name_idx': SocialAccount.objects.filter(is_active=True, name__in=['Acme'], platform__in=['x']),
+            'delivery_campaign_created_idx': DeliveryLog.objects.filter(campaign=campaign).order_by('-created_at'),
+            'audit_entity_created_idx': AuditLog.objects.filter(entity='MessageCampaign', entity_id=campaign.id),
+        }
+        for index_name, queryset in plans.items():
+            with self.subTest(index=index_name):
+                self.assertIn(index_name, queryset.explain())
+
+    def test_scheduled_dispatch_budget(self):
+        campaign = MessageCampaign.objects.create(
+            title='T', message='M', status='scheduled', send_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        def run():
+            claimed = claim_next_due_campaign('worker')
+            return self.dispatcher.dispatch_campaign(claimed, exclude_delivered=True)
+
+        # Includes creating the counter rows once, one lookup of earlier outcomes and one counter update
+        # per platform in the batch; the lease is renewed by a heartbeat thread, not per batch.
+        stats = self.assertQueryBudget(19, run)
+        self.assertEqual(stats['total'], 20)
+        self.assertEqual(DeliveryLog.objects.filter(campaign=campaign).count(), 20)
@@ -0,0 +1,174 @@
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+
+from apps.broadcast.models import MessageCampaign, RateLimitBucket, SocialAccount
+from apps.broadcast.providers import ProviderResult
+from apps.broadcast.rate_limit import RACE_BACKOFF, RateLimit, RateLimiter, RateLimitExceeded, parse_retry_after
+from apps.broadcast.services import MessageDispatcher
+
+
+class FakeClock:
+    def __init__(self, start: float = 1_000_000.0):
+        self.now = start
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class RateLimiterTests(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def _limiter(self, **kwargs) -> RateLimiter:
+        kwargs.setdefault('limits', {'x': RateLimit(per_minute=60, burst=2)})
+        kwargs.setdefault('max_wait', 60)
+        return RateLimiter(clock=self.clock, sleep=self.clock.sleep, **kwargs)
+
+    def test_parse_retry_after_accepts_seconds_and_http_dates(self):
+        self.assertEqual(parse_retry_after('3'), 3.0)
+        self.assertIsNone(parse_retry_after(''))
+        self.assertIsNone(parse_retry_after('soon'))
+        self.assertEqual(parse_retry_after('Wed, 21 Oct 2015 07:28:10 GMT', now=1445412480.0), 10.0)
+
+    def test_bucket_waits_exactly_for_next_token(self):
+        limiter = self._limiter()
+
+        limiter.acquire('x')
+        limiter.acquire('x')
+        waited = limiter.acquire('x')
+
+        self.assertAlmostEqual(waited, 1.0)
+        self.assertEqual(len(self.clock.sleeps), 1)
+
+    def test_bucket_is_shared_between_limiters(self):
+        first, second = self._limiter(), self._limiter()
+
+        first.acquire('x')
+        first.acquire('x')
+        second.acquire('x')
+
+        self.assertAlmostEqual(sum(self.clock.sleeps), 1.0)
+        self.assertEqual(RateLimitBucket.objects.count(), 1)
+
+    def test_retry_after_blocks_bucket_for_requested_time(self):
+        limiter = self._limiter()
+        limiter.acquire('x')
+
+        limiter.block('x', '', 7.5)
+        waited = limiter.acquire('x')
+
+        self.assertAlmostEqual(waited, 7.5)
+
+    def test_per_app_keys_split_budget(self):
+        limiter = self._limiter(per_app=True)
+
+        limiter.acquire('x', 'App one')
+        limiter.acquire('x', 'App one')
+        limiter.acquire('x', 'App two')
+
+        self.assertEqual(self.clock.sleeps, [])
+        self.assertEqual(set(RateLimitBucket.objects.values_list('key', flat=True)), {'x:App one', 'x:App two'})
+
+    def test_unlimited_platform_never_touches_database(self):
+        limiter = self._limiter()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(limiter.acquire('facebook'), 0.0)
+
+    def test_lost_version_race_backs_off_before_retrying(self):
+        limiter = self._limiter()
+
+        with patch.object(RateLimiter, '_try_take', side_effect=[None, None, 0.0]) as try_take:
+            waited = limiter.acquire('x')
+
+        self.assertEqual(try_take.call_count, 3)
+        self.assertEqual(self.clock.sleeps, [RACE_BACKOFF, RACE_BACKOFF])
+        self.assertAlmostEqual(waited, 2 * RACE_BACKOFF)
+
+    def test_wait_longer_than_max_wait_raises(self):
+        limiter = self._limiter(max_wait=5)
+
+        with self.assertRaises(RateLimitExceeded):
+            limiter.block('x', '', 30)
+
+    def test_retry_after_above_max_wait_still_pauses_every_worker(self):
+        with self.assertRaises(RateLimitExceeded):
+            self._limiter(max_wait=5).block('x', '', 30)
+
+        self.assertEqual(RateLimitBucket.objects.get(key='x').blocked_until, self.clock.now + 30)
+        with self.assertRaises(RateLimitExceeded):
+            self._limiter(max_wait=5).acquire('x')
+        self.assertAlmostEqual(self._limiter(max_wait=60).acquire('x'), 30)
+
+
+class DispatcherThrottleTests(TestCase):
+    def test_throttled_send_is_retried_after_retry_after(self):
+        clock = FakeClock()
+        limiter = RateLimiter(
+            limits={'x': RateLimit(per_minute=600, burst=5)},
+            max_wait=60,
+            clock=clock,
+            sleep=clock.sleep,
+        )
+        adapter = MagicMock(app_name='')
+        adapter.send.side_effect = [
+            ProviderResult(success=False, provider_message_id='', status_code=429, retry_after=2.0),
+            ProviderResult(success=True, provider_message_id='tweet-1', status_code=201),
+        ]
+        providers = MagicMock()
+        providers.acquire.return_value = adapter
+        SocialAccount.objects.create(name='Acme', platform='x', handle='acme', access_token='token')
+        campaign = MessageCampaign.objects.create(title='Throttled', message='Hello')
+
+        dispatcher = MessageDispatcher(
+            concurrent=False,
+            providers=providers,
+            rate_limiter=limiter,
+        )
+        stats = dispatcher.dispatch_campaign(campaign)
+
+        self.assertEqual(stats, {'total': 1, 'sent': 1, 'failed': 0})
+        self.assertEqual(adapter.send.call_count, 2)
+        self.assertAlmostEqual(sum(clock.sleeps), 2.0)
+
+    def test_last_throttled_attempt_still_blocks_the_bucket(self):
+        clock = FakeClock()
+        limiter = RateLimiter(limits={'x': RateLimit(per_minute=600, burst=5)}, max_wait=60, clock=clock, sleep=clock.sleep)
+        adapter = MagicMock(app_name='')
+        adapter.send.return_value = ProviderResult(success=False, provider_message_id='', status_code=429, retry_after=30.0)
+        providers = MagicMock()
+        providers.acquire.return_value = adapter
+        SocialAccount.objects.create(name='Acme', platform='x', handle='acme', access_token='token')
+        campaign = MessageCampaign.objects.create(title='Throttled', message='Hello')
+        dispatcher = MessageDispatcher(concurrent=False, providers=providers, rate_limiter=limiter)
+        dispatcher.throttle_retries = 0
+
+        stats = dispatcher.dispatch_campaign(campaign)
+
+        self.assertEqual(stats, {'total': 1, 'sent': 0, 'failed': 1})
+        self.assertEqual(adapter.send.call_count, 1)
+        self.assertEqual(RateLimitBucket.objects.get(key='x').blocked_until, clock.now + 30.0)
+
+    def test_unlimited_platform_does_not_sleep_after_the_last_attempt(self):
+        clock = FakeClock()
+        limiter = RateLimiter(limits={}, max_wait=300, clock=clock, sleep=clock.sleep)
+        adapter = MagicMock(app_name='')
+        adapter.send.return_value = ProviderResult(success=False, provider_message_id='', status_code=429, retry_after=120.0)
+        providers = MagicMock()
+        providers.acquire.return_value = adapter
+        SocialAccount.objects.create(name='Acme', platform='facebook', handle='acme', access_token='token')
+        campaign = MessageCampaign.objects.create(title='Throttled', message='Hello')
+        dispatcher = MessageDispatcher(concurrent=False, providers=providers, rate_limiter=limiter)
+        dispatcher.throttle_retries = 1
+
+        stats = dispatcher.dispatch_campaign(campaign)
+
+        self.assertEqual(stats, {'total': 1, 'sent': 0, 'failed': 1})
+        self.assertEqual(adapter.send.call_count, 2)
+        self.assertEqual(clock.sleeps, [120.0])
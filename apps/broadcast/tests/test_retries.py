@@ -0,0 +1,222 @@
+import random
+from datetime import timedelta
+from io import StringIO
+from unittest import skipUnless
+from unittest.mock import PropertyMock, patch
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.broadcast.delivery_stats import campaign_stats
+from apps.broadcast.models import DeliveryLog, DeliveryRetry, MessageCampaign, OutboxEvent, SocialAccount
+from apps.broadcast.providers import ProviderResult
+from apps.broadcast.retries import DeliveryRetryEngine, claim_due_retries, failed_accounts, retry_summary, schedule_retries
+from apps.broadcast.services import Heartbeat, MessageDispatcher
+
+
+class DeliveryRetryTestMixin:
+    def setUp(self):
+        self.accounts = [
+            SocialAccount.objects.create(name='Acme', platform='x', handle=f'acme{index}', access_token='token')
+            for index in range(4)
+        ]
+        self.campaign = MessageCampaign.objects.create(title='T', message='M')
+        self.failing = {self.accounts[1].id, self.accounts[2].id}
+        self.dispatcher = MessageDispatcher(concurrent=False)
+        self.dispatcher._send_to_provider = self._send
+        self.sent_to = []
+        self.dispatcher.dispatch_campaign(self.campaign)
+        self.sent_to.clear()
+
+    def _send(self, message, account, image_url=''):
+        self.sent_to.append(account.id)
+        if account.id in self.failing:
+            return ProviderResult(False, '', {}, 'upstream timeout', status_code=503).as_tuple()
+        return ProviderResult(True, f'x-{account.id}', {}, '').as_tuple()
+
+    def _engine(self, **kwargs):
+        return DeliveryRetryEngine(dispatcher=self.dispatcher, worker_id='w1', rng=random.Random(7), **kwargs)
+
+    def _make_due(self):
+        DeliveryRetry.objects.filter(status='pending').update(next_attempt_at=timezone.now())
+
+
+class DeliveryRetryTests(DeliveryRetryTestMixin, TestCase):
+    def test_only_accounts_whose_latest_delivery_failed_are_scheduled(self):
+        # accounts[1] failed earlier but its latest delivery succeeded.
+        DeliveryLog.objects.create(campaign=self.campaign, account=self.accounts[1], success=True)
+
+        self.assertEqual(set(failed_accounts(self.campaign)), {self.accounts[2].id})
+        self.assertEqual(schedule_retries(self.campaign), 1)
+        self.assertEqual(schedule_retries(self.campaign), 0)
+        self.assertEqual(retry_summary(self.campaign.id)['pending'], 1)
+
+    def test_retry_resends_only_failures_and_moves_counters(self):
+        self.assertEqual(MessageCampaign.objects.get(pk=self.campaign.pk).status, 'failed')
+        self.assertEqual(schedule_retries(self.campaign), 2)
+        self.failing.clear()
+
+        self.assertEqual(self._engine().run_once(), 2)
+
+        self.assertEqual(sorted(self.sent_to), sorted([self.accounts[1].id, self.accounts[2].id]))
+        self.assertEqual(set(DeliveryRetry.objects.values_list('status', flat=True)), {'succeeded'})
+        stats = campaign_stats(self.campaign.id)
+        self.assertEqual((stats['sent'], stats['failed']), (4, 0))
+        self.assertEqual(failed_accounts(self.campaign), {})
+        self.assertEqual(MessageCampaign.objects.get(pk=self.campaign.pk).status, 'sent')
+        event = OutboxEvent.objects.get(event_name='campaign.retried')
+        self.assertEqual(event.payload['stats'], {'total': 2, 'sent': 2, 'failed': 0})
+
+    def test_failed_retry_backs_off_with_jitter_then_is_exhausted(self):
+        schedule_retries(self.campaign)
+        self.failing = {self.accounts[1].id}
+        engine = self._engine(max_attempts=2, base_delay=60)
+
+        before = timezone.now()
+        engine.run_once()
+        retry = DeliveryRetry.objects.get(account=self.accounts[1])
+        self.assertEqual((retry.status, retry.attempts, retry.last_error), ('pending', 1, 'upstream timeout'))
+        self.assertGreaterEqual(retry.next_attempt_at, before + timedelta(seconds=30))
+        self.assertLessEqual(retry.next_attempt_at, timezone.now() + timedelta(seconds=60))
+        self.assertEqual(MessageCampaign.objects.get(pk=self.campaign.pk).status, 'failed')
+        self.assertEqual(campaign_stats(self.campaign.id)['failed'], 1)
+
+        self.assertEqual(engine.run_once(), 0)
+        self._make_due()
+        engine.run_once()
+
+        retry.refresh_from_db()
+        self.assertEqual((retry.status, retry.attempts), ('exhausted', 2))
+        self.assertEqual(self.sent_to.count(self.accounts[1].id), 2)
+        self.assertEqual(campaign_stats(self.campaign.id)['failed'], 1)
+        self.assertEqual(MessageCampaign.objects.get(pk=self.campaign.pk).status, 'failed')
+
+    def test_backoff_doubles_up_to_the_cap(self):
+        engine = self._engine(base_delay=10, max_delay=40)
+
+        for attempts, ceiling in ((1, 10), (2, 20), (3, 40), (6, 40)):
+            with self.subTest(attempts=attempts):
+                delay = engine.delay(attempts).total_seconds()
+                self.assertGreaterEqual(delay, ceiling / 2)
+                self.assertLessEqual(delay, ceiling)
+
+    def test_claimed_retries_are_locked_until_the_lease_expires(self):
+        schedule_retries(self.campaign)
+
+        self.assertEqual(len(claim_due_retries('w1')), 2)
+        self.assertEqual(claim_due_retries('w2'), [])
+
+        DeliveryRetry.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        reclaimed = claim_due_retries('w2')
+        self.assertEqual({retry.attempts for retry in reclaimed}, {2})
+        self.assertTrue(all(retry.locked_by.startswith('w2:') for retry in reclaimed))
+
+    def test_deactivated_account_is_given_up_on_without_sending(self):
+        schedule_retries(self.campaign)
+        SocialAccount.objects.filter(pk=self.accounts[1].pk).update(is_active=False)
+        self.failing.clear()
+
+        self._engine().run_once()
+
+        self.assertEqual(self.sent_to, [self.accounts[2].id])
+        self.assertEqual(DeliveryRetry.objects.get(account=self.accounts[1]).status, 'exhausted')
+        self.assertEqual(MessageCampaign.objects.get(pk=self.campaign.pk).status, 'failed')
+
+    def test_finished_retry_is_reopened_when_a_later_send_fails(self):
+        schedule_retries(self.campaign)
+        DeliveryRetry.objects.update(status='exhausted', attempts=5)
+
+        self.assertEqual(schedule_retries(self.campaign), 2)
+        self.assertEqual(set(DeliveryRetry.objects.values_list('status', 'attempts')), {('pending', 0)})
+
+    def test_heartbeat_renews_the_locks_until_one_is_reclaimed(self):
+        schedule_retries(self.campaign)
+        engine = self._engine()
+        engine.lease_seconds = 600
+        retries = claim_due_retries('w1', lease_seconds=5)
+
+        self.assertTrue(engine._renew_locks(retries))
+        self.assertTrue(all(
+            expiry > timezone.now() + timedelta(seconds=500)
+            for expiry in DeliveryRetry.objects.values_list('next_attempt_at', flat=True)
+        ))
+
+        DeliveryRetry.objects.filter(pk=retries[0].pk).update(locked_by='w2:other')
+        self.assertFalse(engine._renew_locks(retries))
+
+    def test_round_stops_and_leaves_the_retries_when_the_locks_are_lost(self):
+        schedule_retries(self.campaign)
+        self.failing.clear()
+        logs_before = DeliveryLog.objects.count()
+
+        with patch.object(Heartbeat, 'lost', new_callable=PropertyMock, return_value=True):
+            self._engine().run_once()
+
+        self.assertEqual(len(self.sent_to), 1)
+        self.assertEqual(DeliveryLog.objects.count(), logs_before + 1)
+        self.assertEqual(set(DeliveryRetry.objects.values_list('status', flat=True)), {'running'})
+        stats = campaign_stats(self.campaign.id)
+        self.assertEqual((stats['sent'], stats['failed']), (3, 1))
+        self.assertEqual(MessageCampaign.objects.get(pk=self.campaign.pk).status, 'failed')
+        self.assertFalse(OutboxEvent.objects.filter(event_name='campaign.retried').exists())
+
+    def test_status_is_left_to_a_dispatch_that_started_meanwhile(self):
+        schedule_retries(self.campaign)
+        self.failing.clear()
+
+        def send(message, account, image_url=''):
+            MessageCampaign.objects.filter(pk=self.campaign.pk).update(status='sending')
+            return self._send(message, account, image_url)
+
+        self.dispatcher._send_to_provider = send
+        self._engine().run_once()
+
+        self.assertEqual(set(DeliveryRetry.objects.values_list('status', flat=True)), {'succeeded'})
+        self.assertEqual(MessageCampaign.objects.get(pk=self.campaign.pk).status, 'sending')
+        self.assertFalse(OutboxEvent.objects.filter(event_name='campaign.retried').exists())
+
+    def test_command_queues_and_sends_due_retries(self):
+        # The command builds its own dispatcher, whose default providers succeed here.
+        out = StringIO()
+
+        call_command('retry_deliveries', str(self.campaign.id), stdout=out)
+
+        self.assertIn('queued 2', out.getvalue())
+        self.assertEqual(retry_summary(self.campaign.id)['succeeded'], 2)
+
+    @skipUnless(connection.vendor == 'sqlite', 'Plan assertions are written for SQLite')
+    def test_due_lookups_read_the_partial_indexes(self):
+        now = timezone.now()
+        plans = {
+            'retry_pending_idx': DeliveryRetry.objects.filter(status='pending', next_attempt_at__lte=now).order_by('next_attempt_at', 'id'),
+            'retry_running_idx': DeliveryRetry.objects.filter(status='running', next_attempt_at__lte=now).order_by('next_attempt_at'),
+        }
+        for index_name, queryset in plans.items():
+            with self.subTest(index=index_name):
+                plan = queryset.values('id').explain()
+                self.assertIn(index_name, plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_idle_poll_costs_two_queries(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(claim_due_retries('w1'), [])
+
+
+class DeliveryRetryViewTests(DeliveryRetryTestMixin, TestCase):
+    def test_retry_endpoint_queues_the_failures(self):
+        response = self.client.post(f'/api/campaigns/{self.campaign.id}/retry/')
+
+        self.assertEqual(response.status_code, 202)
+        data = response.json()['data']
+        self.assertEqual((data['scheduled'], data['retries']['pending']), (2, 2))
+
+        again = self.client.post(f'/api/campaigns/{self.campaign.id}/retry/')
+        self.assertEqual((again.status_code, again.json()['data']['scheduled']), (200, 0))
+
+    def test_retry_endpoint_refuses_a_campaign_being_sent(self):
+        MessageCampaign.objects.filter(pk=self.campaign.pk).update(status='sending')
+
+        self.assertEqual(self.client.post(f'/api/campaigns/{self.campaign.id}/retry/').status_code, 409)
+        self.assertEqual(self.client.post('/api/campaigns/999/retry/').status_code, 404)
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.broadcast.models import DeliveryLog, DeliveryRollup, MessageCampaign, SocialAccount
+from apps.broadcast.rollups import delivery_analytics, roll_up_deliveries, rollup_watermark
+
+
+class DeliveryRollupTests(TestCase):
+    def setUp(self):
+        self.x = SocialAccount.objects.create(name='Acme', platform='x', handle='acme-x', access_token='token')
+        self.facebook = SocialAccount.objects.create(name='Acme', platform='facebook', handle='acme-fb', access_token='token')
+        self.campaign = MessageCampaign.objects.create(title='T', message='M')
+        self.today = timezone.now().date()
+
+    def _log(self, account, success, days_ago=0, error=''):
+        created_at = datetime.combine(self.today - timedelta(days=days_ago), datetime.min.time(), tzinfo=dt_timezone.utc)
+        return DeliveryLog.objects.create(
+            campaign=self.campaign,
+            account=account,
+            success=success,
+            error_message=error,
+            created_at=created_at + timedelta(hours=1),
+        )
+
+    def test_rolls_up_incrementally_from_the_watermark(self):
+        self._log(self.x, True)
+        self._log(self.x, False, error='rate limited')
+        self._log(self.facebook, True, days_ago=1)
+
+        self.assertEqual(roll_up_deliveries(chunk_size=2), 3)
+        last = self._log(self.x, False, error='rate limited')
+        self._log(self.x, False, error='token expired')
+
+        self.assertEqual(roll_up_deliveries(), 2)
+        self.assertEqual(roll_up_deliveries(), 0)
+
+        today = DeliveryRollup.objects.get(day=self.today, account=self.x)
+        self.assertEqual((today.platform, today.sent, today.failed), ('x', 1, 3))
+        self.assertEqual(today.top_errors, {'rate limited': 2, 'token expired': 1})
+        yesterday = DeliveryRollup.objects.get(day=self.today - timedelta(days=1), account=self.facebook)
+        self.assertEqual((yesterday.sent, yesterday.failed), (1, 0))
+        self.assertEqual(rollup_watermark(), last.id + 1)
+
+    def test_a_run_that_loses_the_watermark_race_counts_nothing(self):
+        self._log(self.x, True)
+        roll_up_deliveries()
+        self._log(self.x, True)
+
+        # A stale read of the watermark, as if another run advanced it meanwhile.
+        with patch('apps.broadcast.rollups.rollup_watermark', return_value=0):
+            self.assertEqual(roll_up_deliveries(), 0)
+
+        self.assertEqual(DeliveryRollup.objects.get(account=self.x).sent, 1)
+
+    def test_analytics_reads_rates_by_platform_and_day(self):
+        self._log(self.x, True, days_ago=2)
+        self._log(self.x, False, days_ago=2, error='rate limited')
+        self._log(self.facebook, True)
+        self._log(self.facebook, True, days_ago=40)
+        roll_up_deliveries()
+
+        data = delivery_analytics(days=7)
+
+        self.assertEqual(data['totals'], {'total': 3, 'sent': 2, 'failed': 1, 'success_rate': 0.6667})
+        self.assertEqual(data['platforms']['x'], {'total': 2, 'sent': 1, 'failed': 1, 'success_rate': 0.5})
+        self.assertEqual([day['day'] for day in data['daily']], [(self.today - timedelta(days=2)).isoformat(), self.today.isoformat()])
+        self.assertEqual(data['top_errors'], [{'message': 'rate limited', 'count': 1}])
+        self.assertEqual(delivery_analytics(days=7, platform='facebook')['totals']['total'], 1)
+        self.assertEqual(delivery_analytics(days=90)['totals']['total'], 4)
+
+    def test_analytics_endpoint_reads_only_rollups(self):
+        self._log(self.x, True)
+        roll_up_deliveries()
+        DeliveryLog.objects.all().delete()
+
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/analytics/deliveries/?days=9999&platform=x')
+
+        data = response.json()['data']
+        self.assertEqual((data['days'], data['totals']['sent']), (366, 1))
+        self.assertIsNotNone(data['rolled_up_at'])
+
+    @skipUnless(connection.vendor == 'sqlite', 'Plan assertions are written for SQLite')
+    def test_window_lookups_use_an_index(self):
+        window = DeliveryRollup.objects.filter(day__gte=self.today - timedelta(days=90), day__lte=self.today)
+
+        self.assertIn('SEARCH broadcast_deliveryrollup USING INDEX', window.explain())
+        self.assertIn('rollup_platform_day_idx', window.filter(platform='x').explain())
@@ -0,0 +1,95 @@
+import threading
+from datetime import timedelta
+
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from apps.broadcast.models import DeliveryLog, MessageCampaign, SocialAccount
+from apps.broadcast.scheduler import CampaignScheduler
+from apps.broadcast.providers import ProviderResult
+from apps.broadcast.services import MessageDispatcher
+
+
+class CampaignSchedulerTests(TransactionTestCase):
+    # Campaigns are sent on worker threads, which only see committed rows. One worker, because the
+    # shared in-memory test database fails concurrent writers instead of making them wait.
+    def setUp(self):
+        SocialAccount.objects.create(name='Acme', platform='x', handle='acme', access_token='token')
+        self.dispatcher = MessageDispatcher(concurrent=False)
+        self.scheduler = CampaignScheduler(
+            dispatcher=self.dispatcher, worker_id='daemon', poll_interval=0.5, dispatch_workers=1
+        )
+        self.addCleanup(self.scheduler.join)
+
+    def _scheduled(self, send_at) -> MessageCampaign:
+        return MessageCampaign.objects.create(title='Scheduled', message='Hello', status='scheduled', send_at=send_at)
+
+    def test_due_campaign_is_dispatched_and_sleep_targets_next_due(self):
+        due = self._scheduled(timezone.now() - timedelta(seconds=1))
+        later = self._scheduled(timezone.now() + timedelta(seconds=0.2))
+
+        wait = self.scheduler.run_once()
+        self.scheduler.join()
+
+        due.refresh_from_db()
+        later.refresh_from_db()
+        self.assertEqual(due.status, 'sent')
+        self.assertEqual(later.status, 'scheduled')
+        self.assertLessEqual(wait, 0.2)
+        self.assertEqual(self.scheduler.pending, 1)
+
+    def test_poll_picks_up_new_and_rescheduled_campaigns(self):
+        campaign = self._scheduled(timezone.now() + timedelta(hours=1))
+        self.scheduler.run_once()
+        self.assertEqual(self.scheduler.pending, 1)
+
+        campaign.send_at = timezone.now() - timedelta(seconds=1)
+        campaign.save()
+        newcomer = self._scheduled(timezone.now() - timedelta(seconds=1))
+        self.scheduler.poll()
+        dispatched = 0
+        while self.scheduler.pending:
+            dispatched += self.scheduler.dispatch_due()
+            self.scheduler.join()
+
+        self.assertEqual(dispatched, 2)
+        self.assertEqual(DeliveryLog.objects.filter(campaign__in=[campaign, newcomer]).count(), 2)
+        self.assertEqual(self.scheduler.pending, 0)
+
+    def test_campaign_claimed_elsewhere_is_not_sent_twice(self):
+        campaign = self._scheduled(timezone.now() - timedelta(seconds=1))
+        self.scheduler.poll()
+        MessageCampaign.objects.filter(pk=campaign.pk).update(status='sent')
+
+        self.assertEqual(self.scheduler.dispatch_due(), 0)
+        self.assertFalse(DeliveryLog.objects.filter(campaign=campaign).exists())
+
+    def test_slow_dispatch_does_not_hold_up_the_loop(self):
+        release = threading.Event()
+
+        def send(message, account, image_url=''):
+            release.wait(5)
+            return ProviderResult(True, 'x-1', {}, '').as_tuple()
+
+        self.dispatcher._send_to_provider = send
+        scheduler = CampaignScheduler(dispatcher=self.dispatcher, worker_id='daemon', dispatch_workers=1)
+        self.addCleanup(scheduler.join)
+        self.addCleanup(release.set)
+        first = self._scheduled(timezone.now() - timedelta(seconds=2))
+        second = self._scheduled(timezone.now() - timedelta(seconds=1))
+
+        scheduler.run_once()
+
+        # The loop returned while the first campaign is still being sent; the second waits for the worker.
+        self.assertEqual(MessageCampaign.objects.get(pk=first.pk).status, 'sending')
+        self.assertEqual(MessageCampaign.objects.get(pk=second.pk).status, 'scheduled')
+        self.assertEqual(scheduler.idle_workers, 0)
+
+        release.set()
+        scheduler.join()
+        scheduler.dispatch_due()
+        scheduler.join()
+
+        self.assertEqual(
+            set(MessageCampaign.objects.filter(pk__in=[first.pk, second.pk]).values_list('status', flat=True)), {'sent'}
+        )
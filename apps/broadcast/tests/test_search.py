@@ -0,0 +1,90 @@
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from apps.broadcast.models import DeliveryLog, MessageCampaign, SocialAccount
+from apps.broadcast.search import (
+    ACCOUNT_FTS_TABLE,
+    CAMPAIGN_FTS_TABLE,
+    build_match_query,
+    fts_available,
+    ranked_ids,
+)
+
+
+class MatchQueryTests(TestCase):
+    def test_words_become_quoted_prefix_terms(self):
+        self.assertEqual(build_match_query('solar  "grants" OR'), '"solar"* "grants"* "OR"*')
+        self.assertEqual(build_match_query('  -- '), '')
+
+
+@skipUnless(connection.vendor == 'sqlite', 'FTS5 search is SQLite-only')
+class FullTextSearchTests(TestCase):
+    def setUp(self):
+        if not fts_available(ACCOUNT_FTS_TABLE):
+            self.skipTest('SQLite build without FTS5')
+
+    def test_index_follows_inserts_updates_deletes_and_bulk_creates(self):
+        account = SocialAccount.objects.create(name='Sunrise Realty', platform='x', handle='sunrise', access_token='t')
+        SocialAccount.objects.bulk_create([
+            SocialAccount(name='Harbor Homes', platform='x', handle='harborhq', access_token='t'),
+        ])
+        self.assertEqual(ranked_ids(ACCOUNT_FTS_TABLE, 'sunr'), [account.id])
+        self.assertEqual(len(ranked_ids(ACCOUNT_FTS_TABLE, 'harb')), 1)
+
+        SocialAccount.objects.filter(pk=account.pk).update(name='Moonlight Realty')
+        self.assertEqual(ranked_ids(ACCOUNT_FTS_TABLE, 'moon'), [account.id])
+        self.assertEqual(ranked_ids(ACCOUNT_FTS_TABLE, 'sunrise realty'), [account.id])  # handle still matches
+
+        account.delete()
+        self.assertEqual(ranked_ids(ACCOUNT_FTS_TABLE, 'moon'), [])
+
+    def test_campaigns_are_ranked_by_relevance(self):
+        weak = MessageCampaign.objects.create(title='Weekly roundup', message='Some solar news among many other topics.')
+        strong = MessageCampaign.objects.create(title='Solar grants', message='Solar grants for solar installers.')
+
+        self.assertEqual(ranked_ids(CAMPAIGN_FTS_TABLE, 'solar'), [strong.id, weak.id])
+
+    def test_wizard_search_matches_name_and_handle_prefixes(self):
+        SocialAccount.objects.create(name='Acme Realty', platform='x', handle='acme_tx', access_token='t')
+        SocialAccount.objects.create(name='Bolt Energy', platform='x', handle='boltpower', access_token='t')
+
+        by_name = self.client.get('/api/wizard/accounts/?q=rea').json()['data']['accounts']
+        by_handle = self.client.get('/api/wizard/accounts/?q=boltp').json()['data']['accounts']
+
+        self.assertEqual(list(by_name), ['Acme Realty'])
+        self.assertEqual(list(by_handle), ['Bolt Energy'])
+
+    def test_admin_search_uses_ranked_index(self):
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin_user)
+        weak = MessageCampaign.objects.create(title='Weekly roundup', message='Solar and more.')
+        strong = MessageCampaign.objects.create(title='Solar grants', message='Solar grants for solar installers.')
+        account = SocialAccount.objects.create(name='Acme', platform='x', handle='acme', access_token='t')
+        DeliveryLog.objects.create(campaign=strong, account=account, success=True)
+
+        response = self.client.get('/admin/broadcast/messagecampaign/?q=sol')
+        delivery_response = self.client.get('/admin/broadcast/deliverylog/?q=grants')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item.pk for item in response.context['cl'].result_list], [strong.pk, weak.pk])
+        self.assertEqual(delivery_response.status_code, 200)
+        self.assertEqual(len(delivery_response.context['cl'].result_list), 1)
+
+    @override_settings(ADMIN_SEARCH_LIMIT=2)
+    def test_admin_search_warns_when_matches_are_truncated(self):
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin_user)
+        for index in range(3):
+            MessageCampaign.objects.create(title=f'Solar update {index}', message='Solar news.')
+
+        truncated = self.client.get('/admin/broadcast/messagecampaign/?q=solar')
+        complete = self.client.get('/admin/broadcast/messagecampaign/?q=update 1')
+
+        self.assertEqual(len(truncated.context['cl'].result_list), 2)
+        self.assertEqual(truncated.context['cl'].result_count, 2)
+        self.assertIn('only the 2 best matches are shown', [str(m) for m in truncated.context['messages']][0])
+        self.assertEqual(len(complete.context['cl'].result_list), 1)
+        self.assertEqual(list(complete.context['messages']), [])
@@ -0,0 +1,270 @@
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.broadcast.models import DeliveryLog, MessageCampaign, SocialAccount
+from apps.broadcast.services import Heartbeat, LeaseLost, MessageDispatcher, claim_campaign, claim_next_due_campaign
+
+
+class DispatcherFixtureMixin:
+    def setUp(self):
+        for index in range(6):
+            SocialAccount.objects.create(
+                name=f'Acme {index}',
+                platform='x' if index % 2 else 'facebook',
+                handle=f'acme{index}',
+                access_token='token',
+            )
+
+    def _dispatcher(self, **kwargs) -> MessageDispatcher:
+        return MessageDispatcher(**kwargs)
+
+    def _delivery_rows(self, campaign):
+        return sorted(
+            DeliveryLog.objects.filter(campaign=campaign).values_list(
+                'account_id', 'success', 'provider_message_id', 'response_payload', 'error_message'
+            )
+        )
+
+
+class MessageDispatcherTests(DispatcherFixtureMixin, TestCase):
+    def test_concurrent_dispatch_matches_serial_results(self):
+        serial_campaign = MessageCampaign.objects.create(title='Serial', message='Hello')
+        concurrent_campaign = MessageCampaign.objects.create(title='Concurrent', message='Hello')
+
+        serial_stats = self._dispatcher(concurrent=False).dispatch_campaign(serial_campaign)
+        concurrent_stats = self._dispatcher(concurrent=True).dispatch_campaign(concurrent_campaign)
+
+        self.assertEqual(serial_stats, concurrent_stats)
+        self.assertEqual(concurrent_stats, {'total': 6, 'sent': 6, 'failed': 0})
+        self.assertEqual(self._delivery_rows(serial_campaign), self._delivery_rows(concurrent_campaign))
+        self.assertEqual(concurrent_campaign.status, 'sent')
+
+    def test_concurrent_dispatch_respects_platform_limit(self):
+        campaign = MessageCampaign.objects.create(title='Limited', message='Hello')
+        dispatcher = self._dispatcher(concurrent=True, platform_concurrency={'x': 1, 'facebook': 3})
+        lock = threading.Lock()
+        in_flight = {'x': 0, 'facebook': 0}
+        peak = {'x': 0, 'facebook': 0}
+
+        def fake_send(message, account, image_url=''):
+            with lock:
+                in_flight[account.platform] += 1
+                peak[account.platform] = max(peak[account.platform], in_flight[account.platform])
+            time.sleep(0.02)
+            with lock:
+                in_flight[account.platform] -= 1
+            return account.platform != 'x', f'id-{account.id}', {}, '' if account.platform != 'x' else 'rejected'
+
+        dispatcher._send_to_provider = fake_send
+        stats = dispatcher.dispatch_campaign(campaign)
+
+        self.assertEqual(peak['x'], 1)
+        self.assertLessEqual(peak['facebook'], 3)
+        self.assertEqual(stats, {'total': 6, 'sent': 3, 'failed': 3})
+        self.assertEqual(campaign.status, 'failed')
+
+    def test_delivery_logs_are_written_in_batches(self):
+        campaign = MessageCampaign.objects.create(title='Batched', message='Hello')
+        dispatcher = self._dispatcher(concurrent=False, log_batch_size=4)
+
+        with CaptureQueriesContext(connection) as queries:
+            stats = dispatcher.dispatch_campaign(campaign)
+
+        inserts = [query['sql'] for query in queries if query['sql'].startswith('INSERT INTO "broadcast_deliverylog"')]
+        self.assertEqual(len(inserts), 2)
+        self.assertEqual(stats['sent'], 6)
+        self.assertEqual(DeliveryLog.objects.filter(campaign=campaign).count(), 6)
+
+    def test_provider_error_keeps_sent_deliveries_and_fails_campaign(self):
+        campaign = MessageCampaign.objects.create(title='Broken', message='Hello')
+        dispatcher = self._dispatcher(concurrent=False)
+        original_send = dispatcher._send_to_provider
+        calls = []
+
+        def flaky_send(message, account, image_url=''):
+            calls.append(account.id)
+            if len(calls) == 3:
+                raise RuntimeError('provider exploded')
+            return original_send(message, account, image_url=image_url)
+
+        dispatcher._send_to_provider = flaky_send
+        with self.assertRaises(RuntimeError):
+            dispatcher.dispatch_campaign(campaign)
+
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.status, 'failed')
+        self.assertEqual(DeliveryLog.objects.filter(campaign=campaign).count(), 2)
+
+
+class MessageDispatcherTransactionTests(DispatcherFixtureMixin, TransactionTestCase):
+    def test_provider_calls_run_outside_transactions(self):
+        campaign = MessageCampaign.objects.create(title='No lock', message='Hello')
+        dispatcher = self._dispatcher(concurrent=False)
+        original_send = dispatcher._send_to_provider
+        in_atomic = []
+
+        def tracking_send(message, account, image_url=''):
+            in_atomic.append(connection.in_atomic_block)
+            return original_send(message, account, image_url=image_url)
+
+        dispatcher._send_to_provider = tracking_send
+        dispatcher.dispatch_campaign(campaign)
+
+        self.assertEqual(in_atomic, [False] * 6)
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.status, 'sent')
+
+    @override_settings(DISPATCH_LEASE_SECONDS=0.03)
+    def test_sends_in_flight_when_the_lease_is_lost_are_logged(self):
+        scheduled = MessageCampaign.objects.create(title='T', message='Hello', status='scheduled', send_at=timezone.now())
+        campaign = claim_campaign(scheduled.id, 'worker-a')
+        dispatcher = self._dispatcher(concurrent=True, platform_concurrency={'x': 1, 'facebook': 1})
+        sent, lock = [], threading.Lock()
+
+        def slow_send(message, account, image_url=''):
+            with lock:
+                sent.append(account.id)
+            time.sleep(0.05)
+            return True, f'ok-{account.id}', {}, ''
+
+        dispatcher._send_to_provider = slow_send
+        with patch('apps.broadcast.services.renew_lease', return_value=False):
+            with self.assertRaises(LeaseLost):
+                dispatcher.dispatch_campaign(campaign, exclude_delivered=True)
+
+        # Sends not started yet are cancelled; every provider call that happened has a log,
+        # so the next owner's `exclude_delivered` run does not post to those accounts again.
+        self.assertLess(len(sent), 6)
+        self.assertEqual(sorted(DeliveryLog.objects.filter(campaign=campaign).values_list('account_id', flat=True)), sorted(sent))
+
+
+class CampaignClaimTests(DispatcherFixtureMixin, TestCase):
+    def _scheduled(self, **kwargs) -> MessageCampaign:
+        defaults = {'title': 'Scheduled', 'message': 'Hello', 'status': 'scheduled', 'send_at': timezone.now()}
+        defaults.update(kwargs)
+        return MessageCampaign.objects.create(**defaults)
+
+    def test_only_one_worker_claims_a_campaign(self):
+        campaign = self._scheduled()
+
+        first = claim_campaign(campaign.id, 'worker-a')
+        second = claim_campaign(campaign.id, 'worker-b')
+
+        self.assertIsNotNone(first)
+        self.assertIsNone(second)
+        self.assertEqual(first.status, 'sending')
+        self.assertEqual(first.lease_owner, 'worker-a')
+
+    def test_future_campaigns_are_not_claimed(self):
+        self._scheduled(send_at=timezone.now() + timedelta(hours=1))
+
+        self.assertIsNone(claim_next_due_campaign('worker-a'))
+
+    def test_stale_lease_is_reclaimed(self):
+        stale = self._scheduled(
+            status='sending',
+            lease_owner='crashed',
+            lease_expires_at=timezone.now() - timedelta(seconds=1),
+        )
+        self._scheduled(
+            status='sending',
+            lease_owner='alive',
+            lease_expires_at=timezone.now() + timedelta(minutes=5),
+        )
+
+        claimed = claim_next_due_campaign('worker-a')
+
+        self.assertEqual(claimed.id, stale.id)
+        self.assertEqual(claimed.lease_owner, 'worker-a')
+        self.assertIsNone(claim_next_due_campaign('worker-b'))
+
+    def test_resumed_dispatch_skips_delivered_accounts_and_releases_lease(self):
+        campaign = self._scheduled()
+        delivered = SocialAccount.objects.first()
+        DeliveryLog.objects.create(campaign=campaign, account=delivered, success=True, provider_message_id='done')
+        claimed = claim_campaign(campaign.id, 'worker-a')
+
+        stats = self._dispatcher().dispatch_campaign(claimed, exclude_delivered=True)
+
+        claimed.refresh_from_db()
+        self.assertEqual(stats, {'total': 5, 'sent': 5, 'failed': 0})
+        self.assertEqual(DeliveryLog.objects.filter(campaign=campaign, account=delivered).count(), 1)
+        self.assertEqual(claimed.status, 'sent')
+        self.assertEqual(claimed.lease_owner, '')
+        self.assertIsNone(claimed.lease_expires_at)
+
+    def test_command_dispatches_each_due_campaign_once(self):
+        campaign = self._scheduled()
+
+        call_command('dispatch_scheduled_messages', '--worker-id', 'worker-a', stdout=StringIO())
+        output = StringIO()
+        call_command('dispatch_scheduled_messages', '--worker-id', 'worker-b', stdout=output)
+
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.status, 'sent')
+        self.assertEqual(DeliveryLog.objects.filter(campaign=campaign).count(), 6)
+        self.assertIn('No scheduled campaigns were ready to send.', output.getvalue())
+
+    @override_settings(DISPATCH_LEASE_SECONDS=0.03)
+    def test_dispatch_stops_when_the_lease_is_taken_over(self):
+        campaign = claim_campaign(self._scheduled().id, 'worker-a')
+        dispatcher = self._dispatcher(concurrent=False)
+        sent = []
+
+        def slow_send(message, account, image_url=''):
+            sent.append(account.id)
+            time.sleep(0.05)  # longer than the heartbeat interval
+            return True, f'ok-{account.id}', {}, ''
+
+        dispatcher._send_to_provider = slow_send
+        with patch('apps.broadcast.services.renew_lease', return_value=False):
+            with self.assertRaises(LeaseLost):
+                dispatcher.dispatch_campaign(campaign, exclude_delivered=True)
+
+        self.assertLess(len(sent), 6)
+        # What was sent before stopping is recorded, and the status is left to the new owner.
+        self.assertEqual(DeliveryLog.objects.filter(campaign=campaign).count(), len(sent))
+        self.assertEqual(MessageCampaign.objects.get(pk=campaign.pk).status, 'sending')
+
+    def test_finishing_keeps_a_lease_taken_over_by_another_worker(self):
+        campaign = claim_campaign(self._scheduled().id, 'worker-a')
+        MessageCampaign.objects.filter(pk=campaign.pk).update(lease_owner='worker-b')
+
+        self.assertFalse(self._dispatcher()._set_status(campaign, 'sent'))
+
+        campaign.refresh_from_db()
+        self.assertEqual((campaign.status, campaign.lease_owner), ('sending', 'worker-b'))
+
+
+class HeartbeatTests(TestCase):
+    def test_heartbeat_renews_until_the_lease_is_lost(self):
+        results = iter([True, True, False])
+        calls = []
+
+        def renew():
+            calls.append(1)
+            return next(results)
+
+        heartbeat = Heartbeat(renew, interval=0.01).start()
+        deadline = time.monotonic() + 2
+        while not heartbeat.lost and time.monotonic() < deadline:
+            time.sleep(0.01)
+        heartbeat.stop()
+
+        self.assertTrue(heartbeat.lost)
+        self.assertEqual(len(calls), 3)
+
+    def test_unstarted_heartbeat_is_never_lost(self):
+        heartbeat = Heartbeat(lambda: False, interval=0.01)
+        heartbeat.stop()
+
+        self.assertFalse(heartbeat.lost)
@@ -0,0 +1,190 @@
+import json
+from unittest.mock import patch
+
+import httpx
+from asgiref.sync import async_to_sync
+from django.test import TestCase, override_settings
+
+from apps.broadcast.ai_cache import AIResponseStore
+from apps.broadcast.ai_services import NewsArticle, OpenAIContentStudio
+from apps.broadcast.models import AuditLog, MessageCampaign
+from apps.broadcast.streaming import JSONFieldStream, LatencyStats, sse_event
+
+
+def _parse_events(body: bytes) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.decode().strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+class JSONFieldStreamTests(TestCase):
+    def test_streams_watched_fields_across_chunk_boundaries(self):
+        raw = json.dumps({'title': 'Solar "grants" ☀', 'message': 'Line one\nLine two \U0001F600', 'image_prompt': 'sun'})
+        stream = JSONFieldStream()
+
+        deltas = []
+        for index in range(0, len(raw), 3):
+            deltas.extend(stream.feed(raw[index:index + 3]))
+
+        self.assertEqual(stream.values, {'title': 'Solar "grants" ☀', 'message': 'Line one\nLine two \U0001F600'})
+        self.assertEqual(''.join(text for field, text in deltas if field == 'title'), 'Solar "grants" ☀')
+        self.assertNotIn('image_prompt', {field for field, _ in deltas})
+        self.assertEqual(stream.text, raw)
+
+    def test_ignores_nested_keys_with_the_same_name(self):
+        stream = JSONFieldStream()
+
+        deltas = stream.feed('{"meta": {"title": "nested", "tags": ["title"]}, "title": "Top"}')
+
+        self.assertEqual(deltas, [('title', 'Top')])
+
+    def test_merges_consecutive_characters_into_one_delta(self):
+        self.assertEqual(JSONFieldStream().feed('{"message": "Hello'), [('message', 'Hello')])
+
+
+class LatencyStatsTests(TestCase):
+    def test_reports_percentiles_in_milliseconds(self):
+        stats = LatencyStats(window=10)
+        self.assertEqual(stats.stats(), {'count': 0, 'last_ms': None, 'p50_ms': None, 'p95_ms': None})
+
+        for seconds in (0.4, 0.1, 0.3, 0.2):
+            stats.record(seconds)
+
+        self.assertEqual(stats.stats(), {'count': 4, 'last_ms': 200.0, 'p50_ms': 200.0, 'p95_ms': 400.0})
+
+    def test_sse_event_format(self):
+        self.assertEqual(sse_event('delta', {'text': 'a b'}), b'event: delta\ndata: {"text":"a b"}\n\n')
+
+
+def _openai_stream(*contents: str) -> bytes:
+    lines = [f'data: {json.dumps({"choices": [{"delta": {"content": content}}]})}\n\n' for content in contents]
+    return (''.join(lines) + 'data: [DONE]\n\n').encode()
+
+
+@override_settings(OPENAI_API_KEY='test-key')
+class AStreamComposeTests(TestCase):
+    def _collect(self, studio):
+        async def run():
+            return [chunk async for chunk in studio.astream_compose('solar', 'Texas', 'We install panels.', [])]
+
+        return async_to_sync(run)()
+
+    def test_yields_content_deltas_and_caches_the_joined_copy(self):
+        requests_seen = []
+
+        def handler(request):
+            requests_seen.append(json.loads(request.content))
+            return httpx.Response(200, content=_openai_stream('{"title": "So', 'lar"}'))
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        studio = OpenAIContentStudio(cache=AIResponseStore(), async_client=client)
+
+        self.assertEqual(self._collect(studio), ['{"title": "So', 'lar"}'])
+        self.assertTrue(requests_seen[0]['stream'])
+
+        # The joined copy is cached under the non-streaming request, so both paths share it.
+        self.assertEqual(self._collect(studio), ['{"title": "Solar"}'])
+        self.assertEqual(len(requests_seen), 1)
+        self.assertEqual(studio.parse_copy('{"title": "Solar"}')['title'], 'Solar')
+
+    def test_incomplete_or_invalid_copy_is_not_cached(self):
+        done = b'data: [DONE]\n\n'
+        length = json.dumps({'choices': [{'delta': {'content': '"}'}, 'finish_reason': 'length'}]})
+        bodies = {
+            'cut off before [DONE]': _openai_stream('{"title": "Solar"}')[: -len(done)],
+            'truncated by max tokens': _openai_stream('{"title": "So')[: -len(done)] + f'data: {length}\n\n'.encode() + done,
+            'not JSON': _openai_stream('Sorry, I cannot help with that.'),
+        }
+        for label, body in bodies.items():
+            with self.subTest(label):
+                requests_seen = []
+
+                def handler(request):
+                    requests_seen.append(request)
+                    return httpx.Response(200, content=body)
+
+                client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+                studio = OpenAIContentStudio(cache=AIResponseStore(), async_client=client)
+
+                self._collect(studio)
+                self._collect(studio)
+
+                self.assertEqual(len(requests_seen), 2)
+
+    def test_http_errors_propagate(self):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(500)))
+
+        with self.assertRaises(httpx.HTTPStatusError):
+            self._collect(OpenAIContentStudio(cache=None, async_client=client))
+
+
+class FakeScanner:
+    async def afetch(self, keywords, area='', limit=5):
+        return [NewsArticle('Solar grants open', 'https://example.com/solar', 'Wire', '')]
+
+
+class FakeStreamingStudio:
+    parse_copy = staticmethod(OpenAIContentStudio.parse_copy)
+
+    def __init__(self, chunks=None, error=None):
+        self.chunks = chunks or []
+        self.error = error
+
+    async def astream_compose(self, keywords, area, business_perspective, articles, use_cache=True):
+        for chunk in self.chunks:
+            yield chunk
+        if self.error:
+            raise self.error
+
+
+class AIComposeStreamViewTests(TestCase):
+    url = '/api/campaigns/ai-compose/stream/'
+
+    async def _stream(self, studio, payload=None):
+        with patch('apps.broadcast.views.NewsScanner', return_value=FakeScanner()), \
+                patch('apps.broadcast.views.OpenAIContentStudio', return_value=studio):
+            response = await self.async_client.post(
+                self.url,
+                data=json.dumps(payload or {'keywords': 'solar', 'area': 'Texas'}),
+                content_type='application/json',
+            )
+            body = b''.join([chunk async for chunk in response.streaming_content])
+        return response, _parse_events(body)
+
+    async def test_streams_tokens_then_saves_the_campaign(self):
+        studio = FakeStreamingStudio(['{"title": "Sun', 'ny deals", "mess', 'age": "Grants are open."', ', "image_prompt": ""}'])
+
+        response, events = await self._stream(studio)
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        names = [name for name, _ in events]
+        self.assertEqual(names[:2], ['articles', 'metrics'])
+        self.assertEqual(names[-1], 'done')
+        self.assertGreaterEqual(events[1][1]['ttft_ms'], 0)
+        deltas = [data for name, data in events if name == 'delta']
+        self.assertEqual(''.join(d['text'] for d in deltas if d['field'] == 'title'), 'Sunny deals')
+        self.assertEqual(''.join(d['text'] for d in deltas if d['field'] == 'message'), 'Grants are open.')
+
+        done = events[-1][1]
+        campaign = await MessageCampaign.objects.aget()
+        self.assertEqual(done['campaign_id'], campaign.id)
+        self.assertEqual((campaign.title, campaign.message, campaign.source_type), ('Sunny deals', 'Grants are open.', 'ai_news'))
+        self.assertEqual(campaign.metadata['articles'][0]['link'], 'https://example.com/solar')
+        self.assertTrue(await AuditLog.objects.filter(action='campaign.ai_compose', entity_id=campaign.id).aexists())
+
+    async def test_provider_failure_ends_with_an_error_event(self):
+        studio = FakeStreamingStudio(['{"title": "Half'], error=httpx.ConnectError('down'))
+
+        _, events = await self._stream(studio)
+
+        self.assertEqual(events[-1], ('error', {'message': 'AI/news provider temporarily unavailable'}))
+        self.assertFalse(await MessageCampaign.objects.aexists())
+
+    async def test_invalid_payload_is_rejected_before_streaming(self):
+        response = await self.async_client.post(self.url, data='{}', content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content)['message'], 'keywords is required')
@@ -7,6 +7,13 @@ urlpatterns = [
     path('wizard/accounts/', views.wizard_accounts, name='wizard_accounts'),
     path('campaigns/', views.create_campaign, name='create_campaign'),
     path('campaigns/<int:campaign_id>/send/', views.send_campaign, name='send_campaign'),
+    path('campaigns/<int:campaign_id>/stats/', views.campaign_stats_view, name='campaign_stats'),
+    path('campaigns/<int:campaign_id>/retry/', views.retry_failed_deliveries, name='retry_failed_deliveries'),
+    path('campaigns/<int:campaign_id>/image/', views.campaign_image_status, name='campaign_image_status'),
     path('campaigns/compose-send/', views.compose_and_send_campaign, name='compose_and_send_campaign'),
     path('campaigns/ai-compose/', views.ai_compose_campaign, name='ai_compose_campaign'),
+    path('campaigns/ai-compose/stream/', views.ai_compose_stream, name='ai_compose_stream'),
+    path('campaigns/ai-compose/bulk/', views.ai_compose_bulk, name='ai_compose_bulk'),
+    path('analytics/deliveries/', views.delivery_analytics_view, name='delivery_analytics'),
+    path('dispatch-jobs/<int:job_id>/', views.dispatch_job_status, name='dispatch_job_status'),
 ]
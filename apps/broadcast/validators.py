@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from typing import Any
 
+from .constants import MAX_NEWS_VARIANTS
 from .models import MessageCampaign
 
 
@@ -26,6 +27,15 @@ def _coerce_list(payload: dict[str, Any], key: str, *, required: bool = False) -
     return values
 
 
+def _coerce_variants(payload: dict[str, Any], key: str, *, max_items: int, max_length: int) -> list[str]:
+    values = _coerce_list(payload, key)
+    if len(values) > max_items:
+        raise ValidationError(f'{key} accepts at most {max_items} values')
+    if any(len(value) > max_length for value in values):
+        raise ValidationError(f'{key} values must be <= {max_length} characters')
+    return values
+
+
 def validate_create_campaign_payload(payload: dict[str, Any]) -> dict[str, Any]:
     return {
         'title': _coerce_text(payload, 'title', required=True, max_length=200),
@@ -51,10 +61,13 @@ def validate_ai_compose_payload(payload: dict[str, Any]) -> dict[str, Any]:
     return {
         'keywords': _coerce_text(payload, 'keywords', required=True, max_length=120),
         'area': _coerce_text(payload, 'area', max_length=120),
+        'keyword_variants': _coerce_variants(payload, 'keyword_variants', max_items=MAX_NEWS_VARIANTS, max_length=120),
+        'areas': _coerce_variants(payload, 'areas', max_items=MAX_NEWS_VARIANTS, max_length=120),
         'business_perspective': _coerce_text(payload, 'business_perspective', max_length=250),
         'task_mode': task_mode,
         'send_at': payload.get('send_at'),
         'account_names': _coerce_list(payload, 'account_names'),
         'platforms': _coerce_list(payload, 'platforms'),
         'autopost': bool(payload.get('autopost', False)),
+        'bypass_cache': bool(payload.get('bypass_cache', False)),
     }
@@ -1,31 +1,73 @@
 import logging
 
-import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.db import DatabaseError
-from django.http import HttpRequest, JsonResponse
+from django.http import HttpRequest, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.urls import reverse
 from django.views.decorators.csrf import csrf_protect, ensure_csrf_cookie
 from django.views.decorators.http import require_GET, require_POST
 
 from .api_utils import api_response, db_error_response, json_body, log_audit
-from .constants import MAX_PAGE_SIZE, DEFAULT_PAGE_SIZE
-from .models import MessageCampaign, SocialAccount
+from .audit import get_audit_sink
+from .constants import (
+    DEFAULT_ANALYTICS_DAYS,
+    DEFAULT_PAGE_SIZE,
+    MAX_ANALYTICS_DAYS,
+    MAX_BULK_COMPOSE_ITEMS,
+    MAX_PAGE_SIZE,
+)
+from .delivery_stats import campaign_stats
+from .jobs import enqueue_dispatch, job_summary
+from .models import DispatchJob, MessageCampaign, SocialAccount
+from .pagination import InvalidCursor, after, decode_cursor, encode_cursor
+from .retries import retry_summary, schedule_retries
+from .rollups import delivery_analytics
+from .search import ACCOUNT_FTS_TABLE, fts_available, matching_ids
 from .security import escape_html, safe_int
-from .services import MessageDispatcher
+from .composer import (
+    NO_ACCOUNT_MATCH,
+    PROVIDER_ERRORS,
+    PROVIDER_UNAVAILABLE,
+    aautopost_accounts,
+    agenerate_campaign,
+    apublish_generated,
+    bulk_compose,
+    campaign_summary,
+    stream_campaign,
+)
+from .streaming import sse_event, time_to_first_token
 from .validators import (
     ValidationError,
     validate_ai_compose_payload,
     validate_compose_send_payload,
     validate_create_campaign_payload,
 )
-from .ai_services import NewsScanner, OpenAIContentStudio
+from .ai_services import NewsScanner, OpenAIContentStudio, news_cache
 
 logger = logging.getLogger(__name__)
 
+ACCOUNT_CURSOR_FIELDS = ['name', 'platform', 'id']
+ACCOUNT_CURSOR_TYPES = (str, str, int)
+
+
+def _account_key(row: dict) -> list:
+    return [row[field] for field in ACCOUNT_CURSOR_FIELDS]
+
 
 @require_GET
 def health(_: HttpRequest) -> JsonResponse:
-    return api_response(ok=True, message='Social Manager API healthy', data={'service': 'Social Manager API'})
+    return api_response(
+        ok=True,
+        message='Social Manager API healthy',
+        data={
+            'service': 'Social Manager API',
+            'audit': get_audit_sink().metrics(),
+            'news_cache': news_cache.stats(),
+            'compose_stream': {'time_to_first_token': time_to_first_token.stats()},
+        },
+    )
 
 
 @ensure_csrf_cookie
@@ -36,32 +78,65 @@ def campaign_wizard(request: HttpRequest):
 
 @require_GET
 def wizard_accounts(request: HttpRequest) -> JsonResponse:
-    page = safe_int(request.GET.get('page'), default=1, minimum=1)
+    """Active accounts grouped by name, paged with an opaque keyset cursor.
+
+    Pages are ordered by (name, platform, id) and never split a name group, so a
+    business always appears with all of its platforms on a single page.
+    """
     page_size = safe_int(request.GET.get('page_size'), default=DEFAULT_PAGE_SIZE, minimum=1, maximum=MAX_PAGE_SIZE)
     search = (request.GET.get('q') or '').strip()
+    include_total = (request.GET.get('include_total') or '').lower() in {'1', 'true', 'yes'}
+
+    try:
+        cursor = decode_cursor(request.GET['cursor'], ACCOUNT_CURSOR_TYPES) if request.GET.get('cursor') else None
+    except InvalidCursor as exc:
+        return api_response(ok=False, message=str(exc), status_code=400)
 
     try:
         queryset = SocialAccount.objects.filter(is_active=True)
         if search:
-            queryset = queryset.filter(name__icontains=search)
-
-        total = queryset.count()
-        offset = (page - 1) * page_size
-        accounts = queryset.values('name', 'platform', 'handle')[offset : offset + page_size]
+            if fts_available(ACCOUNT_FTS_TABLE):
+                queryset = queryset.filter(id__in=matching_ids(ACCOUNT_FTS_TABLE, search) or [])
+            else:
+                queryset = queryset.filter(name__icontains=search)
+
+        page = queryset.order_by(*ACCOUNT_CURSOR_FIELDS)
+        if cursor is not None:
+            page = page.filter(after(ACCOUNT_CURSOR_FIELDS, cursor))
+        rows = list(page.values('id', 'name', 'platform', 'handle')[: page_size + 1])
+
+        has_next = len(rows) > page_size
+        splits_group = has_next and rows[page_size]['name'] == rows[page_size - 1]['name']
+        rows = rows[:page_size]
+        if splits_group:
+            # The page boundary falls inside a name group: pull in the rest of that group.
+            last = rows[-1]
+            rows.extend(
+                queryset.filter(name=last['name'])
+                .filter(after(ACCOUNT_CURSOR_FIELDS, _account_key(last)))
+                .order_by(*ACCOUNT_CURSOR_FIELDS)
+                .values('id', 'name', 'platform', 'handle')
+            )
+            last = rows[-1]
+            has_next = queryset.filter(after(ACCOUNT_CURSOR_FIELDS, _account_key(last))).exists()
 
         grouped: dict[str, list[dict[str, str]]] = {}
-        for account in accounts:
+        for account in rows:
             grouped.setdefault(account['name'], []).append(
                 {'platform': account['platform'], 'handle': escape_html(account['handle'])}
             )
 
+        next_cursor = None
+        if has_next and rows:
+            next_cursor = encode_cursor(_account_key(rows[-1]))
+
         data = {
             'accounts': grouped,
             'pagination': {
-                'page': page,
                 'page_size': page_size,
-                'total': total,
-                'has_next': offset + page_size < total,
+                'next_cursor': next_cursor,
+                'has_next': has_next,
+                'total': queryset.count() if include_total else None,
             },
         }
         return api_response(ok=True, message='Accounts loaded', data=data)
@@ -104,81 +179,101 @@ def create_campaign(request: HttpRequest) -> JsonResponse:
 
 @csrf_protect
 @require_POST
-def send_campaign(request: HttpRequest, campaign_id: int) -> JsonResponse:
+async def send_campaign(request: HttpRequest, campaign_id: int) -> JsonResponse:
     try:
-        campaign = MessageCampaign.objects.filter(id=campaign_id).first()
+        campaign = await MessageCampaign.objects.filter(id=campaign_id).afirst()
         if campaign is None:
             return api_response(ok=False, message='Campaign not found', status_code=404)
 
-        dispatcher = MessageDispatcher()
-        stats = dispatcher.dispatch_campaign(campaign)
-        log_audit(
+        job = await sync_to_async(enqueue_dispatch)(campaign)
+        await sync_to_async(log_audit)(
             request=request,
             action='campaign.send',
             entity='MessageCampaign',
             entity_id=campaign.id,
-            changes={'status': campaign.status, 'stats': stats},
+            changes={'status': campaign.status, 'job_id': job.id},
         )
     except DatabaseError as exc:
         return db_error_response(request, action='send_campaign', exc=exc)
 
     return api_response(
         ok=True,
-        message='Campaign dispatched',
-        data={'campaign_id': campaign.id, 'status': campaign.status, 'stats': stats},
+        message='Campaign queued for dispatch',
+        data=_queued_response(campaign, job),
+        status_code=202,
     )
 
 
 @csrf_protect
 @require_POST
-def compose_and_send_campaign(request: HttpRequest) -> JsonResponse:
+async def compose_and_send_campaign(request: HttpRequest) -> JsonResponse:
     try:
         payload = validate_compose_send_payload(json_body(request))
     except ValidationError as exc:
         return api_response(ok=False, message=str(exc), status_code=400)
 
     try:
-        accounts = SocialAccount.objects.filter(
-            is_active=True,
-            name__in=payload['account_names'],
-            platform__in=payload['platforms'],
-        )
-        if not accounts.exists():
-            return api_response(ok=False, message='No active account match for your selection', status_code=400)
+        accounts = [
+            account
+            async for account in SocialAccount.objects.filter(
+                is_active=True,
+                name__in=payload['account_names'],
+                platform__in=payload['platforms'],
+            )
+        ]
+        if not accounts:
+            return api_response(ok=False, message=NO_ACCOUNT_MATCH, status_code=400)
 
-        campaign = MessageCampaign.objects.create(
+        campaign = await MessageCampaign.objects.acreate(
             title=payload['title'],
             message=payload['message'],
             status='draft',
         )
-        dispatcher = MessageDispatcher()
-        stats = dispatcher.dispatch_campaign(campaign, accounts=accounts)
+        job = await sync_to_async(enqueue_dispatch)(campaign, accounts=accounts)
         targets = [f'{item.name} on {item.get_platform_display()} (@{item.handle})' for item in accounts]
-        log_audit(
+        await sync_to_async(log_audit)(
             request=request,
             action='campaign.compose_send',
             entity='MessageCampaign',
             entity_id=campaign.id,
-            changes={'status': campaign.status, 'targets': targets},
+            changes={'status': campaign.status, 'targets': targets, 'job_id': job.id},
         )
     except DatabaseError as exc:
         return db_error_response(request, action='compose_and_send_campaign', exc=exc)
 
     return api_response(
         ok=True,
-        message='Campaign posted successfully',
-        data={
-            'campaign_id': campaign.id,
-            'status': campaign.status,
-            'stats': stats,
-            'targets': targets,
-        },
+        message='Campaign queued for posting',
+        data={**_queued_response(campaign, job), 'targets': targets},
+        status_code=202,
     )
 
 
+def _queued_response(campaign: MessageCampaign, job: DispatchJob) -> dict:
+    return {
+        'campaign_id': campaign.id,
+        'status': campaign.status,
+        'job': job_summary(job),
+        'progress_url': reverse('dispatch_job_status', args=[job.id]),
+    }
+
+
+@require_GET
+def dispatch_job_status(request: HttpRequest, job_id: int) -> JsonResponse:
+    """Progress of a queued send; poll until `status` is `completed` or `failed`."""
+    try:
+        job = DispatchJob.objects.filter(id=job_id).first()
+    except DatabaseError as exc:
+        return db_error_response(request, action='dispatch_job_status', exc=exc)
+    if job is None:
+        return api_response(ok=False, message='Dispatch job not found', status_code=404)
+
+    return api_response(ok=True, message='Dispatch progress', data=job_summary(job))
+
+
 @csrf_protect
 @require_POST
-def ai_compose_campaign(request: HttpRequest) -> JsonResponse:
+async def ai_compose_campaign(request: HttpRequest) -> JsonResponse:
     try:
         payload = validate_ai_compose_payload(json_body(request))
     except ValidationError as exc:
@@ -188,69 +283,20 @@ def ai_compose_campaign(request: HttpRequest) -> JsonResponse:
     studio = OpenAIContentStudio()
 
     try:
-        articles = scanner.fetch(keywords=payload['keywords'], area=payload['area'])
-        generated = studio.compose_post(
-            keywords=payload['keywords'],
-            area=payload['area'],
-            business_perspective=payload['business_perspective'],
-            articles=articles,
-        )
-        image_url = studio.generate_image(generated.get('image_prompt', ''))
-    except requests.RequestException:
+        campaign = await agenerate_campaign(payload, scanner, studio)
+    except PROVIDER_ERRORS:
         logger.exception('AI/news provider failed')
-        return api_response(ok=False, message='AI/news provider temporarily unavailable', status_code=502)
+        return api_response(ok=False, message=PROVIDER_UNAVAILABLE, status_code=502)
 
     try:
-        campaign = MessageCampaign.objects.create(
-            title=(generated.get('title') or f"{payload['keywords'].title()} update")[:200],
-            message=generated.get('message') or '',
-            image_url=image_url,
-            source_type='ai_news',
-            task_mode=payload['task_mode'],
-            status='scheduled' if payload['send_at'] and payload['task_mode'] == 'automated' else 'draft',
-            send_at=payload['send_at'] if payload['task_mode'] == 'automated' else None,
-            metadata={
-                'keywords': payload['keywords'],
-                'area': payload['area'],
-                'business_perspective': payload['business_perspective'],
-                'articles': [
-                    {
-                        'title': item.title,
-                        'link': item.link,
-                        'source': item.source,
-                        'published_at': item.published_at,
-                    }
-                    for item in articles
-                ],
-                'image_prompt': generated.get('image_prompt', ''),
-            },
-        )
-
-        response = {
-            'campaign_id': campaign.id,
-            'status': campaign.status,
-            'title': campaign.title,
-            'message': campaign.message,
-            'image_url': campaign.image_url,
-            'task_mode': campaign.task_mode,
-            'articles': campaign.metadata.get('articles', []),
-        }
-
-        should_dispatch = payload['autopost'] and payload['account_names'] and payload['platforms']
-        if should_dispatch:
-            accounts = SocialAccount.objects.filter(
-                is_active=True,
-                name__in=payload['account_names'],
-                platform__in=payload['platforms'],
-            )
-            if not accounts.exists():
-                return api_response(ok=False, message='No active account match for your selection', status_code=400)
-            dispatcher = MessageDispatcher()
-            stats = dispatcher.dispatch_campaign(campaign, accounts=accounts)
-            response['status'] = campaign.status
-            response['stats'] = stats
-
-        log_audit(
+        await campaign.asave()
+        response = campaign_summary(campaign)
+        accounts = await aautopost_accounts(payload)
+        if accounts == []:
+            return api_response(ok=False, message=NO_ACCOUNT_MATCH, status_code=400)
+        response.update(await apublish_generated(campaign, payload, accounts))
+
+        await sync_to_async(log_audit)(
             request=request,
             action='campaign.ai_compose',
             entity='MessageCampaign',
@@ -261,3 +307,165 @@ def ai_compose_campaign(request: HttpRequest) -> JsonResponse:
         return db_error_response(request, action='ai_compose_campaign', exc=exc)
 
     return api_response(ok=True, message='Campaign generated', data=response, status_code=201)
+
+
+@csrf_protect
+@require_POST
+async def ai_compose_stream(request: HttpRequest):
+    """AI compose that streams the title and message to the browser as server-sent events.
+
+    The view is async and OpenAI is read with httpx, so an open stream holds no worker thread.
+    """
+    try:
+        payload = validate_ai_compose_payload(json_body(request))
+    except ValidationError as exc:
+        return api_response(ok=False, message=str(exc), status_code=400)
+
+    response = StreamingHttpResponse(
+        _ai_compose_events(request, payload, NewsScanner(), OpenAIContentStudio()),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def _ai_compose_events(request: HttpRequest, payload: dict, scanner: NewsScanner, studio: OpenAIContentStudio):
+    try:
+        async for event, data in stream_campaign(payload, scanner, studio):
+            if event == 'done':
+                await sync_to_async(log_audit)(
+                    request=request,
+                    action='campaign.ai_compose',
+                    entity='MessageCampaign',
+                    entity_id=data['campaign_id'],
+                    changes={'status': data['status'], 'task_mode': data['task_mode'], 'stream': True},
+                )
+            yield sse_event(event, data)
+    except PROVIDER_ERRORS:
+        logger.exception('AI/news provider failed')
+        yield sse_event('error', {'message': PROVIDER_UNAVAILABLE})
+    except DatabaseError:
+        logger.exception('Database operation failed', extra={'action': 'ai_compose_stream', 'path': request.path})
+        yield sse_event('error', {'message': 'We could not complete your request right now. Please try again.'})
+
+
+@csrf_protect
+@require_POST
+def ai_compose_bulk(request: HttpRequest) -> JsonResponse:
+    body = json_body(request)
+    items = body.get('items')
+    if not isinstance(items, list) or not items:
+        return api_response(ok=False, message='items must be a non-empty list', status_code=400)
+    if len(items) > MAX_BULK_COMPOSE_ITEMS:
+        return api_response(ok=False, message=f'items accepts at most {MAX_BULK_COMPOSE_ITEMS} specs', status_code=400)
+
+    try:
+        results = bulk_compose(
+            items,
+            scanner=NewsScanner(),
+            studio=OpenAIContentStudio(),
+            # Clients may lower the configured concurrency but not raise it.
+            concurrency=safe_int(body.get('concurrency'), default=0, minimum=0, maximum=settings.AI_BULK_CONCURRENCY) or None,
+        )
+        for result in results.values():
+            if result['ok']:
+                log_audit(
+                    request=request,
+                    action='campaign.ai_compose',
+                    entity='MessageCampaign',
+                    entity_id=result['campaign_id'],
+                    changes={'status': result['status'], 'task_mode': result['task_mode'], 'bulk': True},
+                )
+    except ValidationError as exc:
+        return api_response(ok=False, message=str(exc), status_code=400)
+    except DatabaseError as exc:
+        return db_error_response(request, action='ai_compose_bulk', exc=exc)
+
+    created = sum(1 for result in results.values() if result['ok'])
+    return api_response(
+        ok=True,
+        message=f'{created} of {len(results)} campaigns generated',
+        data={'created': created, 'failed': len(results) - created, 'results': results},
+    )
+
+
+@require_GET
+def campaign_stats_view(request: HttpRequest, campaign_id: int) -> JsonResponse:
+    """Delivery counts kept by the dispatcher; the cost does not grow with the number of deliveries."""
+    try:
+        status = MessageCampaign.objects.filter(id=campaign_id).values_list('status', flat=True).first()
+        if status is None:
+            return api_response(ok=False, message='Campaign not found', status_code=404)
+        stats = campaign_stats(campaign_id)
+    except DatabaseError as exc:
+        return db_error_response(request, action='campaign_stats', exc=exc)
+
+    return api_response(ok=True, message='Campaign stats', data={'campaign_id': campaign_id, 'status': status, **stats})
+
+
+@csrf_protect
+@require_POST
+def retry_failed_deliveries(request: HttpRequest, campaign_id: int) -> JsonResponse:
+    """Queue retries for the accounts whose latest delivery failed; `retry_deliveries` sends them."""
+    try:
+        campaign = MessageCampaign.objects.filter(id=campaign_id).first()
+        if campaign is None:
+            return api_response(ok=False, message='Campaign not found', status_code=404)
+        if campaign.status == 'sending':
+            return api_response(ok=False, message='Campaign is still being sent', status_code=409)
+
+        scheduled = schedule_retries(campaign)
+        if scheduled:
+            log_audit(
+                request=request,
+                action='campaign.retry',
+                entity='MessageCampaign',
+                entity_id=campaign.id,
+                changes={'scheduled': scheduled},
+            )
+        retries = retry_summary(campaign.id)
+    except DatabaseError as exc:
+        return db_error_response(request, action='retry_failed_deliveries', exc=exc)
+
+    return api_response(
+        ok=True,
+        message='Failed deliveries queued for retry' if scheduled else 'No failed deliveries to retry',
+        data={'campaign_id': campaign.id, 'status': campaign.status, 'scheduled': scheduled, 'retries': retries},
+        status_code=202 if scheduled else 200,
+    )
+
+
+@require_GET
+def delivery_analytics_view(request: HttpRequest) -> JsonResponse:
+    """Delivery success rates from the daily rollups; never reads `DeliveryLog`."""
+    days = safe_int(request.GET.get('days'), default=DEFAULT_ANALYTICS_DAYS, minimum=1, maximum=MAX_ANALYTICS_DAYS)
+    platform = (request.GET.get('platform') or '').strip()
+    account_id = safe_int(request.GET.get('account_id'), default=0, minimum=0) or None
+    try:
+        data = delivery_analytics(days, platform=platform, account_id=account_id)
+    except DatabaseError as exc:
+        return db_error_response(request, action='delivery_analytics', exc=exc)
+
+    return api_response(ok=True, message='Delivery analytics', data={'days': days, **data})
+
+
+@require_GET
+def campaign_image_status(request: HttpRequest, campaign_id: int) -> JsonResponse:
+    try:
+        campaign = MessageCampaign.objects.filter(id=campaign_id).values('id', 'status', 'image_url', 'metadata').first()
+    except DatabaseError as exc:
+        return db_error_response(request, action='campaign_image_status', exc=exc)
+    if campaign is None:
+        return api_response(ok=False, message='Campaign not found', status_code=404)
+
+    return api_response(
+        ok=True,
+        message='Image status',
+        data={
+            'campaign_id': campaign['id'],
+            'status': campaign['status'],
+            'image_url': campaign['image_url'],
+            'image_task': (campaign['metadata'] or {}).get('image_task'),
+        },
+    )
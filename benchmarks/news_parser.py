@@ -0,0 +1,115 @@
+"""Compare buffered and streaming NewsScanner parsing on a large feed.
+
+Serves the feed from a local HTTP server so the streaming path reads a real socket:
+
+    python benchmarks/news_parser.py --items 20000 --limit 5
+    python benchmarks/news_parser.py --feed recorded_feed.xml --limit 10
+
+Without `--feed` a synthetic Google News-shaped feed is generated.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'social_manager.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+import requests  # noqa: E402
+
+from apps.broadcast.ai_services import NewsScanner  # noqa: E402
+
+
+def synthetic_feed(items: int) -> bytes:
+    now = time.time()
+    parts = ['<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>News</title>']
+    for index in range(items):
+        parts.append(
+            f'<item><title>Headline {index} about solar incentives and local energy markets</title>'
+            f'<link>https://news.example.com/articles/{index}</link>'
+            f'<guid isPermaLink="false">{index}</guid>'
+            f'<pubDate>{formatdate(now - index * 60, usegmt=True)}</pubDate>'
+            f'<description>{"Lorem ipsum dolor sit amet. " * 20}</description>'
+            f'<source url="https://news.example.com">Example Wire</source></item>'
+        )
+    parts.append('</channel></rss>')
+    return ''.join(parts).encode()
+
+
+def serve(content: bytes) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/rss+xml')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            try:
+                self.wfile.write(content)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the streaming parser hung up early
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure(url: str, streaming: bool, limit: int, rounds: int) -> tuple[float, float]:
+    session = requests.Session()
+    timings, peaks = [], []
+    for _ in range(rounds):
+        tracemalloc.start()
+        started = time.perf_counter()
+        response = session.get(url, timeout=30, stream=streaming)
+        try:
+            if streaming:
+                articles = NewsScanner._parse_stream(response.raw, limit)
+            else:
+                articles = NewsScanner._parse(response.content, limit)
+        finally:
+            response.close()
+        timings.append(time.perf_counter() - started)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        assert len(articles) == limit, f'expected {limit} articles, got {len(articles)}'
+    timings.sort()
+    return timings[len(timings) // 2], max(peaks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--feed', type=Path, help='Recorded RSS file to serve instead of a synthetic one.')
+    parser.add_argument('--items', type=int, default=20000, help='Items in the synthetic feed.')
+    parser.add_argument('--limit', type=int, default=5, help='Articles to collect per fetch.')
+    parser.add_argument('--rounds', type=int, default=5, help='Fetches per mode; the median time is reported.')
+    args = parser.parse_args()
+
+    content = args.feed.read_bytes() if args.feed else synthetic_feed(args.items)
+    server = serve(content)
+    url = f'http://127.0.0.1:{server.server_port}/rss'
+    print(f'feed: {len(content) / 1_048_576:.1f} MiB, limit={args.limit}, rounds={args.rounds}')
+    try:
+        for label, streaming in (('buffered', False), ('streaming', True)):
+            median, peak = measure(url, streaming, args.limit, args.rounds)
+            print(f'{label:>9}: {median * 1000:8.1f} ms median, {peak / 1_048_576:7.2f} MiB peak')
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -18,6 +18,32 @@ def _env_list(name: str, default: str = '') -> list[str]:
     return [item.strip() for item in raw_value.split(',') if item.strip()]
 
 
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)).strip())
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)).strip())
+    except ValueError:
+        return default
+
+
+def _env_int_map(name: str, default: str = '') -> dict[str, int]:
+    """Parse `key:value` pairs, e.g. `x:4,facebook:8`, skipping malformed entries."""
+    parsed: dict[str, int] = {}
+    for item in _env_list(name, default):
+        key, _, value = item.partition(':')
+        try:
+            parsed[key.strip()] = int(value)
+        except ValueError:
+            continue
+    return parsed
+
+
 DJANGO_ENV = os.getenv('DJANGO_ENV', 'development').strip().lower()
 IS_PRODUCTION = DJANGO_ENV in {'production', 'prod'}
 
@@ -115,8 +141,70 @@ if IS_PRODUCTION:
 # Context7 integration configuration
 CONTEXT7_BASE_URL = os.getenv('CONTEXT7_BASE_URL', 'https://api.context7.com')
 CONTEXT7_API_KEY = os.getenv('CONTEXT7_API_KEY', '')
+CONTEXT7_OUTBOX_BATCH_SIZE = _env_int('CONTEXT7_OUTBOX_BATCH_SIZE', 100)
+CONTEXT7_OUTBOX_MAX_ATTEMPTS = _env_int('CONTEXT7_OUTBOX_MAX_ATTEMPTS', 20)
 
 # OpenAI integration configuration
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 OPENAI_CHAT_MODEL = os.getenv('OPENAI_CHAT_MODEL', 'gpt-4o-mini')
 OPENAI_IMAGE_MODEL = os.getenv('OPENAI_IMAGE_MODEL', 'gpt-image-1')
+# Identical OpenAI requests are answered from the database for AI_CACHE_TTL seconds.
+# Image URLs returned by OpenAI expire after about an hour, hence the shorter image TTL.
+AI_CACHE_ENABLED = _env_bool('AI_CACHE_ENABLED', default=True)
+AI_CACHE_TTL = _env_int('AI_CACHE_TTL', 6 * 3600)
+AI_IMAGE_CACHE_TTL = _env_int('AI_IMAGE_CACHE_TTL', 50 * 60)
+AI_CACHE_MAX_ENTRIES = _env_int('AI_CACHE_MAX_ENTRIES', 1000)
+# Campaign images are generated after the AI compose response, on this many background threads.
+IMAGE_TASK_WORKERS = _env_int('IMAGE_TASK_WORKERS', 2)
+# `recover_image_tasks` re-runs image tasks left pending or running this long, e.g. after a restart.
+IMAGE_TASK_STALE_SECONDS = _env_int('IMAGE_TASK_STALE_SECONDS', 600)
+# Concurrent news scans + OpenAI calls per bulk AI compose request.
+AI_BULK_CONCURRENCY = _env_int('AI_BULK_CONCURRENCY', 4)
+
+# Google News RSS cache: parsed feeds are reused for NEWS_CACHE_TTL seconds, then revalidated.
+NEWS_CACHE_TTL = _env_int('NEWS_CACHE_TTL', 300)
+NEWS_CACHE_MAX_ENTRIES = _env_int('NEWS_CACHE_MAX_ENTRIES', 256)
+NEWS_STREAMING_PARSER = _env_bool('NEWS_STREAMING_PARSER', default=True)
+NEWS_FETCH_CONCURRENCY = _env_int('NEWS_FETCH_CONCURRENCY', 4)
+NEWS_QUERY_TIMEOUT = _env_int('NEWS_QUERY_TIMEOUT', 8)
+
+# Campaign dispatch configuration
+DISPATCH_CONCURRENT = _env_bool('DISPATCH_CONCURRENT', default=True)
+DISPATCH_DEFAULT_PLATFORM_CONCURRENCY = _env_int('DISPATCH_DEFAULT_PLATFORM_CONCURRENCY', 4)
+DISPATCH_PLATFORM_CONCURRENCY = _env_int_map('DISPATCH_PLATFORM_CONCURRENCY')
+DISPATCH_LOG_BATCH_SIZE = _env_int('DISPATCH_LOG_BATCH_SIZE', 200)
+DISPATCH_LEASE_SECONDS = _env_int('DISPATCH_LEASE_SECONDS', 300)
+# `run_scheduler` sends this many claimed campaigns at once, off its scheduling loop.
+SCHEDULER_DISPATCH_WORKERS = _env_int('SCHEDULER_DISPATCH_WORKERS', 4)
+# Send endpoints queue a DispatchJob; `run_dispatch_worker` retries a crashed job this many times in total.
+DISPATCH_JOB_MAX_ATTEMPTS = _env_int('DISPATCH_JOB_MAX_ATTEMPTS', 3)
+# Failed deliveries re-sent by `retry_deliveries`: attempt n waits about BASE_DELAY * 2**(n-1)
+# seconds (with jitter, capped at MAX_DELAY) and an account is given up on after MAX_ATTEMPTS.
+DELIVERY_RETRY_MAX_ATTEMPTS = _env_int('DELIVERY_RETRY_MAX_ATTEMPTS', 5)
+DELIVERY_RETRY_BASE_DELAY = _env_int('DELIVERY_RETRY_BASE_DELAY', 60)
+DELIVERY_RETRY_MAX_DELAY = _env_int('DELIVERY_RETRY_MAX_DELAY', 3600)
+
+# Log retention: `archive_logs` moves delivery and audit logs older than ARCHIVE_RETENTION_DAYS
+# into gzip JSONL files under ARCHIVE_DIR, deleting ARCHIVE_CHUNK_SIZE rows per transaction.
+ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', str(BASE_DIR / 'archive'))
+ARCHIVE_RETENTION_DAYS = _env_int('ARCHIVE_RETENTION_DAYS', 90)
+ARCHIVE_CHUNK_SIZE = _env_int('ARCHIVE_CHUNK_SIZE', 500)
+
+# `rollup_deliveries` folds this many delivery logs per transaction into the daily analytics rollups.
+ROLLUP_CHUNK_SIZE = _env_int('ROLLUP_CHUNK_SIZE', 1000)
+
+# Ranked admin search lists at most this many best matches and warns when there are more.
+ADMIN_SEARCH_LIMIT = _env_int('ADMIN_SEARCH_LIMIT', 500)
+
+# Audit log sink: `sync` writes each entry in the request, `buffered` batches them in a background thread.
+AUDIT_SINK = os.getenv('AUDIT_SINK', 'sync')
+AUDIT_BATCH_SIZE = _env_int('AUDIT_BATCH_SIZE', 100)
+AUDIT_FLUSH_INTERVAL = _env_float('AUDIT_FLUSH_INTERVAL', 1.0)
+AUDIT_MAX_QUEUE = _env_int('AUDIT_MAX_QUEUE', 10000)
+
+# Provider rate limits: requests per minute per platform, e.g. `x:300,linkedin:100`.
+PROVIDER_RATE_LIMITS = _env_int_map('PROVIDER_RATE_LIMITS')
+PROVIDER_RATE_LIMIT_BURST = _env_int('PROVIDER_RATE_LIMIT_BURST', 5)
+PROVIDER_RATE_LIMIT_PER_APP = _env_bool('PROVIDER_RATE_LIMIT_PER_APP', default=False)
+PROVIDER_RATE_LIMIT_MAX_WAIT = _env_int('PROVIDER_RATE_LIMIT_MAX_WAIT', 300)
+PROVIDER_THROTTLE_RETRIES = _env_int('PROVIDER_THROTTLE_RETRIES', 3)